@@ -1,14 +1,19 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+
+from littleTalkApp.admin_search import UserSearchMixin
 from .models import User
 
 
 @admin.register(User)
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(UserSearchMixin, UserAdmin):
     """Custom User admin with encrypted email display"""
     
     # Override list_display to show email_encrypted instead of email
     list_display = ('username', 'email_encrypted', 'is_staff', 'date_joined')
+
+    # Ciphertext has no meaningful order, so email_encrypted is not sortable
+    sortable_by = ('username', 'is_staff', 'date_joined')
     
     # Add email_encrypted and email_hash to the fieldsets
     fieldsets = (
@@ -29,8 +34,10 @@ class CustomUserAdmin(UserAdmin):
     # Update filters
     list_filter = ('is_staff', 'is_superuser', 'is_active', 'groups', 'date_joined')
     
-    # Update search to use email_encrypted instead of email
-    search_fields = ('username', 'email_encrypted')
+    # Email-shaped searches match email_hash (see UserSearchMixin); the
+    # encrypted column itself cannot be searched
+    search_fields = ('username',)
+    user_lookups = ('',)
     
     # Ordering by date_joined (newest first)
     ordering = ('-date_joined',)
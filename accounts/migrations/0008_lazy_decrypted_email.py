@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-18 17:09
+
+import littleTalkApp.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0007_alter_user_managers"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="user",
+            name="email_encrypted",
+            field=littleTalkApp.fields.EncryptedEmailField(blank=True, null=True),
+        ),
+    ]
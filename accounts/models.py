@@ -1,9 +1,10 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
-from encrypted_model_fields.fields import EncryptedEmailField
 
+from littleTalkApp.fields import EncryptedEmailField, LazyDecryptQuerySet
 
-class UserManager(BaseUserManager):
+
+class UserManager(BaseUserManager.from_queryset(LazyDecryptQuerySet)):
     use_in_migrations = True
 
     def create_user(self, username, password=None, **extra_fields):
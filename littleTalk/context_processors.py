@@ -1,20 +1,19 @@
 from django.conf import settings
 
+from littleTalkApp.access import get_access_context
+
 
 def layout_context(request):
     can_access_school_management = False
     is_skolon_user = False
+    access = None
     if request.user.is_authenticated:
         try:
             profile = request.user.profile
             is_skolon_user = profile.is_skolon_user()
-            school = profile.get_current_school(request)
-            can_access_school_management = bool(
-                school
-                and (
-                    profile.is_admin_for_school(school)
-                    or profile.is_manager_for_school(school)
-                )
+            access = get_access_context(request)
+            can_access_school_management = access.can_manage_school(
+                access.current_school(request)
             )
         except Exception:
             can_access_school_management = False
@@ -23,6 +22,7 @@ def layout_context(request):
         'hide_sidebar': getattr(request, 'hide_sidebar', False),
         'can_access_school_management': can_access_school_management,
         'is_skolon_user': is_skolon_user,
+        'access_context': access,
     }
 
 def canonical_url(request):
@@ -4,6 +4,7 @@ import os
 # Provide safe defaults so importing base settings does not require production secrets.
 os.environ.setdefault("EMAIL_HOST_PASSWORD", "test-email-password")
 os.environ.setdefault("FIELD_ENCRYPTION_KEY", "jD6Y0ahM95M06WQ0fY5nq2WEYLRh3SeDsICoZ6RiMCM=")
+os.environ.setdefault("LEARNER_NAME_INDEX_KEY", "test-learner-name-index-key")
 os.environ.setdefault("STRIPE_SECRET_KEY", "sk_test_mock")
 os.environ.setdefault("STRIPE_PUBLISHABLE_KEY", "pk_test_mock")
 os.environ.setdefault("STRIPE_WEBHOOK_SECRET", "whsec_test_mock")
@@ -0,0 +1,201 @@
+"""Request-scoped school and role access for the signed-in profile.
+
+The access middlewares, the layout context processor, CanUpdateLearnerPermission
+and the Profile school/role helpers all need the same facts: which schools a
+profile can access, its role at each, and whether those schools are licensed.
+`get_access_context(request)` resolves them once per request (one membership
+query, plus a legacy `Profile.schools` query for profiles without memberships)
+and attaches the result to the request and to the profile instance.
+
+Resolved contexts are also cached across requests, keyed by the profile's
+`access_version`. The version lives on the Profile row, which every request
+loads anyway, so replacing it invalidates the cached context in every worker
+even when the cache is per-process (LocMemCache). Signals in
+littleTalkApp/signals.py call `invalidate_access_context` when memberships,
+schools, `Profile.schools` or the profile's role change; writes that bypass
+signals (queryset `.update()`) must call it themselves.
+"""
+
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from littleTalkApp.models import Profile, Role, SchoolMembership
+
+DEFAULT_ACCESS_CONTEXT_CACHE_TIMEOUT = 60 * 60
+
+
+class AccessContext:
+    """Resolved schools and per-school roles for one profile.
+
+    Mirrors the rules of Profile.get_accessible_schools / get_role_for_school:
+    when any SchoolMembership rows exist only active memberships grant access,
+    otherwise the legacy `Profile.schools` M2M does. The selected school is read
+    from the session on each call, so switching schools mid-request is honoured.
+    """
+
+    STAFF_ROLES = (Role.ADMIN, Role.TEAM_MANAGER, Role.STAFF, "manager")
+
+    def __init__(self, profile_id, role, schools, membership_roles):
+        self.profile_id = profile_id
+        self.role = role
+        # Accessible schools ordered by id, matching QuerySet.first() on the
+        # unordered Profile.get_accessible_schools() queryset.
+        self.schools = sorted(schools, key=lambda school: school.id)
+        self._schools_by_id = {school.id: school for school in self.schools}
+        # school_id -> role for active memberships, None for inactive ones.
+        self.membership_roles = membership_roles
+
+    @classmethod
+    def build(cls, profile):
+        if profile.role == Role.PARENT:
+            return cls(profile.pk, profile.role, [], {})
+
+        memberships = list(profile.memberships.select_related("school"))
+        if memberships:
+            membership_roles = {
+                membership.school_id: (membership.role or None) if membership.is_active else None
+                for membership in memberships
+            }
+            schools = {
+                membership.school_id: membership.school
+                for membership in memberships
+                if membership.is_active
+            }.values()
+            return cls(profile.pk, profile.role, list(schools), membership_roles)
+
+        return cls(profile.pk, profile.role, list(profile.schools.all()), {})
+
+    @property
+    def is_parent(self):
+        return self.role == Role.PARENT
+
+    @property
+    def has_schools(self):
+        return bool(self.schools)
+
+    @property
+    def has_multiple_schools(self):
+        return len(self.schools) > 1
+
+    def get_school(self, school_id):
+        """Return the accessible school with this id, or None."""
+        try:
+            return self._schools_by_id.get(int(school_id))
+        except (TypeError, ValueError):
+            return None
+
+    def current_school(self, request=None):
+        """Return the session-selected accessible school, else the first one."""
+        if self.is_parent:
+            return None
+
+        if request is not None:
+            session = getattr(request, "session", None)
+            selected_id = session.get("selected_school_id") if session is not None else None
+            school = self.get_school(selected_id) if selected_id else None
+            if school:
+                return school
+
+        return self.schools[0] if self.schools else None
+
+    def role_for_school(self, school):
+        """Return this profile's role at `school` (None for an inactive membership)."""
+        if not school or self.is_parent:
+            return self.role
+
+        school_id = getattr(school, "id", school)
+        if school_id in self.membership_roles:
+            return self.membership_roles[school_id]
+        return self.role
+
+    def is_staff_for_school(self, school):
+        return self.role_for_school(school) in self.STAFF_ROLES
+
+    def can_manage_school(self, school):
+        return bool(school) and self.role_for_school(school) in (Role.ADMIN, Role.TEAM_MANAGER)
+
+
+def get_access_context_cache_timeout():
+    return getattr(
+        settings,
+        "ACCESS_CONTEXT_CACHE_TIMEOUT",
+        DEFAULT_ACCESS_CONTEXT_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_access_context(*profile_ids):
+    """Drop cached access for these profiles; the next request rebuilds it.
+
+    Gives each profile a new `access_version`, so entries cached under the old
+    one, in any process, are never read again.
+    """
+    Profile.objects.filter(pk__in=profile_ids).update(access_version=uuid.uuid4())
+
+
+def invalidate_school_access(*school_ids):
+    """Drop cached access for every profile linked to these schools."""
+    profile_ids = set(
+        SchoolMembership.objects.filter(school_id__in=school_ids).values_list(
+            "profile_id", flat=True
+        )
+    )
+    profile_ids.update(
+        Profile.schools.through.objects.filter(school_id__in=school_ids).values_list(
+            "profile_id", flat=True
+        )
+    )
+    if profile_ids:
+        invalidate_access_context(*profile_ids)
+
+
+def _cache_timeout_for(access):
+    """Cap the cache lifetime at the earliest upcoming license expiry.
+
+    License validity is re-checked against the current time on every request,
+    so this only ensures an expired school is re-read rather than trusted.
+    """
+
+    timeout = get_access_context_cache_timeout()
+    now = timezone.now()
+    for school in access.schools:
+        if school.license_expires_at and school.license_expires_at > now:
+            seconds_left = int((school.license_expires_at - now).total_seconds()) + 1
+            timeout = min(timeout, seconds_left)
+    return timeout
+
+
+def load_access_context(profile):
+    """Return the profile's AccessContext from the cache, building it on a miss."""
+
+    cache_key = f"access-context:{profile.pk}:{profile.access_version}"
+    access = cache.get(cache_key)
+    if access is None:
+        access = AccessContext.build(profile)
+        cache.set(cache_key, access, _cache_timeout_for(access))
+    return access
+
+
+def get_access_context(request):
+    """Return the AccessContext for request.user, building it at most once per request.
+
+    Returns None for anonymous users and users without a profile. Accepts either
+    a Django HttpRequest or a DRF Request.
+    """
+
+    request = getattr(request, "_request", request)
+    if "access_context" in request.__dict__:
+        return request.access_context
+
+    context = None
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        profile = getattr(user, "profile", None)
+        if profile is not None:
+            context = load_access_context(profile)
+            profile._access_context = context
+
+    request.access_context = context
+    return context
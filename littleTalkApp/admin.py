@@ -1,6 +1,8 @@
 from django.contrib import admin
 from django.contrib.auth.models import Group
-from .models import Profile, School, ParentProfile, Learner, JoinRequest, SchoolMembership, ExerciseSession, LogEntry, Target, SchoolLicenseCode, SkolonSyncCursor, SkolonOrg, SkolonUser
+from django.db.models import Count, Prefetch, Q
+from .admin_search import UserSearchMixin
+from .models import Profile, School, ParentProfile, Learner, JoinRequest, SchoolMembership, ExerciseSession, IdempotencyKey, PendingExerciseSubmission, LogEntry, Target, SchoolLicenseCode, SkolonSyncCursor, SkolonOrg, SkolonUser
 
 # unregister groups
 admin.site.unregister(Group)
@@ -16,14 +18,16 @@ class SchoolMembershipInline(admin.TabularInline):
 
 
 @admin.register(Profile)
-class ProfileAdmin(admin.ModelAdmin):
+class ProfileAdmin(UserSearchMixin, admin.ModelAdmin):
     list_display = ("user_email", "first_name", "schools_with_roles", "legacy_role")
     list_filter = ("role", "schools", "user__date_joined")
-    search_fields = ("user__username", "user__email_encrypted", "first_name")
+    search_fields = ("user__username",)
+    sortable_by = ()
     autocomplete_fields = ("user",)
     filter_horizontal = ("schools",)
     inlines = [SchoolMembershipInline]
     ordering = ('-user__date_joined',)
+    list_select_related = ("user",)
     
     fieldsets = (
         ("User Info", {
@@ -39,6 +43,14 @@ class ProfileAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related(
+            Prefetch(
+                "memberships",
+                queryset=SchoolMembership.objects.select_related("school").order_by("school__name"),
+            )
+        )
+
     def legacy_role(self, obj):
         """Display the legacy role field"""
         return obj.get_role_display() if obj.role else "—"
@@ -46,8 +58,8 @@ class ProfileAdmin(admin.ModelAdmin):
 
     def schools_with_roles(self, obj):
         """Display all schools with their roles from SchoolMembership"""
-        memberships = obj.memberships.select_related("school").order_by("school__name")
-        if not memberships.exists():
+        memberships = obj.memberships.all()
+        if not memberships:
             return "—"
         return ", ".join([f"{m.school.name} ({m.get_role_display()})" for m in memberships])
     schools_with_roles.short_description = "Schools & Roles"
@@ -56,11 +68,10 @@ class ProfileAdmin(admin.ModelAdmin):
         """Display the encrypted email of the user"""
         return obj.user.email_encrypted or "—"
     user_email.short_description = "User Email"
-    user_email.admin_order_field = "user__email_encrypted"
 
 
 @admin.register(School)
-class SchoolAdmin(admin.ModelAdmin):
+class SchoolAdmin(UserSearchMixin, admin.ModelAdmin):
     list_display = (
         "name",
         "member_count",
@@ -73,8 +84,20 @@ class SchoolAdmin(admin.ModelAdmin):
     )
     list_editable = ("is_licensed", "license_expires_at")
     list_filter = ("is_licensed", "license_expires_at", "created_at")
-    search_fields = ("name", "address", "created_by__email_encrypted", "created_by__username")
+    search_fields = ("name", "address", "created_by__username")
     readonly_fields = ("created_at",)
+    list_select_related = ("created_by",)
+    user_lookups = ("created_by",)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            active_member_count=Count(
+                "memberships", filter=Q(memberships__is_active=True), distinct=True
+            ),
+            active_learner_count=Count(
+                "learners", filter=Q(learners__deleted=False), distinct=True
+            ),
+        )
 
     def license_status(self, obj):
         if obj.has_valid_license():
@@ -87,12 +110,12 @@ class SchoolAdmin(admin.ModelAdmin):
     
     def member_count(self, obj):
         """Count of staff/members in this school"""
-        return obj.memberships.filter(is_active=True).count()
+        return obj.active_member_count
     member_count.short_description = "Active Members"
     
     def active_learners_count(self, obj):
         """Count of active (non-deleted) learners in this school"""
-        return obj.learners.filter(deleted=False).count()
+        return obj.active_learner_count
     active_learners_count.short_description = "Active Learners"
 
     def created_by_email(self, obj):
@@ -101,7 +124,6 @@ class SchoolAdmin(admin.ModelAdmin):
             return obj.created_by.email_encrypted or "—"
         return "—"
     created_by_email.short_description = "Created By"
-    created_by_email.admin_order_field = "created_by__email_encrypted"
 
 
 @admin.register(SchoolLicenseCode)
@@ -114,7 +136,7 @@ class SchoolLicenseCodeAdmin(admin.ModelAdmin):
 
 
 @admin.register(ParentProfile)
-class ParentProfileAdmin(admin.ModelAdmin):
+class ParentProfileAdmin(UserSearchMixin, admin.ModelAdmin):
     list_display = (
         "user_email",
         "trial_started_at",
@@ -125,7 +147,10 @@ class ParentProfileAdmin(admin.ModelAdmin):
     )
     list_editable = ("is_subscribed", "trial_ends_at")
     list_filter = ("is_subscribed",)
+    search_fields = ("profile__user__username", "stripe_customer_id")
     readonly_fields = ("stripe_customer_id",)
+    list_select_related = ("profile__user",)
+    user_lookups = ("profile__user",)
 
     def subscription_status(self, obj):
         if obj.on_trial():
@@ -140,11 +165,10 @@ class ParentProfileAdmin(admin.ModelAdmin):
         """Display the encrypted email of the user"""
         return obj.profile.user.email_encrypted or "—"
     user_email.short_description = "User Email"
-    user_email.admin_order_field = "user__email_encrypted"
 
 
 @admin.register(Learner)
-class LearnerAdmin(admin.ModelAdmin):
+class LearnerAdmin(UserSearchMixin, admin.ModelAdmin):
     list_display = (
         "user_email",
         "school",
@@ -156,18 +180,19 @@ class LearnerAdmin(admin.ModelAdmin):
         "cohort",
     )
     list_filter = ("age_group", "deleted", "school")
-    search_fields = ("user__username", "user__email_encrypted", "learner_uuid")
+    search_fields = ("user__username",)
     exclude = ("name", "date_of_birth")
+    list_select_related = ("user", "school", "cohort")
+    uuid_search_fields = ("learner_uuid",)
 
     def user_email(self, obj):
         """Display the encrypted email of the user"""
         return obj.user.email_encrypted or "—"
     user_email.short_description = "User Email" 
-    user_email.admin_order_field = "user__email_encrypted"
 
 
 @admin.register(JoinRequest)
-class JoinRequestAdmin(admin.ModelAdmin):
+class JoinRequestAdmin(UserSearchMixin, admin.ModelAdmin):
     list_display = (
         "full_name",
         "email",
@@ -177,7 +202,10 @@ class JoinRequestAdmin(admin.ModelAdmin):
         "resolved_at",
         "resolved_by_email",
     )
-    search_fields = ("full_name", "email", "school")
+    search_fields = ("full_name", "email", "school__name")
+    list_select_related = ("school", "resolved_by")
+    user_lookups = ("resolved_by",)
+    email_search_fields = ("email",)
 
     def resolved_by_email(self, obj):
         """Display the encrypted email of the user who resolved the join request"""
@@ -185,11 +213,10 @@ class JoinRequestAdmin(admin.ModelAdmin):
             return obj.resolved_by.email_encrypted or "—"
         return "—"
     resolved_by_email.short_description = "Resolved By"
-    resolved_by_email.admin_order_field = "resolved_by__email_encrypted"
 
 
 @admin.register(ExerciseSession)
-class ExerciseSessionAdmin(admin.ModelAdmin):
+class ExerciseSessionAdmin(UserSearchMixin, admin.ModelAdmin):
     list_display = (
         "learner_uuid",
         "school_name",
@@ -203,8 +230,18 @@ class ExerciseSessionAdmin(admin.ModelAdmin):
         "created_at",
     )
     list_filter = ("exercise_id", "learner__school", "created_at")
-    search_fields = ("learner__learner_uuid", "exercise_id")
+    search_fields = ("exercise_id", "learner__user__username")
     readonly_fields = ("created_at",)
+    list_select_related = ("learner__school",)
+    user_lookups = ("learner__user",)
+    uuid_search_fields = ("learner__learner_uuid",)
+
+    def get_readonly_fields(self, request, obj=None):
+        # Saving a session rebuilds its learner's daily rollup; moving it to
+        # another learner would leave the old learner's rollup stale.
+        if obj is not None:
+            return self.readonly_fields + ("learner",)
+        return self.readonly_fields
 
     def learner_uuid(self, obj):
         return obj.learner.learner_uuid
@@ -231,15 +268,34 @@ class ExerciseSessionAdmin(admin.ModelAdmin):
     accuracy.short_description = "Accuracy"
 
 
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(UserSearchMixin, admin.ModelAdmin):
+    list_display = ("key", "user", "response_status", "created_at", "expires_at")
+    list_filter = ("created_at", "expires_at")
+    search_fields = ("key", "user__username")
+    readonly_fields = ("created_at",)
+    list_select_related = ("user",)
+
+
+@admin.register(PendingExerciseSubmission)
+class PendingExerciseSubmissionAdmin(admin.ModelAdmin):
+    list_display = ("id", "learner", "created_at")
+    list_filter = ("created_at",)
+    readonly_fields = ("created_at",)
+    list_select_related = ("learner",)
+
+
 @admin.register(SchoolMembership)
-class SchoolMembershipAdmin(admin.ModelAdmin):
+class SchoolMembershipAdmin(UserSearchMixin, admin.ModelAdmin):
     """Manage profile-school-role relationships"""
     list_display = ("profile_user", "profile_name", "school", "role", "is_active", "created_at")
     list_filter = ("role", "is_active", "school")
-    search_fields = ("profile__user__username", "profile__user__email_encrypted", "profile__first_name", "school__name")
+    search_fields = ("profile__user__username", "school__name")
     autocomplete_fields = ("profile", "school")
     list_editable = ("role", "is_active")
     readonly_fields = ("created_at", "updated_at")
+    list_select_related = ("profile__user", "school")
+    user_lookups = ("profile__user",)
     
     fieldsets = (
         (None, {
@@ -259,11 +315,10 @@ class SchoolMembershipAdmin(admin.ModelAdmin):
     def profile_name(self, obj):
         return obj.profile.first_name or "—"
     profile_name.short_description = "Name"
-    profile_name.admin_order_field = "profile__first_name"
 
 
 @admin.register(LogEntry)
-class LogEntryAdmin(admin.ModelAdmin):
+class LogEntryAdmin(UserSearchMixin, admin.ModelAdmin):
     """Admin interface for LogEntry with decryption view"""
     list_display = (
         "id",
@@ -274,7 +329,10 @@ class LogEntryAdmin(admin.ModelAdmin):
         "deleted",
     )
     list_filter = ("created_by_role", "timestamp", "deleted", "school")
+    search_fields = ("user__username",)
+    sortable_by = ("id", "created_by_role", "timestamp", "deleted")
     exclude = ("learner",)
+    list_select_related = ("user",)
 
     def user_email(self, obj):
         """Display the encrypted email of the user who created the log entry"""
@@ -282,16 +340,19 @@ class LogEntryAdmin(admin.ModelAdmin):
             return obj.user.email_encrypted or "—"
         return "—"
     user_email.short_description = "User Email"
-    user_email.admin_order_field = "user__email_encrypted"
 
 
 @admin.register(Target)
-class TargetAdmin(admin.ModelAdmin):
+class TargetAdmin(UserSearchMixin, admin.ModelAdmin):
     """Admin interface for Target"""
     list_display = ("id", "learner", "text", "status", "created_at", "updated_at")
     list_filter = ("status", "created_at", "updated_at")
-    search_fields = ("learner__name", "text")
+    search_fields = ("learner__user__username",)
+    sortable_by = ("id", "learner", "status", "created_at", "updated_at")
     readonly_fields = ("created_at", "updated_at")
+    list_select_related = ("learner",)
+    user_lookups = ("learner__user",)
+    uuid_search_fields = ("learner__learner_uuid",)
     
     fieldsets = (
         (None, {
@@ -320,13 +381,15 @@ class SkolonOrgAdmin(admin.ModelAdmin):
     list_filter = ("is_deleted",)
     search_fields = ("skolon_id", "name", "school__name")
     readonly_fields = ("synced_at",)
+    list_select_related = ("school",)
     autocomplete_fields = ("school",)
 
 
 @admin.register(SkolonUser)
-class SkolonUserAdmin(admin.ModelAdmin):
+class SkolonUserAdmin(UserSearchMixin, admin.ModelAdmin):
     list_display = ("skolon_id", "external_id", "user", "skolon_org", "role", "is_deleted", "synced_at")
     list_filter = ("role", "is_deleted")
-    search_fields = ("skolon_id", "external_id", "user__username", "user__email_encrypted")
+    search_fields = ("skolon_id", "external_id", "user__username")
     readonly_fields = ("synced_at",)
+    list_select_related = ("user", "skolon_org")
     autocomplete_fields = ("user",)
\ No newline at end of file
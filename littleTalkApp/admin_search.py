@@ -0,0 +1,53 @@
+"""Admin search for models that reference a user.
+
+User emails (and names) are encrypted, so `search_fields` on them compare
+against ciphertext: every search scans the table and matches nothing. Admins
+using UserSearchMixin instead answer an email-shaped query with an indexed
+exact match on `email_hash` and a UUID-shaped query with an exact match on
+`uuid_search_fields`; any other term goes to the normal `search_fields`,
+which should only name plaintext columns such as usernames.
+"""
+
+import re
+import uuid
+
+from django.db.models import Q
+
+from littleTalkApp.utilities import hash_email
+
+EMAIL_QUERY_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+class UserSearchMixin:
+    # Lookup paths from the admin's model to each User it references; "" is
+    # the User model itself.
+    user_lookups = ("user",)
+    # Plaintext email columns matched case-insensitively by email queries.
+    email_search_fields = ()
+    # UUID fields matched exactly by UUID-shaped queries.
+    uuid_search_fields = ()
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+
+        if EMAIL_QUERY_RE.match(term):
+            email_hash = hash_email(term)
+            query = Q()
+            for lookup in self.user_lookups:
+                query |= Q(**{f"{lookup}__email_hash" if lookup else "email_hash": email_hash})
+            for field_name in self.email_search_fields:
+                query |= Q(**{f"{field_name}__iexact": term})
+            return queryset.filter(query), False
+
+        if self.uuid_search_fields:
+            try:
+                value = uuid.UUID(term)
+            except ValueError:
+                pass
+            else:
+                query = Q()
+                for field_name in self.uuid_search_fields:
+                    query |= Q(**{field_name: value})
+                return queryset.filter(query), False
+
+        return super().get_search_results(request, queryset, search_term)
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class LittletalkappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'littleTalkApp'
+
+    def ready(self):
+        from littleTalkApp import signals  # noqa: F401
+        from littleTalkApp.exercise_registry import load_exercise_registry
+
+        load_exercise_registry()
@@ -0,0 +1,96 @@
+"""Keyed-HMAC blind index for encrypted learner names.
+
+Learner.name is stored encrypted, so the database cannot compare or search it.
+Instead each learner stores HMAC digests of its normalised name:
+
+- `Learner.name_index`, the digest of the whole name, for exact matches
+- LearnerNameToken rows, digests of every 2..PREFIX_MAX_LENGTH character
+  prefix of every word, for prefix search
+
+A search digests the query the same way and matches digests only, so the
+index reveals nothing beyond which learners share a name or a prefix. Digests
+are not ordered, so sorting by name still happens in Python after decryption
+(see sort_by_name).
+
+The HMAC key is LEARNER_NAME_INDEX_KEY, which must be set. It is deliberately
+independent of FIELD_ENCRYPTION_KEY, so rotating the encryption keys leaves
+every digest valid; changing it requires
+`python manage.py backfill_learner_name_index --rebuild`.
+"""
+
+import hashlib
+import hmac
+import unicodedata
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+PREFIX_MIN_LENGTH = 2
+PREFIX_MAX_LENGTH = 12
+DIGEST_LENGTH = 32
+
+
+def normalize_name(name):
+    """Return `name` NFKC-normalised, case-folded, with whitespace collapsed."""
+    if not name:
+        return ""
+    return " ".join(unicodedata.normalize("NFKC", str(name)).casefold().split())
+
+
+def _index_key():
+    key = getattr(settings, "LEARNER_NAME_INDEX_KEY", None)
+    if not key:
+        raise ImproperlyConfigured("LEARNER_NAME_INDEX_KEY must be set.")
+    return str(key).encode()
+
+
+def _digest(key, kind, value):
+    message = f"{kind}:{value}".encode()
+    return hmac.new(key, message, hashlib.sha256).hexdigest()[:DIGEST_LENGTH]
+
+
+def name_index(name):
+    """Return the blind index of the full name, or None for an empty name."""
+    normalized = normalize_name(name)
+    return _digest(_index_key(), "name", normalized) if normalized else None
+
+
+def name_prefix_tokens(name):
+    """Return the set of prefix digests stored for a learner name."""
+    key = _index_key()
+    tokens = set()
+    for word in normalize_name(name).split(" "):
+        for length in range(PREFIX_MIN_LENGTH, min(len(word), PREFIX_MAX_LENGTH) + 1):
+            tokens.add(_digest(key, "prefix", word[:length]))
+    return tokens
+
+
+def query_prefix_tokens(query):
+    """Return one digest per searchable query word (each must match some name word).
+
+    Words shorter than PREFIX_MIN_LENGTH are ignored; longer ones are cut to
+    PREFIX_MAX_LENGTH, so very long words may over-match and should be checked
+    against the decrypted name.
+    """
+
+    key = _index_key()
+    return [
+        _digest(key, "prefix", word[:PREFIX_MAX_LENGTH])
+        for word in normalize_name(query).split(" ")
+        if len(word) >= PREFIX_MIN_LENGTH
+    ]
+
+
+def name_matches_query(name, query):
+    """True if every query word is a prefix of some word of `name`."""
+    name_words = normalize_name(name).split(" ")
+    return all(
+        any(name_word.startswith(word) for name_word in name_words)
+        for word in normalize_name(query).split(" ")
+        if len(word) >= PREFIX_MIN_LENGTH
+    )
+
+
+def sort_by_name(learners):
+    """Return learners sorted by decrypted, normalised name."""
+    return sorted(learners, key=lambda learner: normalize_name(learner.name))
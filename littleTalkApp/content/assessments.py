@@ -33,6 +33,8 @@ QUESTIONS = [
     {"complexity": story_train_complexity, "exercise": story_train_title, "skill": "Describing and predicting events", "topic": "Expressive Language", "text": "Does the child describe events in a logical order?", "order": 19}
 ]
 
+QUESTIONS_BY_ORDER = {question["order"]: question for question in QUESTIONS}
+
 RECOMMENDATIONS = [
     {"exercises": [colourful_semantics_title], "focus": colourful_semantics_title, "nextlevel": think_and_find_title}, # complexity 0
     {"exercises": [colourful_semantics_title, think_and_find_title, concept_quest_title], "focus": think_and_find_title, "nextlevel": categorisation_title}, # complexity 1
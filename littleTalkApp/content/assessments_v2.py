@@ -195,6 +195,8 @@ QUESTIONS_V2 = [
     },
 ]
 
+QUESTIONS_V2_BY_ORDER = {question["order"]: question for question in QUESTIONS_V2}
+
 STAGE_PADDING_ORDER = {
     1: [
         "whats-in-the-bag",
@@ -220,7 +222,7 @@ STAGE_PADDING_ORDER = {
 
 
 def get_question_by_order(order):
-    return next((q for q in QUESTIONS_V2 if q["order"] == order), None)
+    return QUESTIONS_V2_BY_ORDER.get(order)
 
 
 def validate_v2_exercise_ids():
@@ -0,0 +1,107 @@
+"""Practise stages and exercise metadata shared by the exercise registry."""
+
+PRACTISE_STAGES = {
+    1: {
+        "label": "Early Years",
+        "exercises": [
+            "colourful_semantics_early_sentence_building",
+            "spot_on",
+            "whos_who_pronouns",
+            "whats_in_the_bag_vocabulary_builder",
+        ],
+    },
+    2: {
+        "label": "Key Stage 1",
+        "exercises": [
+            "colourful_semantics",
+            "think_and_find",
+            "concept_quest",
+            "categorisation",
+            "story_train",
+        ],
+    },
+    3: {
+        "label": "Key Stage 2",
+        "exercises": [
+            "colourful_semantics_advanced_sentence_building",
+            "story_train_advanced_sequencing",
+            "task_master_instructions",
+            "in_the_know_inferencing",
+            "what_happens_next_predicting",
+        ],
+    },
+}
+
+PRACTISE_EXERCISE_ROUTE_NAMES = {
+    "colourful_semantics": "colourful_semantics",
+    "colourful_semantics_early_sentence_building": "colourful_semantics",
+    "colourful_semantics_advanced_sentence_building": "colourful_semantics",
+    "think_and_find": "think_and_find",
+    "concept_quest": "concept_quest",
+    "categorisation": "categorisation_example",
+    "story_train": "story_train",
+    "story_train_advanced_sequencing": "story_train",
+    "spot_on": "spot_on",
+    "whos_who_pronouns": "whos_who",
+    "whats_in_the_bag_vocabulary_builder": "whats_in_the_bag",
+    "task_master_instructions": "task_master",
+    "in_the_know_inferencing": "in_the_know",
+    "what_happens_next_predicting": "what_happens_next",
+}
+
+PRACTISE_EXERCISE_ROUTE_QUERIES = {
+    "colourful_semantics_early_sentence_building": "variant=early-years",
+    "colourful_semantics_advanced_sentence_building": "variant=advanced",
+    "story_train_advanced_sequencing": "variant=advanced",
+}
+
+CANONICAL_TO_PRACTISE_KEY = {
+    "categorisation": "categorisation",
+    "colourful-semantics": "colourful_semantics",
+    "colourful-semantics-early": "colourful_semantics_early_sentence_building",
+    "colourful-semantics-plus": "colourful_semantics_advanced_sentence_building",
+    "concept-quest": "concept_quest",
+    "in-the-know": "in_the_know_inferencing",
+    "spot-on": "spot_on",
+    "story-train": "story_train",
+    "story-train-plus": "story_train_advanced_sequencing",
+    "task-master": "task_master_instructions",
+    "think-and-find": "think_and_find",
+    "what-happens-next": "what_happens_next_predicting",
+    "whats-in-the-bag": "whats_in_the_bag_vocabulary_builder",
+    "whos-who": "whos_who_pronouns",
+}
+
+PRACTISE_EXERCISE_ICONS = {
+    "colourful_semantics": "exercise_icons/colourful_semantics_icon.webp",
+    "colourful_semantics_early_sentence_building": "exercise_icons/colourful_semantics_early_icon.webp",
+    "colourful_semantics_advanced_sentence_building": "exercise_icons/colourful_semantics_advanced_icon.webp",
+    "think_and_find": "exercise_icons/think_and_find_icon.webp",
+    "concept_quest": "exercise_icons/concept_quest_icon.webp",
+    "categorisation": "exercise_icons/categorisation_icon.webp",
+    "story_train": "exercise_icons/story_train_icon.webp",
+    "story_train_advanced_sequencing": "exercise_icons/story_train_advanced_icon.webp",
+    "task_master_instructions": "exercise_icons/task_master_icon.webp",
+    "spot_on": "exercise_icons/spot_on_icon.webp",
+    "whos_who_pronouns": "exercise_icons/whos_who_icon.webp",
+    "whats_in_the_bag_vocabulary_builder": "exercise_icons/whats_in_the_bag_icon.webp",
+    "in_the_know_inferencing": "exercise_icons/in_the_know_icon.webp",
+    "what_happens_next_predicting": "exercise_icons/what_happens_next_icon.webp",
+}
+
+CANONICAL_TO_SKILLS = {
+    "whats-in-the-bag": ["Naming common objects", "Vocabulary development"],
+    "spot-on": ["Understanding prepositions"],
+    "whos-who": ["Following pronoun instructions"],
+    "colourful-semantics-early": ["Using action words"],
+    "colourful-semantics": ["Answering 'who/what/where' questions"],
+    "concept-quest": ["Understanding concepts"],
+    "categorisation": ["Grouping things together"],
+    "story-train": ["Understanding time concepts", "Describing and sequencing events"],
+    "think-and-find": ["Following multi-step instructions"],
+    "story-train-plus": ["Retelling events/stories"],
+    "in-the-know": ["Understanding emotions/mental states", "Justifying with evidence"],
+    "colourful-semantics-plus": ["Answering 'why/how' questions"],
+    "what-happens-next": ["Predicting outcomes"],
+    "task-master": ["Giving sequential instructions"],
+}
@@ -0,0 +1,199 @@
+"""Frozen index of the practise exercises, built once when the app is ready.
+
+Exercises are known by two ids: the canonical id stored on sessions and
+recommendations (see VALID_EXERCISE_IDS) and the practise key used by
+GAME_DESCRIPTIONS, stages, routes and icons. The registry joins the tables in
+littleTalkApp.content.exercises under both ids, checks that they agree with
+each other and with VALID_EXERCISE_IDS, and precomputes every practise card
+including its start URL, so views neither scan the tables nor call reverse()
+per request. Inconsistent tables raise ImproperlyConfigured at startup.
+"""
+
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import NoReverseMatch, reverse
+
+from littleTalkApp.content.exercises import (
+    CANONICAL_TO_PRACTISE_KEY,
+    CANONICAL_TO_SKILLS,
+    PRACTISE_EXERCISE_ICONS,
+    PRACTISE_EXERCISE_ROUTE_NAMES,
+    PRACTISE_EXERCISE_ROUTE_QUERIES,
+    PRACTISE_STAGES,
+)
+from littleTalkApp.content.game_descriptions import GAME_DESCRIPTIONS
+from littleTalkApp.exercise_ids import VALID_EXERCISE_IDS
+
+CARD_FIELDS = ("title", "target", "bullet1", "bullet2", "bullet3")
+
+
+@dataclass(frozen=True)
+class Exercise:
+    exercise_id: str
+    practise_key: str
+    stage_number: int
+    title: str
+    skills: tuple
+    start_url: str
+    game: MappingProxyType
+    card: MappingProxyType
+
+
+@dataclass(frozen=True)
+class PractiseStage:
+    number: int
+    label: str
+    exercises: tuple
+    exercise_cards: tuple
+
+
+@dataclass(frozen=True)
+class ExerciseRegistry:
+    stages: tuple
+    by_id: MappingProxyType
+    by_practise_key: MappingProxyType
+    by_stage_number: MappingProxyType
+
+    def get(self, exercise_id):
+        """Return the Exercise for a canonical id, or None."""
+        return self.by_id.get(exercise_id)
+
+    def get_by_practise_key(self, practise_key):
+        """Return the Exercise for a practise key, or None."""
+        return self.by_practise_key.get(practise_key)
+
+    def get_stage(self, stage_number):
+        """Return the PractiseStage with this number, or None."""
+        return self.by_stage_number.get(stage_number)
+
+
+def validate_exercise_tables():
+    """Return a list of inconsistencies between the exercise content tables."""
+
+    errors = []
+    canonical_ids = set(CANONICAL_TO_PRACTISE_KEY)
+    for exercise_id in sorted(VALID_EXERCISE_IDS - canonical_ids):
+        errors.append(f"{exercise_id!r} has no practise key")
+    for exercise_id in sorted(canonical_ids - VALID_EXERCISE_IDS):
+        errors.append(f"{exercise_id!r} is not in VALID_EXERCISE_IDS")
+    for exercise_id in sorted(set(CANONICAL_TO_SKILLS) - canonical_ids):
+        errors.append(f"skills are listed for unknown exercise {exercise_id!r}")
+
+    key_owners = {}
+    for exercise_id, practise_key in CANONICAL_TO_PRACTISE_KEY.items():
+        key_owners.setdefault(practise_key, []).append(exercise_id)
+    for practise_key, owners in sorted(key_owners.items()):
+        if len(owners) > 1:
+            errors.append(f"practise key {practise_key!r} is shared by {', '.join(sorted(owners))}")
+
+    key_stages = {}
+    for stage_number, stage_data in PRACTISE_STAGES.items():
+        for practise_key in stage_data.get("exercises", []):
+            key_stages.setdefault(practise_key, []).append(stage_number)
+    for practise_key, stage_numbers in sorted(key_stages.items()):
+        if len(stage_numbers) > 1:
+            errors.append(f"practise key {practise_key!r} is in stages {stage_numbers}")
+        if practise_key not in key_owners:
+            errors.append(f"stage exercise {practise_key!r} has no canonical id")
+
+    for practise_key in sorted(key_owners):
+        if practise_key not in key_stages:
+            errors.append(f"practise key {practise_key!r} is not in any stage")
+        if practise_key not in GAME_DESCRIPTIONS:
+            errors.append(f"practise key {practise_key!r} has no game description")
+        if practise_key not in PRACTISE_EXERCISE_ICONS:
+            errors.append(f"practise key {practise_key!r} has no icon")
+        route_name = PRACTISE_EXERCISE_ROUTE_NAMES.get(practise_key)
+        if not route_name:
+            errors.append(f"practise key {practise_key!r} has no route")
+            continue
+        try:
+            reverse(route_name)
+        except NoReverseMatch:
+            errors.append(f"route {route_name!r} of {practise_key!r} does not resolve")
+
+    for practise_key in sorted(set(PRACTISE_EXERCISE_ROUTE_QUERIES) - set(key_owners)):
+        errors.append(f"route query is set for unknown practise key {practise_key!r}")
+
+    return errors
+
+
+def build_exercise_registry():
+    """Validate the content tables and return a new ExerciseRegistry."""
+
+    errors = validate_exercise_tables()
+    if errors:
+        raise ImproperlyConfigured(
+            "Exercise content tables are inconsistent: " + "; ".join(errors)
+        )
+
+    canonical_ids = {
+        practise_key: exercise_id for exercise_id, practise_key in CANONICAL_TO_PRACTISE_KEY.items()
+    }
+    stages = []
+    by_id = {}
+    for stage_number in sorted(PRACTISE_STAGES):
+        stage_data = PRACTISE_STAGES[stage_number]
+        exercises = []
+        for practise_key in stage_data.get("exercises", []):
+            game_data = GAME_DESCRIPTIONS[practise_key]
+            start_url = reverse(PRACTISE_EXERCISE_ROUTE_NAMES[practise_key])
+            query = PRACTISE_EXERCISE_ROUTE_QUERIES.get(practise_key)
+            if query:
+                start_url = f"{start_url}?{query}"
+
+            card = {"key": practise_key}
+            card.update((field, game_data.get(field, "")) for field in CARD_FIELDS)
+            card["icon"] = PRACTISE_EXERCISE_ICONS[practise_key]
+            card["start_url"] = start_url
+
+            exercise_id = canonical_ids[practise_key]
+            exercise = Exercise(
+                exercise_id=exercise_id,
+                practise_key=practise_key,
+                stage_number=stage_number,
+                title=game_data.get("title", exercise_id),
+                skills=tuple(CANONICAL_TO_SKILLS.get(exercise_id, ())),
+                start_url=start_url,
+                game=MappingProxyType(game_data),
+                card=MappingProxyType(card),
+            )
+            exercises.append(exercise)
+            by_id[exercise_id] = exercise
+
+        stages.append(
+            PractiseStage(
+                number=stage_number,
+                label=stage_data.get("label", f"Stage {stage_number}"),
+                exercises=tuple(exercises),
+                exercise_cards=tuple(exercise.card for exercise in exercises),
+            )
+        )
+
+    return ExerciseRegistry(
+        stages=tuple(stages),
+        by_id=MappingProxyType(by_id),
+        by_practise_key=MappingProxyType(
+            {exercise.practise_key: exercise for exercise in by_id.values()}
+        ),
+        by_stage_number=MappingProxyType({stage.number: stage for stage in stages}),
+    )
+
+
+_registry = None
+
+
+def load_exercise_registry():
+    """Build the registry; called from LittletalkappConfig.ready()."""
+
+    global _registry
+    _registry = build_exercise_registry()
+    return _registry
+
+
+def get_exercise_registry():
+    """Return the registry built at startup."""
+
+    return _registry or load_exercise_registry()
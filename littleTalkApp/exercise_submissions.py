@@ -0,0 +1,194 @@
+"""Exercise result recording shared by the submit-exercise API and the write-behind worker.
+
+Inline mode (the default) applies each result inside the request. When
+`settings.EXERCISE_SUBMISSION_WRITE_BEHIND` is enabled, SubmitExerciseView only
+queues a PendingExerciseSubmission row and `manage.py drain_exercise_submissions`
+applies queued results in batches with one counter update per learner.
+"""
+
+import logging
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from littleTalkApp.models import (
+    ExerciseSession,
+    Learner,
+    LearnerDailyStats,
+    PendingExerciseSubmission,
+)
+from littleTalkApp.serializers import SubmitExerciseSerializer
+from littleTalkApp.views_modules.practise import resolve_recommendation_index
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_LATENCY_SECONDS = 2
+DEFAULT_DRAIN_BATCH_SIZE = 500
+
+
+def is_write_behind_enabled():
+    return getattr(settings, "EXERCISE_SUBMISSION_WRITE_BEHIND", False)
+
+
+def get_flush_latency_seconds():
+    """Longest time a queued result waits before the worker polls again."""
+    return getattr(
+        settings,
+        "EXERCISE_SUBMISSION_FLUSH_LATENCY_SECONDS",
+        DEFAULT_FLUSH_LATENCY_SECONDS,
+    )
+
+
+def get_drain_batch_size():
+    return getattr(
+        settings,
+        "EXERCISE_SUBMISSION_DRAIN_BATCH_SIZE",
+        DEFAULT_DRAIN_BATCH_SIZE,
+    )
+
+
+def build_exercise_session(learner, validated_data, learner_total_exp_after_session):
+    """Return an unsaved ExerciseSession for one validated SubmitExerciseSerializer payload."""
+
+    session = ExerciseSession(
+        learner=learner,
+        exercise_id=validated_data["exercise_id"],
+        difficulty_selected=str(validated_data.get("difficulty_level", 0)),
+        difficulty_label=validated_data.get("difficulty_label", ""),
+        started_at=validated_data["started_at"],
+        completed_at=validated_data["completed_at"],
+        total_questions=validated_data["total_questions"],
+        incorrect_answers=validated_data["incorrect_answers"],
+        attempts_per_question=validated_data["attempts_per_question"],
+        learner_total_exp_after_session=learner_total_exp_after_session,
+        exp_earned=validated_data["exp"],
+    )
+    # bulk_create skips save(), so derive the stored metrics here.
+    session.populate_derived_metrics()
+    return session
+
+
+def advance_recommendation_index(learner, submitted_exercise_ids):
+    """Advance the recommendation rotation once per completed current recommendation.
+
+    Submissions are applied in order, so a batch that completes the current
+    recommendation and then the next one advances the index twice. This is the
+    only place the rotation anchor moves; pages derive the current index from it.
+    """
+
+    recommendation_ids = learner.recommended_exercise_ids or []
+    if not recommendation_ids:
+        return
+
+    now = timezone.now()
+    current_index = resolve_recommendation_index(learner, now=now)
+    if current_index is None:
+        return
+
+    advanced = False
+    for exercise_id in submitted_exercise_ids:
+        if exercise_id == recommendation_ids[current_index]:
+            current_index = (current_index + 1) % len(recommendation_ids)
+            advanced = True
+
+    if advanced:
+        learner.recommendation_index = current_index
+        learner.recommendation_index_updated_at = now
+        learner.save(
+            update_fields=[
+                "recommendation_index",
+                "recommendation_index_updated_at",
+            ]
+        )
+
+
+def apply_exercise_results(learner, results):
+    """Add a learner's results to their counters and return unsaved ExerciseSessions.
+
+    Must run inside a transaction: the learner row stays locked after the single
+    counter UPDATE, so the running `learner_total_exp_after_session` snapshots
+    cannot interleave with another submission's increments.
+    """
+
+    results_exp = sum(data["exp"] for data in results)
+    learner_total_exp = learner.add_progress(
+        results_exp,
+        sum(data["total_exercises"] for data in results),
+    )
+
+    learner_exp = learner_total_exp - results_exp
+    sessions = []
+    for data in results:
+        learner_exp += data["exp"]
+        sessions.append(build_exercise_session(learner, data, learner_exp))
+    return sessions
+
+
+def save_exercise_sessions(sessions):
+    """Insert sessions from apply_exercise_results and add them to the daily rollups."""
+
+    ExerciseSession.objects.bulk_create(sessions)
+    LearnerDailyStats.add_sessions(sessions)
+    return sessions
+
+
+def enqueue_exercise_submission(learner, input_serializer):
+    """Queue one validated submission for the write-behind worker."""
+
+    return PendingExerciseSubmission.objects.create(
+        learner=learner,
+        payload=dict(input_serializer.data),
+    )
+
+
+def drain_pending_submissions(batch_size=None):
+    """Apply up to `batch_size` queued submissions and return how many were drained.
+
+    Queued rows are claimed with SKIP LOCKED where the database supports it, so
+    several workers can drain concurrently. Each learner in the batch gets one
+    counter update, and all sessions are written with one bulk insert.
+    """
+
+    batch_size = batch_size or get_drain_batch_size()
+
+    with transaction.atomic():
+        pending = list(
+            PendingExerciseSubmission.objects.select_for_update(skip_locked=True)
+            .order_by("id")[:batch_size]
+        )
+        if not pending:
+            return 0
+
+        results_by_learner = defaultdict(list)
+        for submission in pending:
+            serializer = SubmitExerciseSerializer(data=submission.payload)
+            if not serializer.is_valid():
+                logger.warning(
+                    "Dropping queued exercise submission %s for learner %s: %s",
+                    submission.id,
+                    submission.learner_id,
+                    serializer.errors,
+                )
+                continue
+            results_by_learner[submission.learner_id].append(serializer.validated_data)
+
+        learners = Learner.objects.in_bulk(list(results_by_learner.keys()))
+        sessions = []
+        for learner_id, results in results_by_learner.items():
+            learner = learners[learner_id]
+            sessions.extend(apply_exercise_results(learner, results))
+            advance_recommendation_index(learner, [data["exercise_id"] for data in results])
+
+        save_exercise_sessions(sessions)
+        PendingExerciseSubmission.objects.filter(
+            id__in=[submission.id for submission in pending]
+        ).delete()
+
+    logger.info(
+        "Drained %s queued exercise submissions for %s learners",
+        len(pending),
+        len(results_by_learner),
+    )
+    return len(pending)
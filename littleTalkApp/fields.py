@@ -0,0 +1,135 @@
+"""Encrypted model fields that decrypt on first attribute access.
+
+The encrypted_model_fields fields decrypt every encrypted column of every row
+as it is loaded, even when the page never reads it. The subclasses here keep
+the stored token as a Ciphertext when rows are loaded through a
+LazyDecryptQuerySet and decrypt it the first time the attribute is read. The
+plaintext then replaces the token on the instance, so each value is decrypted
+at most once per loaded object, which for a view means at most once per
+request.
+
+values() and values_list() still decrypt eagerly, as do querysets of models
+whose manager is not lazy, so callers never see a token. An untouched value is
+written back unchanged on save() instead of being decrypted and encrypted
+again; rotate_encryption_keys re-encrypts explicitly.
+
+ENCRYPTED_FIELDS_LAZY_DECRYPTION = False restores eager decryption.
+"""
+
+import contextvars
+
+from django.conf import settings
+from django.db import models
+from django.db.models.query import ModelIterable
+from django.db.models.query_utils import DeferredAttribute
+from encrypted_model_fields import fields as encrypted_fields
+
+_defer_decryption = contextvars.ContextVar("defer_decryption", default=False)
+
+
+def is_lazy_decryption_enabled():
+    return getattr(settings, "ENCRYPTED_FIELDS_LAZY_DECRYPTION", True)
+
+
+class Ciphertext(str):
+    """A stored encrypted value that has not been decrypted yet."""
+
+    __slots__ = ()
+
+
+def is_undecrypted(instance, attname):
+    """True if the field still holds the ciphertext loaded from the database."""
+    return type(instance.__dict__.get(attname)) is Ciphertext
+
+
+class LazyDecryptModelIterable(ModelIterable):
+    """ModelIterable that leaves encrypted columns as Ciphertext on the instances."""
+
+    def __iter__(self):
+        if not is_lazy_decryption_enabled():
+            yield from super().__iter__()
+            return
+
+        instances = super().__iter__()
+        while True:
+            # Set only while a row is converted, not while the caller holds the
+            # generator, so nested queries in the caller's loop stay eager.
+            token = _defer_decryption.set(True)
+            try:
+                instance = next(instances)
+            except StopIteration:
+                return
+            finally:
+                _defer_decryption.reset(token)
+            yield instance
+
+
+class LazyDecryptQuerySet(models.QuerySet):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._iterable_class = LazyDecryptModelIterable
+
+
+LazyDecryptManager = models.Manager.from_queryset(LazyDecryptQuerySet)
+
+
+class LazyDecryptedAttribute(DeferredAttribute):
+    # A data descriptor (it defines __set__), so reads go through __get__ even
+    # when the value is already in the instance __dict__.
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        value = super().__get__(instance, cls)
+        if type(value) is Ciphertext:
+            value = self.field.decrypt(value)
+            instance.__dict__[self.field.attname] = value
+        return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+
+
+class LazyDecryptMixin:
+    descriptor_class = LazyDecryptedAttribute
+
+    def from_db_value(self, value, expression, connection):
+        if value is not None and _defer_decryption.get():
+            if isinstance(value, bytes):
+                value = value.decode("utf-8")
+            return Ciphertext(value)
+        return super().from_db_value(value, expression, connection)
+
+    def decrypt(self, ciphertext):
+        return self.to_python(str(ciphertext))
+
+    def pre_save(self, model_instance, add):
+        value = model_instance.__dict__.get(self.attname)
+        if type(value) is Ciphertext:
+            return value
+        return super().pre_save(model_instance, add)
+
+    def get_db_prep_save(self, value, connection):
+        if type(value) is Ciphertext:
+            return str(value)
+        if hasattr(value, "as_sql"):
+            # EncryptedMixin would encrypt the expression's str(); bulk_update
+            # relies on expressions reaching the compiler untouched.
+            return value
+        return super().get_db_prep_save(value, connection)
+
+
+class EncryptedCharField(LazyDecryptMixin, encrypted_fields.EncryptedCharField):
+    pass
+
+
+class EncryptedTextField(LazyDecryptMixin, encrypted_fields.EncryptedTextField):
+    pass
+
+
+class EncryptedDateField(LazyDecryptMixin, encrypted_fields.EncryptedDateField):
+    pass
+
+
+class EncryptedEmailField(LazyDecryptMixin, encrypted_fields.EncryptedEmailField):
+    pass
@@ -14,6 +14,7 @@ import re
 from django.core.exceptions import ValidationError
 from datetime import date
 from .utilities import hash_email
+from .screener_import import parse_screener_import, read_sheet_rows
 
 User = get_user_model()
 
@@ -486,3 +487,16 @@ class ParentAccessCodeForm(forms.Form):
             except ParentAccessToken.DoesNotExist:
                 raise forms.ValidationError("Invalid access code.")
         raise forms.ValidationError("Please enter a code.")
+
+
+class ScreenerImportForm(forms.Form):
+    file = forms.FileField(label="Class screener sheet (.csv or .xlsx)")
+
+    def __init__(self, *args, learners=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.learners = learners if learners is not None else Learner.objects.none()
+
+    def clean_file(self):
+        """Return the validated (learner, answers) pairs of the uploaded sheet."""
+        rows = read_sheet_rows(self.cleaned_data["file"])
+        return parse_screener_import(rows, self.learners)
@@ -7,7 +7,7 @@ Each function:
   3. Saves the new versionTag so the next sync is incremental.
 
 License sync also propagates School.is_licensed / School.license_expires_at so
-the existing AccessControlMiddleware access gates work without any changes.
+the AccessPolicyMiddleware license gate work without any changes.
 """
 
 import logging
@@ -16,6 +16,8 @@ from typing import Dict, List, Optional, Tuple
 
 from django.utils import timezone as django_tz
 
+from littleTalkApp.access import invalidate_school_access
+from littleTalkApp.metrics import timed_sync
 from littleTalkApp.models import (
     School,
     SkolonOrg,
@@ -177,6 +179,7 @@ def _drain_paginated_results(
 # Individual sync functions
 # ---------------------------------------------------------------------------
 
+@timed_sync("school")
 def sync_schools(client) -> Dict[str, object]:
     """
     Upsert SkolonOrg records from the Skolon schools endpoint.
@@ -228,6 +231,7 @@ def sync_schools(client) -> Dict[str, object]:
     return {"items": schools, "stats": stats}
 
 
+@timed_sync("user")
 def sync_users(client) -> Dict[str, object]:
     """
     Upsert teacher-only SkolonUser records, linking them to licensed local schools.
@@ -307,6 +311,7 @@ def sync_users(client) -> Dict[str, object]:
     return {"items": users, "stats": stats}
 
 
+@timed_sync("group")
 def sync_groups(client) -> Dict[str, object]:
     """
     Fetch Skolon groups and advance the cursor.
@@ -343,6 +348,7 @@ def _parse_expiry(expiration_date: Optional[str]) -> Optional[datetime]:
         return None
 
 
+@timed_sync("license")
 def sync_licenses(client) -> Dict[str, object]:
     """
     Sync Skolon licenses and update school-level access.
@@ -453,6 +459,11 @@ def sync_licenses(client) -> Dict[str, object]:
             )
             logger.info("Revoked license for school pk=%s", school_pk)
 
+    # Queryset .update() sends no signals, so cached access contexts for these
+    # schools' members are invalidated here.
+    if school_pks_to_apply:
+        invalidate_school_access(*school_pks_to_apply)
+
     _save_cursor(SkolonSyncCursor.EntityType.LICENSE, final_cursor)
     revoked_school_pks = set(school_pks_to_apply) - set(school_expiry.keys())
     stats = {
@@ -0,0 +1,81 @@
+"""
+Management command: python manage.py backfill_learner_name_index
+
+Fills Learner.name_index and the LearnerNameToken prefix rows used by learner
+name search (see littleTalkApp/blind_index.py) for learners saved before the
+index existed. Learners are processed in primary key order; each chunk
+decrypts its names once, then writes one bulk_update and one bulk_create in
+a transaction. Without --rebuild only learners whose name_index is still NULL
+are selected, so an interrupted run can simply be started again. Each chunk
+prints its last id; pass it to --start-after-id to skip ahead.
+
+Use --rebuild after changing LEARNER_NAME_INDEX_KEY to recompute every
+learner's index. Rotating FIELD_ENCRYPTION_KEY does not affect the index.
+
+Examples:
+    python manage.py backfill_learner_name_index
+    python manage.py backfill_learner_name_index --batch-size 2000
+    python manage.py backfill_learner_name_index --rebuild --start-after-id 50000
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from littleTalkApp.blind_index import name_index, name_prefix_tokens
+from littleTalkApp.models import Learner, LearnerNameToken
+
+
+class Command(BaseCommand):
+    help = "Backfill the learner name blind index in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Learners indexed per transaction.",
+        )
+        parser.add_argument(
+            "--start-after-id",
+            type=int,
+            default=0,
+            help="Only process learners with a primary key above this id.",
+        )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Recompute the index of every learner, not only unindexed ones.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options["batch_size"], 1)
+        last_id = options["start_after_id"]
+        indexed = 0
+
+        learners = Learner.objects.only("id", "name", "school_id", "name_index")
+        if not options["rebuild"]:
+            learners = learners.filter(name_index__isnull=True)
+
+        while True:
+            chunk = list(learners.filter(id__gt=last_id).order_by("id")[:batch_size])
+            if not chunk:
+                break
+
+            tokens = []
+            for learner in chunk:
+                learner.name_index = name_index(learner.name)
+                tokens.extend(
+                    LearnerNameToken(learner=learner, school_id=learner.school_id, token=token)
+                    for token in name_prefix_tokens(learner.name)
+                )
+
+            with transaction.atomic():
+                Learner.objects.bulk_update(chunk, ["name_index"])
+                LearnerNameToken.objects.filter(learner__in=chunk).delete()
+                LearnerNameToken.objects.bulk_create(tokens)
+
+            indexed += len(chunk)
+            last_id = chunk[-1].id
+            self.stdout.write(f"Indexed {indexed} learners (last id {last_id})")
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed names for {indexed} learners."))
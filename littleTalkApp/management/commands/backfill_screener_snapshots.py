@@ -0,0 +1,96 @@
+"""
+Management command: python manage.py backfill_screener_snapshots
+
+Creates the ScreenerSessionSnapshot rows (see littleTalkApp/screener_snapshots.py)
+for screener sessions that have none. Migration 0093 runs the same backfill on
+deploy; this command is for re-running it by hand. Learners with answers
+are processed in primary key order; each chunk reads its answers, joined
+with their ScreenerQuestion, in one ordered query and writes its snapshots
+with one bulk_create in a transaction. Sessions that already have a snapshot
+are skipped, so an interrupted run can simply be started again. Each chunk prints its last learner id; pass it to
+--start-after-id to skip ahead.
+
+Use --rebuild to regenerate every snapshot, e.g. after the derived fields or
+QUESTIONS_V2 exercise mapping change.
+
+Examples:
+    python manage.py backfill_screener_snapshots
+    python manage.py backfill_screener_snapshots --batch-size 1000
+    python manage.py backfill_screener_snapshots --rebuild --start-after-id 50000
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from littleTalkApp.models import Learner, LearnerAssessmentAnswer, ScreenerSessionSnapshot
+from littleTalkApp.screener_answers import iter_screener_answers
+from littleTalkApp.screener_snapshots import build_screener_snapshots
+
+
+class Command(BaseCommand):
+    help = "Backfill screener session snapshots from LearnerAssessmentAnswer rows in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Learners processed per transaction.",
+        )
+        parser.add_argument(
+            "--start-after-id",
+            type=int,
+            default=0,
+            help="Only process learners with a primary key above this id.",
+        )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Replace existing snapshots instead of only creating missing ones.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options["batch_size"], 1)
+        last_id = options["start_after_id"]
+        learners_processed = snapshots_created = 0
+
+        learner_ids = (
+            Learner.objects.filter(answers__isnull=False).distinct().values_list("id", flat=True)
+        )
+
+        while True:
+            chunk = list(learner_ids.filter(id__gt=last_id).order_by("id")[:batch_size])
+            if not chunk:
+                break
+
+            answers = LearnerAssessmentAnswer.objects.filter(learner_id__in=chunk).order_by(
+                "learner_id", "timestamp", "id"
+            )
+            snapshots = build_screener_snapshots(iter_screener_answers(answers))
+
+            with transaction.atomic():
+                existing = ScreenerSessionSnapshot.objects.filter(learner_id__in=chunk)
+                if options["rebuild"]:
+                    existing.delete()
+                else:
+                    recorded = set(existing.values_list("learner_id", "session_id"))
+                    snapshots = [
+                        snapshot
+                        for snapshot in snapshots
+                        if (snapshot.learner_id, snapshot.session_id) not in recorded
+                    ]
+                ScreenerSessionSnapshot.objects.bulk_create(snapshots, batch_size=1000)
+
+            learners_processed += len(chunk)
+            snapshots_created += len(snapshots)
+            last_id = chunk[-1]
+            self.stdout.write(
+                f"Processed {learners_processed} learners, {snapshots_created} snapshots "
+                f"(last id {last_id})"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {snapshots_created} screener snapshots for {learners_processed} learners."
+            )
+        )
@@ -0,0 +1,98 @@
+"""
+Management command: python manage.py backfill_session_metrics
+
+Fills ExerciseSession.accuracy_percentage, elapsed_seconds and exp_earned for
+sessions recorded before those columns existed. Rows are processed in primary
+key order with one bulk_update per chunk, and only rows whose elapsed_seconds
+is still NULL are selected, so an interrupted run can simply be started again.
+Each chunk prints its last id; pass it to --start-after-id to skip ahead.
+
+exp_earned is the difference between a session's
+learner_total_exp_after_session snapshot and the learner's previous session
+snapshot. It stays NULL when either snapshot is missing. The progress_version
+of every learner touched is bumped so cached dashboard progress is refetched;
+run rebuild_daily_stats afterwards so the daily rollups use the new exp_earned.
+
+Examples:
+    python manage.py backfill_session_metrics
+    python manage.py backfill_session_metrics --batch-size 5000
+    python manage.py backfill_session_metrics --start-after-id 120000
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+
+from littleTalkApp.models import ExerciseSession, Learner
+
+
+class Command(BaseCommand):
+    help = "Backfill stored per-session metrics on ExerciseSession in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Sessions updated per bulk_update.",
+        )
+        parser.add_argument(
+            "--start-after-id",
+            type=int,
+            default=0,
+            help="Only process sessions with a primary key above this id.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options["batch_size"], 1)
+        last_id = options["start_after_id"]
+        updated = 0
+
+        previous_snapshot = (
+            ExerciseSession.objects.filter(learner=OuterRef("learner"), id__lt=OuterRef("id"))
+            .order_by("-id")
+            .values("learner_total_exp_after_session")[:1]
+        )
+
+        while True:
+            chunk = list(
+                ExerciseSession.objects.filter(id__gt=last_id, elapsed_seconds__isnull=True)
+                .annotate(previous_total_exp=Subquery(previous_snapshot))
+                .only(
+                    "id",
+                    "learner_id",
+                    "started_at",
+                    "completed_at",
+                    "total_questions",
+                    "incorrect_answers",
+                    "learner_total_exp_after_session",
+                    "exp_earned",
+                )
+                .order_by("id")[:batch_size]
+            )
+            if not chunk:
+                break
+
+            for session in chunk:
+                session.populate_derived_metrics()
+                if (
+                    session.exp_earned is None
+                    and session.learner_total_exp_after_session is not None
+                    and session.previous_total_exp is not None
+                ):
+                    session.exp_earned = (
+                        session.learner_total_exp_after_session - session.previous_total_exp
+                    )
+
+            with transaction.atomic():
+                ExerciseSession.objects.bulk_update(
+                    chunk,
+                    ["accuracy_percentage", "elapsed_seconds", "exp_earned"],
+                )
+                Learner.bump_progress_version({session.learner_id for session in chunk})
+
+            updated += len(chunk)
+            last_id = chunk[-1].id
+            self.stdout.write(f"Backfilled {updated} sessions (last id {last_id})")
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled metrics for {updated} sessions."))
@@ -0,0 +1,154 @@
+"""
+Management command: python manage.py benchmark_encrypted_fields
+
+Renders the learner dashboard, screener and logbook pages of a synthetic
+school (one log entry per learner) with eager and with lazy decryption of
+encrypted fields, and reports per page how many values were decrypted, the
+CPU time spent in Fernet and the total render time. Fixture rows are created
+inside a transaction that is rolled back, so the command leaves no data
+behind.
+
+Examples:
+    python manage.py benchmark_encrypted_fields
+    python manage.py benchmark_encrypted_fields --learners 5000 --repeat 5
+"""
+
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from encrypted_model_fields import fields as encrypted_fields
+
+from accounts.models import User
+from littleTalkApp.models import Learner, LogEntry, Profile, Role, School, SchoolMembership
+
+PAGES = ("learner_dashboard", "screener", "logbook")
+
+
+class _Rollback(Exception):
+    pass
+
+
+class _CountingCrypter:
+    """Wraps the shared MultiFernet to count decryptions and their CPU time."""
+
+    def __init__(self, crypter):
+        self.crypter = crypter
+        self.decryptions = 0
+        self.cpu_seconds = 0.0
+
+    def decrypt(self, token, *args, **kwargs):
+        started = time.process_time()
+        try:
+            return self.crypter.decrypt(token, *args, **kwargs)
+        finally:
+            self.cpu_seconds += time.process_time() - started
+            self.decryptions += 1
+
+    def __getattr__(self, name):
+        return getattr(self.crypter, name)
+
+
+class Command(BaseCommand):
+    help = "Benchmark eager vs lazy decryption of encrypted fields on listing pages."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--learners", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def _create_fixtures(self, learner_count):
+        suffix = uuid.uuid4().hex[:8]
+        user = User.objects.create_user(username=f"benchmark-{suffix}")
+        profile = Profile.objects.create(user=user, role=Role.ADMIN, first_name="Benchmark")
+        school = School.objects.create(
+            name=f"Benchmark {suffix}",
+            is_licensed=True,
+            license_expires_at=timezone.now() + timedelta(days=1),
+        )
+        profile.schools.add(school)
+        SchoolMembership.objects.create(
+            profile=profile, school=school, role=Role.ADMIN, is_active=True
+        )
+        date_of_birth = timezone.now().date() - timedelta(days=365 * 7)
+        learners = Learner.objects.bulk_create(
+            Learner(
+                user=user,
+                school=school,
+                name=f"Benchmark Learner {index:05d}",
+                date_of_birth=date_of_birth,
+            )
+            for index in range(learner_count)
+        )
+        LogEntry.objects.bulk_create(
+            LogEntry(
+                user=user,
+                learner=learner,
+                school=school,
+                title=f"Session {index}",
+                exercises_practised="Categorisation",
+                goals="Follow two-step instructions",
+                notes="Worked well with visual prompts. " * 10,
+            )
+            for index, learner in enumerate(learners)
+        )
+        return user, school
+
+    def _client(self, user, school):
+        client = Client()
+        client.force_login(user)
+        session = client.session
+        session["selected_school_id"] = school.id
+        session.save()
+        return client
+
+    def _render(self, client, url_name, repeat):
+        crypter = _CountingCrypter(encrypted_fields.CRYPTER)
+        encrypted_fields.CRYPTER = crypter
+        try:
+            started = time.perf_counter()
+            for _ in range(repeat):
+                response = client.get(reverse(url_name))
+                if response.status_code != 200:
+                    raise RuntimeError(f"{url_name} returned {response.status_code}")
+            elapsed_ms = (time.perf_counter() - started) * 1000
+        finally:
+            encrypted_fields.CRYPTER = crypter.crypter
+        return (
+            crypter.decryptions // repeat,
+            crypter.cpu_seconds * 1000 / repeat,
+            elapsed_ms / repeat,
+        )
+
+    def handle(self, *args, **options):
+        learner_count = max(options["learners"], 1)
+        repeat = max(options["repeat"], 1)
+
+        try:
+            with transaction.atomic(), override_settings(ALLOWED_HOSTS=["*"]):
+                user, school = self._create_fixtures(learner_count)
+                client = self._client(user, school)
+
+                self.stdout.write(
+                    f"{learner_count} learners, {learner_count} log entries, "
+                    f"mean of {repeat} renders"
+                )
+                for url_name in PAGES:
+                    results = {}
+                    for mode, lazy in (("eager", False), ("lazy", True)):
+                        with override_settings(ENCRYPTED_FIELDS_LAZY_DECRYPTION=lazy):
+                            results[mode] = self._render(client, url_name, repeat)
+                    for mode, (decryptions, fernet_ms, render_ms) in results.items():
+                        self.stdout.write(
+                            f"{url_name:<18} {mode:<5} decryptions={decryptions:6d} "
+                            f"fernet_cpu={fernet_ms:8.2f}ms render={render_ms:8.2f}ms"
+                        )
+                    saved_ms = results["eager"][1] - results["lazy"][1]
+                    self.stdout.write(f"{url_name:<18} saved {saved_ms:.2f}ms of Fernet CPU")
+                raise _Rollback
+        except _Rollback:
+            pass
@@ -0,0 +1,147 @@
+"""
+Management command: python manage.py benchmark_exercise_submissions
+
+Compares submit-exercise request latency for the inline path against the
+write-behind queue, then times draining the queued results. Fixture rows are
+created inside a transaction that is rolled back, so the command leaves no
+data behind.
+
+Examples:
+    python manage.py benchmark_exercise_submissions
+    python manage.py benchmark_exercise_submissions --requests 500 --learners 30
+"""
+
+import statistics
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from accounts.models import User
+from littleTalkApp.exercise_submissions import drain_pending_submissions
+from littleTalkApp.models import Learner, Profile, Role, School, SchoolMembership
+from littleTalkApp.views_modules.api import SubmitExerciseView
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _percentile(samples, percentile):
+    ordered = sorted(samples)
+    index = max(int(round(percentile / 100 * len(ordered))) - 1, 0)
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = "Benchmark inline vs write-behind exercise submission latency."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--learners", type=int, default=25)
+
+    def _create_fixtures(self, learner_count):
+        suffix = uuid.uuid4().hex[:8]
+        user = User.objects.create_user(username=f"benchmark-{suffix}")
+        profile = Profile.objects.create(user=user, role=Role.STAFF)
+        school = School.objects.create(
+            name=f"Benchmark {suffix}",
+            is_licensed=True,
+            license_expires_at=timezone.now() + timedelta(days=1),
+        )
+        profile.schools.add(school)
+        SchoolMembership.objects.create(
+            profile=profile, school=school, role=Role.STAFF, is_active=True
+        )
+        learners = [
+            Learner.objects.create(user=user, school=school, name=f"Benchmark {index}")
+            for index in range(learner_count)
+        ]
+        return user, learners
+
+    def _payload(self, nonce):
+        completed_at = timezone.now()
+        return {
+            "nonce": nonce,
+            "exp": 10,
+            "total_exercises": 1,
+            "exercise_id": "categorisation",
+            "difficulty_level": 2,
+            "difficulty_label": "2 categories",
+            "started_at": (completed_at - timedelta(minutes=2)).isoformat(),
+            "completed_at": completed_at.isoformat(),
+            "total_questions": 5,
+            "incorrect_answers": 1,
+            "attempts_per_question": [1, 1, 2, 1, 1],
+        }
+
+    def _time_submissions(self, label, user, learners, request_count):
+        factory = APIRequestFactory()
+        view = SubmitExerciseView.as_view()
+        samples = []
+        for index in range(request_count):
+            learner = learners[index % len(learners)]
+            request = factory.post(
+                f"/api/learners/{learner.learner_uuid}/submit-exercise/",
+                self._payload(f"{label}-{index}"),
+                format="json",
+            )
+            force_authenticate(request, user=user)
+            started = time.perf_counter()
+            response = view(request, learner_uuid=learner.learner_uuid)
+            samples.append((time.perf_counter() - started) * 1000)
+            if response.status_code not in (200, 202):
+                raise RuntimeError(
+                    f"{label} submission failed: {response.status_code} {response.data}"
+                )
+        return samples
+
+    def _report(self, label, samples):
+        self.stdout.write(
+            f"{label:<13} p50={statistics.median(samples):7.2f}ms "
+            f"p95={_percentile(samples, 95):7.2f}ms max={max(samples):7.2f}ms"
+        )
+
+    def handle(self, *args, **options):
+        request_count = max(options["requests"], 1)
+        learner_count = max(options["learners"], 1)
+
+        try:
+            with transaction.atomic():
+                user, learners = self._create_fixtures(learner_count)
+
+                with override_settings(EXERCISE_SUBMISSION_WRITE_BEHIND=False):
+                    inline_samples = self._time_submissions(
+                        "inline", user, learners, request_count
+                    )
+                with override_settings(EXERCISE_SUBMISSION_WRITE_BEHIND=True):
+                    queued_samples = self._time_submissions(
+                        "write-behind", user, learners, request_count
+                    )
+
+                drain_started = time.perf_counter()
+                drained = 0
+                while True:
+                    batch_drained = drain_pending_submissions()
+                    if not batch_drained:
+                        break
+                    drained += batch_drained
+                drain_ms = (time.perf_counter() - drain_started) * 1000
+
+                self.stdout.write(
+                    f"{request_count} submissions across {learner_count} learners"
+                )
+                self._report("inline", inline_samples)
+                self._report("write-behind", queued_samples)
+                self.stdout.write(
+                    f"drain         {drained} results in {drain_ms:.2f}ms "
+                    f"({drain_ms / max(drained, 1):.3f}ms per result)"
+                )
+                raise _Rollback
+        except _Rollback:
+            pass
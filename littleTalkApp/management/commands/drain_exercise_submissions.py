@@ -0,0 +1,61 @@
+"""
+Management command: python manage.py drain_exercise_submissions
+
+Applies exercise results queued by SubmitExerciseView when
+EXERCISE_SUBMISSION_WRITE_BEHIND is enabled. Runs as a long-lived worker by
+default, polling again after EXERCISE_SUBMISSION_FLUSH_LATENCY_SECONDS when the
+queue is empty. Use --once to drain what is currently queued and exit.
+
+Examples:
+    python manage.py drain_exercise_submissions
+    python manage.py drain_exercise_submissions --once
+    python manage.py drain_exercise_submissions --batch-size 1000
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from littleTalkApp.exercise_submissions import (
+    drain_pending_submissions,
+    get_drain_batch_size,
+    get_flush_latency_seconds,
+)
+
+
+class Command(BaseCommand):
+    help = "Apply queued exercise submissions in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Maximum submissions applied per transaction.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the current queue and exit instead of polling.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"] or get_drain_batch_size()
+        flush_latency = get_flush_latency_seconds()
+        total_drained = 0
+
+        try:
+            while True:
+                drained = drain_pending_submissions(batch_size)
+                total_drained += drained
+                if drained >= batch_size:
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(flush_latency)
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Drained {total_drained} queued exercise submissions.")
+        )
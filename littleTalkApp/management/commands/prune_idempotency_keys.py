@@ -0,0 +1,48 @@
+"""
+Management command: python manage.py prune_idempotency_keys
+
+Deletes expired exercise-submission IdempotencyKey rows in batches so the
+table stays small without holding long locks. Safe to run from cron.
+
+Examples:
+    python manage.py prune_idempotency_keys
+    python manage.py prune_idempotency_keys --batch-size 5000
+"""
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from littleTalkApp.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = "Delete expired exercise-submission idempotency keys in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Maximum number of rows deleted per statement.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options["batch_size"], 1)
+        cutoff = timezone.now()
+        total_deleted = 0
+
+        while True:
+            expired_ids = list(
+                IdempotencyKey.objects.filter(expires_at__lte=cutoff)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not expired_ids:
+                break
+
+            deleted_count, _ = IdempotencyKey.objects.filter(id__in=expired_ids).delete()
+            total_deleted += deleted_count
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Pruned {total_deleted} expired idempotency keys.")
+        )
@@ -0,0 +1,56 @@
+"""
+Management command: python manage.py rebuild_daily_stats
+
+Regenerates LearnerDailyStats rollups from raw ExerciseSession rows. Learners
+are processed in batches; each batch deletes and recreates its rollup rows in
+one transaction, so charts never see a half-built learner. Migration 0094
+builds the initial rollups; run this after sessions are changed with queryset
+`.update()`, which skips the signals that rebuild an edited session's day.
+
+Examples:
+    python manage.py rebuild_daily_stats
+    python manage.py rebuild_daily_stats --learner 6f1c2a4e-8d0b-4f43-9d55-0d7b1f1f8e21
+    python manage.py rebuild_daily_stats --batch-size 50
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from littleTalkApp.models import Learner, LearnerDailyStats
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-learner daily exercise rollups from ExerciseSession rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--learner",
+            help="Only rebuild rollups for the learner with this learner_uuid.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Learners rebuilt per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options["batch_size"], 1)
+
+        learner_ids = Learner.objects.order_by("id").values_list("id", flat=True)
+        if options["learner"]:
+            learner_ids = learner_ids.filter(learner_uuid=options["learner"])
+            if not learner_ids.exists():
+                raise CommandError(f"No learner with uuid {options['learner']}.")
+        learner_ids = list(learner_ids)
+
+        rows_created = 0
+        for start in range(0, len(learner_ids), batch_size):
+            batch_ids = learner_ids[start : start + batch_size]
+            rows_created += len(LearnerDailyStats.rebuild(batch_ids))
+            Learner.bump_progress_version(batch_ids)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {rows_created} daily rollups for {len(learner_ids)} learners."
+            )
+        )
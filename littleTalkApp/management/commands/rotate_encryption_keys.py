@@ -0,0 +1,221 @@
+"""
+Management command: python manage.py rotate_encryption_keys
+
+Re-encrypts every encrypted column under the primary (first) key of
+FIELD_ENCRYPTION_KEY. Deploy the new key first, listed before the old ones,
+e.g. FIELD_ENCRYPTION_KEY = [new_key, old_key]; once this command has
+finished the old keys can be removed. The learner name index is keyed by
+LEARNER_NAME_INDEX_KEY, not by these keys, so name search keeps working; the
+command refuses to run without it.
+
+Every model with an encrypted field (Learner, LogEntry, Target, Profile,
+accounts.User) is walked in primary key order, one chunk at a time. Stored
+tokens are read as text and re-encrypted with MultiFernet.rotate, so values
+are never decrypted into model instances. Each chunk is read with
+select_for_update() and written with one bulk_update in the same transaction
+as its EncryptionRotationCheckpoint, so the app can keep running: a
+concurrent write to a chunk's rows waits for it rather than being lost. An
+interrupted run therefore resumes after the last committed chunk; --restart
+discards the checkpoints for the current key. Tokens no key can decrypt are
+left untouched and reported.
+
+Examples:
+    python manage.py rotate_encryption_keys
+    python manage.py rotate_encryption_keys --batch-size 5000 --processes 3
+    python manage.py rotate_encryption_keys --models littleTalkApp.LogEntry
+    python manage.py rotate_encryption_keys --restart
+"""
+
+import hashlib
+import multiprocessing
+
+from cryptography.fernet import InvalidToken
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, models, transaction
+from django.db.models.functions import Cast
+from django.utils import timezone
+from encrypted_model_fields import fields as encrypted_fields
+
+from littleTalkApp.models import EncryptionRotationCheckpoint
+
+
+def get_key_fingerprint():
+    """Short, non-reversible identifier of the primary FIELD_ENCRYPTION_KEY."""
+    key = settings.FIELD_ENCRYPTION_KEY
+    if isinstance(key, (list, tuple)):
+        key = key[0]
+    return hashlib.sha256(str(key).encode()).hexdigest()[:16]
+
+
+def get_encrypted_models():
+    """Return {model label: [encrypted field attnames]} for every installed model."""
+    encrypted = {}
+    for model in apps.get_models():
+        attnames = [
+            field.attname
+            for field in model._meta.concrete_fields
+            if isinstance(field, encrypted_fields.EncryptedMixin)
+        ]
+        if attnames:
+            encrypted[model._meta.label] = attnames
+    return encrypted
+
+
+def rotate_model(label, batch_size, write):
+    """Rotate one model's encrypted columns from its checkpoint; return (rotated, unreadable)."""
+    model = apps.get_model(label)
+    attnames = get_encrypted_models()[label]
+    checkpoint, _ = EncryptionRotationCheckpoint.objects.get_or_create(
+        model_label=label, key_fingerprint=get_key_fingerprint()
+    )
+    if checkpoint.completed_at:
+        write(f"{label}: already rotated ({checkpoint.rows_rotated} rows)")
+        return 0, 0
+
+    # Casting to text skips the encrypted fields' from_db_value, so the raw
+    # tokens are read without being decrypted.
+    raw_columns = {f"raw_{attname}": Cast(attname, models.TextField()) for attname in attnames}
+    rows = model._base_manager.annotate(**raw_columns).values_list("pk", *raw_columns)
+    crypter = encrypted_fields.CRYPTER
+    rotated = unreadable = 0
+
+    while True:
+        # The chunk is locked from read to write, so an app write to these
+        # rows waits for the chunk instead of being overwritten by it.
+        with transaction.atomic():
+            chunk = list(
+                rows.filter(pk__gt=checkpoint.last_pk)
+                .order_by("pk")
+                .select_for_update()[:batch_size]
+            )
+            if not chunk:
+                break
+
+            instances = []
+            for pk, *tokens in chunk:
+                instance = model(pk=pk)
+                for attname, token in zip(attnames, tokens):
+                    if token:
+                        try:
+                            token = crypter.rotate(token.encode()).decode()
+                        except InvalidToken:
+                            unreadable += 1
+                            write(f"{label} pk={pk}: {attname} cannot be decrypted, left unchanged")
+                    # A plain text Value is written as is, bypassing the field's encryption.
+                    setattr(instance, attname, models.Value(token, output_field=models.TextField()))
+                instances.append(instance)
+
+            model._base_manager.bulk_update(instances, attnames)
+            checkpoint.last_pk = chunk[-1][0]
+            checkpoint.rows_rotated += len(chunk)
+            checkpoint.save(update_fields=["last_pk", "rows_rotated", "updated_at"])
+
+        rotated += len(chunk)
+        write(f"{label}: rotated {checkpoint.rows_rotated} rows (last pk {checkpoint.last_pk})")
+
+    checkpoint.completed_at = timezone.now()
+    checkpoint.save(update_fields=["completed_at", "updated_at"])
+    return rotated, unreadable
+
+
+# The command's stdout, inherited by forked workers from _init_worker.
+_worker_stdout = None
+
+
+def _init_worker(stdout):
+    global _worker_stdout
+    _worker_stdout = stdout
+
+
+def _write_from_worker(message):
+    _worker_stdout.write(message)
+    _worker_stdout.flush()
+
+
+def _rotate_model_in_worker(label, batch_size):
+    return label, *rotate_model(label, batch_size, _write_from_worker)
+
+
+class Command(BaseCommand):
+    help = "Re-encrypt all encrypted fields under the primary FIELD_ENCRYPTION_KEY in resumable chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows re-encrypted per bulk_update.",
+        )
+        parser.add_argument(
+            "--models",
+            nargs="+",
+            default=None,
+            help="Only rotate these models (app_label.ModelName).",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Rotate up to this many models in parallel worker processes.",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Discard checkpoints for the current key and start from the first row.",
+        )
+
+    def handle(self, *args, **options):
+        if not getattr(settings, "LEARNER_NAME_INDEX_KEY", None):
+            # Learner name digests must not depend on the keys being rotated.
+            raise CommandError(
+                "Set LEARNER_NAME_INDEX_KEY and run backfill_learner_name_index --rebuild "
+                "before rotating encryption keys."
+            )
+
+        batch_size = max(options["batch_size"], 1)
+        processes = max(options["processes"], 1)
+        encrypted_models = get_encrypted_models()
+
+        labels = list(encrypted_models)
+        if options["models"]:
+            by_lower = {label.lower(): label for label in encrypted_models}
+            unknown = [name for name in options["models"] if name.lower() not in by_lower]
+            if unknown:
+                raise CommandError(f"No encrypted fields on: {', '.join(unknown)}")
+            labels = [by_lower[name.lower()] for name in options["models"]]
+
+        if options["restart"]:
+            EncryptionRotationCheckpoint.objects.filter(
+                model_label__in=labels, key_fingerprint=get_key_fingerprint()
+            ).delete()
+
+        if processes > 1 and len(labels) > 1:
+            # Forked workers must not share the parent's database connections.
+            connections.close_all()
+            context = multiprocessing.get_context("fork")
+            # Fork workers receive initargs without pickling, so they can
+            # write through this command's stdout.
+            with context.Pool(
+                min(processes, len(labels)), initializer=_init_worker, initargs=(self.stdout,)
+            ) as pool:
+                results = pool.starmap(
+                    _rotate_model_in_worker, [(label, batch_size) for label in labels]
+                )
+        else:
+            results = [
+                (label, *rotate_model(label, batch_size, self.stdout.write)) for label in labels
+            ]
+
+        total_rotated = sum(rotated for _, rotated, _ in results)
+        total_unreadable = sum(unreadable for _, _, unreadable in results)
+        if total_unreadable:
+            self.stdout.write(
+                self.style.WARNING(f"{total_unreadable} values could not be decrypted with any key.")
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rotated {total_rotated} rows across {len(labels)} models."
+            )
+        )
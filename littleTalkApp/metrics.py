@@ -0,0 +1,271 @@
+"""Opt-in Prometheus metrics, safe across gunicorn workers.
+
+Enabled with METRICS_ENABLED. Every process (gunicorn worker, management
+command) keeps cumulative samples in memory and writes a snapshot to its own
+file, METRICS_DIR/<pid>.json, at most every METRICS_FLUSH_INTERVAL seconds and
+at exit. The /metrics view sums all snapshots at scrape time and renders them
+in the Prometheus text exposition format, so no state is shared between
+processes while serving requests.
+
+Snapshots of exited processes are kept so counters never go backwards; clear
+METRICS_DIR when the service is (re)started, as with prometheus_client's
+multiprocess mode.
+"""
+
+import atexit
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+
+DEFAULT_FLUSH_INTERVAL = 5
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+SYNC_DURATION_BUCKETS = (0.5, 1, 5, 10, 30, 60, 120, 300, 600)
+
+
+def is_metrics_enabled():
+    return getattr(settings, "METRICS_ENABLED", False)
+
+
+def get_metrics_dir():
+    return getattr(
+        settings,
+        "METRICS_DIR",
+        os.path.join(tempfile.gettempdir(), "littletalk-metrics"),
+    )
+
+
+class _SampleStore:
+    """Cumulative samples for this process, keyed by (sample name, labels)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._samples = {}
+        self._last_flush = 0.0
+
+    def _check_fork(self):
+        # A forked worker inherits its parent's samples, which the parent has
+        # already written (or will write) under its own pid.
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._samples = {}
+            self._last_flush = 0.0
+
+    def add(self, name, labels, amount):
+        with self._lock:
+            self._check_fork()
+            key = (name, labels)
+            self._samples[key] = self._samples.get(key, 0) + amount
+        self.maybe_flush()
+
+    def maybe_flush(self):
+        interval = getattr(settings, "METRICS_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL)
+        if time.monotonic() - self._last_flush >= interval:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            self._check_fork()
+            if not self._samples:
+                return
+            snapshot = [[name, list(labels), value] for (name, labels), value in self._samples.items()]
+            self._last_flush = time.monotonic()
+            pid = self._pid
+
+        metrics_dir = get_metrics_dir()
+        os.makedirs(metrics_dir, exist_ok=True)
+        path = os.path.join(metrics_dir, f"{pid}.json")
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w") as handle:
+            json.dump(snapshot, handle)
+        os.replace(temp_path, path)
+
+    def reset(self):
+        with self._lock:
+            self._samples = {}
+            self._last_flush = 0.0
+
+
+_store = _SampleStore()
+_registry = []
+
+
+def _flush_at_exit():
+    if is_metrics_enabled():
+        _store.flush()
+
+
+atexit.register(_flush_at_exit)
+
+
+def _label_key(metric, labels):
+    if set(labels) != set(metric.labelnames):
+        raise ValueError(f"{metric.name} expects labels {metric.labelnames}, got {sorted(labels)}")
+    return tuple((name, str(labels[name])) for name in metric.labelnames)
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _registry.append(self)
+
+    def inc(self, amount=1, **labels):
+        if amount and is_metrics_enabled():
+            _store.add(f"{self.name}_total", _label_key(self, labels), amount)
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        _registry.append(self)
+
+    def observe(self, value, **labels):
+        if not is_metrics_enabled():
+            return
+        label_key = _label_key(self, labels)
+        for bound in self.buckets:
+            if value <= bound:
+                _store.add(f"{self.name}_bucket", label_key + (("le", _format_value(float(bound))),), 1)
+        _store.add(f"{self.name}_sum", label_key, value)
+        _store.add(f"{self.name}_count", label_key, 1)
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+def _escape_label_value(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def collect_samples():
+    """Return {(sample name, labels): value} summed over every process snapshot."""
+    _store.flush()
+    totals = {}
+    metrics_dir = get_metrics_dir()
+    if not os.path.isdir(metrics_dir):
+        return totals
+
+    for filename in os.listdir(metrics_dir):
+        if not filename.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(metrics_dir, filename)) as handle:
+                snapshot = json.load(handle)
+        except (OSError, ValueError):
+            continue  # removed or being replaced mid-scrape
+        for name, labels, value in snapshot:
+            key = (name, tuple(tuple(pair) for pair in labels))
+            totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+def _metric_samples(metric, samples):
+    """Return the metric's samples in exposition order (histogram buckets by bound)."""
+    suffixes = ("_bucket", "_sum", "_count") if metric.type == "histogram" else ("_total",)
+    sample_names = {f"{metric.name}{suffix}": position for position, suffix in enumerate(suffixes)}
+
+    def sort_key(item):
+        (name, labels), _ = item
+        le = dict(labels).get("le")
+        plain_labels = tuple(pair for pair in labels if pair[0] != "le")
+        bound = math.inf if le == "+Inf" else float(le) if le is not None else 0
+        return plain_labels, sample_names[name], bound
+
+    return sorted(
+        (item for item in samples.items() if item[0][0] in sample_names), key=sort_key
+    )
+
+
+def render_metrics():
+    """Render every registered metric in the Prometheus text format (0.0.4)."""
+    samples = collect_samples()
+    lines = []
+    for metric in _registry:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        for (name, labels), value in _metric_samples(metric, samples):
+            label_text = ",".join(f'{key}="{_escape_label_value(val)}"' for key, val in labels)
+            label_text = f"{{{label_text}}}" if label_text else ""
+            lines.append(f"{name}{label_text} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def timed_sync(entity):
+    """Decorate a Skolon sync function to record its duration and item count."""
+
+    def decorator(sync_function):
+        @wraps(sync_function)
+        def wrapper(*args, **kwargs):
+            with SKOLON_SYNC_DURATION.time(entity=entity):
+                result = sync_function(*args, **kwargs)
+            SKOLON_SYNC_ITEMS.inc(len(result.get("items") or []), entity=entity)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+REQUEST_LATENCY = Histogram(
+    "littletalk_http_request_duration_seconds",
+    "Request latency by URL name.",
+    ("view", "method"),
+)
+REQUEST_QUERIES = Histogram(
+    "littletalk_http_request_queries",
+    "SQL queries per request by URL name.",
+    ("view",),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+EXERCISE_SUBMISSIONS = Counter(
+    "littletalk_exercise_submissions",
+    "Exercise results accepted, by how they were recorded.",
+    ("mode",),
+)
+DUPLICATE_NONCE_REJECTIONS = Counter(
+    "littletalk_duplicate_nonce_rejections",
+    "Exercise submissions answered from an existing nonce instead of being recorded.",
+    ("endpoint",),
+)
+SKOLON_SYNC_DURATION = Histogram(
+    "littletalk_skolon_sync_duration_seconds",
+    "Skolon sync duration by entity.",
+    ("entity",),
+    buckets=SYNC_DURATION_BUCKETS,
+)
+SKOLON_SYNC_ITEMS = Counter(
+    "littletalk_skolon_sync_items",
+    "Items fetched from Skolon by entity.",
+    ("entity",),
+)
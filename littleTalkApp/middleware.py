@@ -1,7 +1,19 @@
+import logging
+import re
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
 from django.shortcuts import redirect
-from django.urls import reverse, resolve
-from django.utils.deprecation import MiddlewareMixin
+from django.urls import get_resolver
+from django.urls.resolvers import RegexPattern, RoutePattern, URLResolver
+from .access import get_access_context
+from .metrics import REQUEST_LATENCY, REQUEST_QUERIES, is_metrics_enabled
 from .models import Role
+from .query_budget import get_query_budget, record_queries
+
+logger = logging.getLogger(__name__)
 
 
 class NoCacheHtmlMiddleware:
@@ -25,173 +37,256 @@ class NoCacheHtmlMiddleware:
         return response
 
 
-class AccessControlMiddleware(MiddlewareMixin):
-    """
-    Restricts access based on parent subscription or school license.
-    Allows /login/, /logout/, /profile/, /subscribe/, /license-expired/
+class QueryBudgetMiddleware:
     """
+    Debug aid: count SQL queries per request and flag views over budget.
 
-    def process_view(self, request, view_func, view_args, view_kwargs):
-        user = request.user
-        path = request.path
-
-        # Allow unauthenticated users to access login/logout
-        allowed_paths = [
-            reverse("login"),
-            reverse("logout"),
-            reverse("profile"),
-            reverse("school"),
-            reverse("select_school"),
-            reverse("select_learner"),
-            reverse("subscribe"),
-            reverse("license_expired"),
-            reverse("settings"),
-            reverse("logbook"),
-            reverse("support"),
-            reverse("access_restricted"),
-        ]
-
-        if any(path.startswith(ap) for ap in allowed_paths):
-            return None
-
-        if not user.is_authenticated:
-            return None  # Let login-required decorators handle it
-
-        profile = getattr(user, "profile", None)
-
-        if not profile:
-            return None
+    Active when DEBUG or QUERY_BUDGET_ENABLED is set. In DEBUG the response
+    carries X-Query-Count, X-Query-Time-Ms and X-Query-Duplicates headers.
+    Requests whose query count exceeds the view's budget (see
+    query_budget.get_query_budget) are logged with the most repeated statement.
+    """
 
-        # --- Parent User Logic ---
-        if profile.role == Role.PARENT:
-            parent_profile = getattr(profile, "parent_profile", None)
-            if parent_profile and not parent_profile.has_access():
-                return redirect("subscribe")
+    def __init__(self, get_response):
+        if not (settings.DEBUG or getattr(settings, "QUERY_BUDGET_ENABLED", False)):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
 
-        # --- School Staff Logic (per-school roles) ---
-        # Determine selected/current school then check the role for that school.
-        has_multiple_schools = (
-            hasattr(profile, "has_multiple_schools") and profile.has_multiple_schools()
-        )
+    def __call__(self, request):
+        with record_queries() as stats:
+            response = self.get_response(request)
 
-        accessible_schools = (
-            profile.get_accessible_schools()
-            if hasattr(profile, "get_accessible_schools")
-            else profile.schools.all()
-        )
+        if settings.DEBUG:
+            response["X-Query-Count"] = str(stats.count)
+            response["X-Query-Time-Ms"] = str(stats.duration_ms)
+            response["X-Query-Duplicates"] = str(stats.duplicate_count)
 
-        if has_multiple_schools:
-            selected_id = request.session.get("selected_school_id")
-            if not selected_id:
-                return None
-            school = accessible_schools.filter(id=selected_id).first()
-            if not school:
-                return None
-        else:
-            school = (
-                profile.get_current_school(request)
-                if hasattr(profile, "get_current_school")
-                else None
+        match = getattr(request, "resolver_match", None)
+        view_name = match.view_name if match else request.path_info
+        budget = get_query_budget(view_name)
+        if stats.count > budget:
+            duplicates = stats.duplicates()
+            logger.warning(
+                "Query budget exceeded for %s: %s queries (budget %s, %.2f ms, %s duplicates)%s",
+                view_name,
+                stats.count,
+                budget,
+                stats.duration_ms,
+                stats.duplicate_count,
+                f"; most repeated ({duplicates[0][1]}x): {duplicates[0][0]}" if duplicates else "",
             )
 
-        if school:
-            role_for = profile.get_role_for_school(school)
-            # Check staff-like roles for this school (include legacy 'manager')
-            if role_for in [Role.ADMIN, Role.TEAM_MANAGER, Role.STAFF, "manager"]:
-                if not school.has_valid_license():
-                    return redirect("license_expired")
-
-        return None
+        return response
 
 
-class SchoolSelectionMiddleware:
+class MetricsMiddleware:
     """
-    Ensure users with multiple schools have selected one.
-    Redirects to school selection if needed.
+    Records request latency and SQL query count per URL name for /metrics.
+
+    Active only when METRICS_ENABLED is set. Requests that match no route are
+    grouped under "<unresolved>" so arbitrary paths cannot create new series.
     """
+
     def __init__(self, get_response):
+        if not is_metrics_enabled():
+            raise MiddlewareNotUsed
         self.get_response = get_response
 
     def __call__(self, request):
-        # Process request
-        if self._should_redirect_to_school_selection(request):
-            return redirect('select_school')
-            
-        response = self.get_response(request)
+        started = time.perf_counter()
+        with record_queries() as stats:
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        match = getattr(request, "resolver_match", None)
+        view_name = match.view_name if match else "<unresolved>"
+        REQUEST_LATENCY.observe(elapsed, view=view_name, method=request.method)
+        REQUEST_QUERIES.observe(stats.count, view=view_name)
         return response
-        
-    def _should_redirect_to_school_selection(self, request):
-        # Skip if not authenticated
-        if not request.user.is_authenticated:
-            return False
-            
-        # Get current URL name
-        try:
-            url_name = resolve(request.path_info).url_name
-        except Exception:
-            url_name = ''
-            
-        # Skip middleware for these paths
-        skip_urls = {
-            'select_school',
-            'license_expired',
-            'access_restricted',
-            'logout',
-            'static',
-            'media',
-            'support',
-            'sso_callback',
-            'sso_launch',
-        }
-        if url_name in skip_urls:
-            return False
-            
-        # Skip for parent users
-        if hasattr(request.user, 'profile') and request.user.profile.is_parent():
-            return False
-            
-        # Check if user needs to select a school
-        profile = getattr(request.user, 'profile', None)
-        if profile and profile.has_multiple_schools():
-            # Needs selection if no school is selected in session
-            selected_id = request.session.get('selected_school_id')
-            if not selected_id:
-                return True
-                
-            # Or if selected school isn't valid for this user
-            if not profile.get_accessible_schools().filter(id=selected_id).exists():
-                return True
-                
-        return False
-
-
-class RoleSchoolBlockMiddleware:
+
+
+# URL names whose paths (and every path below them) skip the parent
+# subscription and school license gates.
+LICENSE_EXEMPT_URL_NAMES = (
+    "login",
+    "logout",
+    "profile",
+    "school",
+    "select_school",
+    "select_learner",
+    "subscribe",
+    "license_expired",
+    "settings",
+    "logbook",
+    "support",
+    "access_restricted",
+)
+
+# URL names reachable by a multi-school user who has not selected a school.
+SCHOOL_SELECTION_EXEMPT_URL_NAMES = frozenset({
+    "select_school",
+    "license_expired",
+    "access_restricted",
+    "logout",
+    "static",
+    "media",
+    "support",
+    "sso_callback",
+    "sso_launch",
+})
+
+# URL names reachable by a staff user without any school.
+SCHOOL_REQUIRED_EXEMPT_URL_NAMES = frozenset({"access_restricted", "logout", "support"})
+
+_REGEX_LITERAL_PREFIX = re.compile(r"[^\\.^$*+?{}\[\]|()]*")
+
+
+class RoutePolicy:
+    """Which access checks apply to one route. Built once per URLconf."""
+
+    __slots__ = ("school_required", "school_selection_required", "parent_gated", "license_gated")
+
+    def __init__(self, *, school_required, school_selection_required, gated):
+        self.school_required = school_required
+        self.school_selection_required = school_selection_required
+        self.parent_gated = gated
+        self.license_gated = gated
+
+
+def _literal_prefix(pattern):
+    """Return the fixed leading text every path matching `pattern` starts with."""
+    if isinstance(pattern, RoutePattern):
+        return pattern._route.split("<", 1)[0]
+    if isinstance(pattern, RegexPattern):
+        return _REGEX_LITERAL_PREFIX.match(pattern._regex.lstrip("^")).group()
+    return ""
+
+
+def _iter_routes(resolver, prefix="", namespace=""):
+    """Yield (view_name, url_name, literal path prefix, fully literal) per named route."""
+    for entry in resolver.url_patterns:
+        entry_prefix = _literal_prefix(entry.pattern)
+        if isinstance(entry, URLResolver):
+            entry_namespace = f"{namespace}{entry.namespace}:" if entry.namespace else namespace
+            yield from _iter_routes(entry, prefix + entry_prefix, entry_namespace)
+        elif entry.name:
+            is_literal = entry_prefix == str(entry.pattern).lstrip("^").rstrip("$")
+            yield f"{namespace}{entry.name}", entry.name, prefix + entry_prefix, is_literal
+
+
+def _is_license_exempt(path, exempt_prefixes):
+    return path.startswith(exempt_prefixes)
+
+
+@lru_cache(maxsize=None)
+def compile_route_policies(urlconf=None):
+    """Map each named route (by view name) to its RoutePolicy.
+
+    The parent/license gates exempt everything below the exempt URLs' paths, so
+    a route is exempt when its fixed leading text already starts with one of
+    them. Routes whose path could only *sometimes* fall under an exempt path
+    (an exempt path extends into a converter) are left out of the table and
+    decided by path at request time, as are unnamed routes.
+    """
+
+    routes = list(_iter_routes(get_resolver(urlconf)))
+    exempt_names = set(LICENSE_EXEMPT_URL_NAMES)
+    exempt_prefixes = tuple(
+        path for view_name, _, path, is_literal in routes if view_name in exempt_names and is_literal
+    )
+
+    policies = {}
+    for view_name, url_name, path, is_literal in routes:
+        exempt = _is_license_exempt(path, exempt_prefixes)
+        if not exempt and not is_literal and any(p.startswith(path) for p in exempt_prefixes):
+            continue
+        policies[view_name] = RoutePolicy(
+            school_required=url_name not in SCHOOL_REQUIRED_EXEMPT_URL_NAMES,
+            school_selection_required=url_name not in SCHOOL_SELECTION_EXEMPT_URL_NAMES,
+            gated=not exempt,
+        )
+    return policies, exempt_prefixes
+
+
+class AccessPolicyMiddleware:
     """
-    Blocks users from accessing the app if:
-    - user.profile.role != "parent"
-    - AND user.profile has no associated schools
+    Applies every school/subscription access gate in one pass per request.
+
+    Runs in process_view, so it reuses the URL match Django already made and
+    looks the route up in the table from compile_route_policies(). Checks run
+    in order and the first failure redirects:
+
+    1. staff without any accessible school -> access_restricted
+    2. multi-school staff without a valid selected school -> select_school
+    3. parents without an active subscription -> subscribe
+    4. staff at a school whose license has lapsed -> license_expired
     """
 
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
-        user = request.user
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Settings that still list the pre-consolidation middlewares install
+        # this class several times; only the first instance does any work.
+        if getattr(request, "_access_policy_applied", False):
+            return None
+        request._access_policy_applied = True
 
-        try:
-            url_name = resolve(request.path_info).url_name
-        except Exception:
-            url_name = ""
+        if not request.user.is_authenticated:
+            return None  # Let login-required decorators handle it
 
-        if url_name in {"access_restricted", "logout", "support"}:
-            return self.get_response(request)
+        access = get_access_context(request)
+        if access is None:
+            return None
 
-        if user.is_authenticated:
-            profile = getattr(user, "profile", None)
-            if profile:
-                # If this user is staff (non-parent) and has no associated
-                # schools, block access.
-                if profile.role != Role.PARENT and not profile.get_accessible_schools().exists():
-                    return redirect("access_restricted")
+        policy = self._policy_for(request)
 
-        return self.get_response(request)
+        if access.is_parent:
+            if policy.parent_gated:
+                parent_profile = getattr(request.user.profile, "parent_profile", None)
+                if parent_profile and not parent_profile.has_access():
+                    return redirect("subscribe")
+            return None
+
+        if policy.school_required and not access.has_schools:
+            return redirect("access_restricted")
+
+        selected_id = request.session.get("selected_school_id")
+        if access.has_multiple_schools:
+            school = access.get_school(selected_id) if selected_id else None
+            if school is None:
+                if policy.school_selection_required:
+                    return redirect("select_school")
+                return None
+        else:
+            school = access.current_school(request)
+
+        if policy.license_gated and school and access.is_staff_for_school(school):
+            if not school.has_valid_license():
+                return redirect("license_expired")
+
+        return None
+
+    @staticmethod
+    def _policy_for(request):
+        policies, exempt_prefixes = compile_route_policies(getattr(request, "urlconf", None))
+        match = request.resolver_match
+        policy = policies.get(match.view_name)
+        if policy is None:
+            url_name = match.url_name or ""
+            policy = RoutePolicy(
+                school_required=url_name not in SCHOOL_REQUIRED_EXEMPT_URL_NAMES,
+                school_selection_required=url_name not in SCHOOL_SELECTION_EXEMPT_URL_NAMES,
+                gated=not _is_license_exempt(request.path_info.lstrip("/"), exempt_prefixes),
+            )
+        return policy
+
+
+# Former names of the checks folded into AccessPolicyMiddleware, kept so
+# existing MIDDLEWARE settings keep working. Listing more than one is harmless.
+AccessControlMiddleware = AccessPolicyMiddleware
+RoleSchoolBlockMiddleware = AccessPolicyMiddleware
+SchoolSelectionMiddleware = AccessPolicyMiddleware
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("littleTalkApp", "0079_idempotencykey"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PendingExerciseSubmission",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("payload", models.JSONField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "learner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="pending_submissions",
+                        to="littleTalkApp.learner",
+                    ),
+                ),
+            ],
+        ),
+    ]
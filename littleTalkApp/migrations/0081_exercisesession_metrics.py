@@ -0,0 +1,28 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("littleTalkApp", "0080_pendingexercisesubmission"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="exercisesession",
+            name="accuracy_percentage",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="exercisesession",
+            name="elapsed_seconds",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="exercisesession",
+            name="exp_earned",
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
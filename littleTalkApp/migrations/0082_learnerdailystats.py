@@ -0,0 +1,53 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("littleTalkApp", "0081_exercisesession_metrics"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LearnerDailyStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("exercise_id", models.CharField(max_length=255)),
+                ("session_count", models.PositiveIntegerField(default=0)),
+                ("accuracy_sum", models.FloatField(default=0)),
+                ("accuracy_count", models.PositiveIntegerField(default=0)),
+                ("difficulty_sum", models.FloatField(default=0)),
+                ("difficulty_count", models.PositiveIntegerField(default=0)),
+                ("elapsed_seconds_total", models.PositiveBigIntegerField(default=0)),
+                ("exp_total", models.IntegerField(default=0)),
+                (
+                    "learner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_stats",
+                        to="littleTalkApp.learner",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("learner", "date", "exercise_id"),
+                        name="daily_stats_learner_date_exercise_uniq",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:46
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def populate_last_exercise_at(apps, schema_editor):
+    Learner = apps.get_model("littleTalkApp", "Learner")
+    ExerciseSession = apps.get_model("littleTalkApp", "ExerciseSession")
+
+    latest_session = (
+        ExerciseSession.objects.filter(learner=OuterRef("pk"))
+        .order_by("-created_at")
+        .values("created_at")[:1]
+    )
+    Learner.objects.update(last_exercise_at=Subquery(latest_session))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("littleTalkApp", "0082_learnerdailystats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="learner",
+            name="last_exercise_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(
+            populate_last_exercise_at,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
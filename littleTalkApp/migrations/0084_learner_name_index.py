@@ -0,0 +1,66 @@
+# Generated by Django 5.1.3 on 2026-10-18 17:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("littleTalkApp", "0083_learner_last_exercise_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="learner",
+            name="name_index",
+            field=models.CharField(
+                blank=True, db_index=True, editable=False, max_length=32, null=True
+            ),
+        ),
+        migrations.CreateModel(
+            name="LearnerNameToken",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("token", models.CharField(max_length=32)),
+                (
+                    "learner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="name_tokens",
+                        to="littleTalkApp.learner",
+                    ),
+                ),
+                (
+                    "school",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="littleTalkApp.school",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["school", "token"], name="learner_name_token_lookup"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("learner", "token"), name="learner_name_token_uniq"
+                    )
+                ],
+            },
+        ),
+    ]
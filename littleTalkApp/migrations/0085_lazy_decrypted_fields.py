@@ -0,0 +1,54 @@
+# Generated by Django 5.1.3 on 2026-10-18 17:09
+
+import littleTalkApp.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("littleTalkApp", "0084_learner_name_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="learner",
+            name="date_of_birth",
+            field=littleTalkApp.fields.EncryptedDateField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="learner",
+            name="name",
+            field=littleTalkApp.fields.EncryptedCharField(),
+        ),
+        migrations.AlterField(
+            model_name="logentry",
+            name="exercises_practised",
+            field=littleTalkApp.fields.EncryptedTextField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="logentry",
+            name="goals",
+            field=littleTalkApp.fields.EncryptedTextField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="logentry",
+            name="notes",
+            field=littleTalkApp.fields.EncryptedTextField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="logentry",
+            name="title",
+            field=littleTalkApp.fields.EncryptedCharField(),
+        ),
+        migrations.AlterField(
+            model_name="profile",
+            name="first_name",
+            field=littleTalkApp.fields.EncryptedCharField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="target",
+            name="text",
+            field=littleTalkApp.fields.EncryptedCharField(),
+        ),
+    ]
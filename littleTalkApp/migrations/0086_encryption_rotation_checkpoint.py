@@ -0,0 +1,41 @@
+# Generated by Django 5.1.3 on 2026-10-18 17:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("littleTalkApp", "0085_lazy_decrypted_fields"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EncryptionRotationCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("model_label", models.CharField(max_length=100)),
+                ("key_fingerprint", models.CharField(max_length=16)),
+                ("last_pk", models.BigIntegerField(default=0)),
+                ("rows_rotated", models.BigIntegerField(default=0)),
+                ("completed_at", models.DateTimeField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("model_label", "key_fingerprint"),
+                        name="encryption_rotation_checkpoint_uniq",
+                    )
+                ],
+            },
+        ),
+    ]
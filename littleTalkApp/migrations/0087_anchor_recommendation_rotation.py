@@ -0,0 +1,27 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:05
+
+from django.db import migrations
+from django.utils import timezone
+
+
+def anchor_recommendation_rotation(apps, schema_editor):
+    # The practise page used to set a missing anchor on first view; the
+    # rotation is now computed read-only, so every learner needs one.
+    Learner = apps.get_model("littleTalkApp", "Learner")
+    Learner.objects.filter(recommendation_index_updated_at__isnull=True).update(
+        recommendation_index_updated_at=timezone.now()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("littleTalkApp", "0086_encryption_rotation_checkpoint"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            anchor_recommendation_rotation,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.1.3 on 2026-10-18 17:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("littleTalkApp", "0087_anchor_recommendation_rotation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScreenerSessionSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("session_id", models.UUIDField()),
+                ("screener_version", models.IntegerField(default=2)),
+                ("started_at", models.DateTimeField()),
+                ("assessment_date", models.DateField(blank=True, null=True)),
+                ("strong_skills", models.JSONField(default=list)),
+                ("support_skills", models.JSONField(default=list)),
+                ("readiness_status", models.CharField(max_length=16)),
+                ("support_skills_by_exercise", models.JSONField(default=dict)),
+                ("stage_mastery", models.JSONField(default=dict)),
+                (
+                    "allowed_max_stage",
+                    models.PositiveSmallIntegerField(blank=True, null=True),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "learner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="screener_snapshots",
+                        to="littleTalkApp.learner",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["learner", "screener_version", "-started_at"],
+                        name="screener_snapshot_latest",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("learner", "session_id"),
+                        name="screener_snapshot_learner_session_uniq",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("littleTalkApp", "0088_screenersessionsnapshot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScreenerQuestion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("screener_version", models.PositiveSmallIntegerField()),
+                ("order", models.PositiveSmallIntegerField()),
+                ("revision", models.PositiveSmallIntegerField(default=1)),
+                ("topic", models.CharField(max_length=100)),
+                ("skill", models.CharField(max_length=100)),
+                ("text", models.TextField()),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("screener_version", "order", "revision"),
+                        name="screener_question_revision_uniq",
+                    )
+                ],
+            },
+        ),
+        # Frees the question_id column for the catalogue foreign key.
+        migrations.RenameField(
+            model_name="learnerassessmentanswer",
+            old_name="question_id",
+            new_name="legacy_question_id",
+        ),
+        migrations.AlterField(
+            model_name="learnerassessmentanswer",
+            name="legacy_question_id",
+            field=models.IntegerField(null=True),
+        ),
+        migrations.AlterField(
+            model_name="learnerassessmentanswer",
+            name="topic",
+            field=models.CharField(max_length=100, null=True),
+        ),
+        migrations.AlterField(
+            model_name="learnerassessmentanswer",
+            name="skill",
+            field=models.CharField(max_length=100, null=True),
+        ),
+        migrations.AlterField(
+            model_name="learnerassessmentanswer",
+            name="text",
+            field=models.TextField(null=True),
+        ),
+        migrations.AlterField(
+            model_name="learnerassessmentanswer",
+            name="answer",
+            field=models.CharField(max_length=10, null=True),
+        ),
+        migrations.AddField(
+            model_name="learnerassessmentanswer",
+            name="question",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="answers",
+                to="littleTalkApp.screenerquestion",
+            ),
+        ),
+        migrations.AddField(
+            model_name="learnerassessmentanswer",
+            name="answered_yes",
+            field=models.BooleanField(null=True),
+        ),
+    ]
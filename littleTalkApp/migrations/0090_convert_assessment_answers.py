@@ -0,0 +1,122 @@
+from django.db import migrations, transaction
+
+from littleTalkApp.content.assessments import QUESTIONS
+from littleTalkApp.content.assessments_v2 import QUESTIONS_V2
+
+BATCH_SIZE = 2000
+
+CONTENT = {1: QUESTIONS, 2: QUESTIONS_V2}
+
+
+def _catalogue(ScreenerQuestion):
+    """Return ({(version, order, topic, skill, text): pk}, {(version, order): max revision})."""
+
+    by_wording = {}
+    revisions = {}
+    for question in ScreenerQuestion.objects.all():
+        key = (question.screener_version, question.order)
+        by_wording[key + (question.topic, question.skill, question.text)] = question.pk
+        revisions[key] = max(revisions.get(key, 0), question.revision)
+    return by_wording, revisions
+
+
+def convert_answers(apps, schema_editor):
+    ScreenerQuestion = apps.get_model("littleTalkApp", "ScreenerQuestion")
+    LearnerAssessmentAnswer = apps.get_model("littleTalkApp", "LearnerAssessmentAnswer")
+
+    by_wording, revisions = _catalogue(ScreenerQuestion)
+    for version, questions in CONTENT.items():
+        for question in questions:
+            key = (version, question["order"])
+            wording = key + (question["topic"], question["skill"], question["text"])
+            if wording in by_wording:
+                continue
+            revisions[key] = revisions.get(key, 0) + 1
+            by_wording[wording] = ScreenerQuestion.objects.create(
+                screener_version=version,
+                order=question["order"],
+                revision=revisions[key],
+                topic=question["topic"],
+                skill=question["skill"],
+                text=question["text"],
+            ).pk
+
+    # Answers whose wording no longer matches the content (edited questions,
+    # or V1 answers saved with the default version 2) get their own revision,
+    # so no text is lost. Unconverted rows are selected afresh each batch, so
+    # an interrupted run resumes where it stopped.
+    pending = LearnerAssessmentAnswer.objects.filter(question__isnull=True).order_by(
+        "pk"
+    )
+    while True:
+        with transaction.atomic():
+            batch = list(
+                pending.only(
+                    "legacy_question_id",
+                    "topic",
+                    "skill",
+                    "text",
+                    "answer",
+                    "screener_version",
+                )[:BATCH_SIZE]
+            )
+            if not batch:
+                break
+            for answer in batch:
+                key = (answer.screener_version, answer.legacy_question_id)
+                wording = key + (
+                    answer.topic or "",
+                    answer.skill or "",
+                    answer.text or "",
+                )
+                if wording not in by_wording:
+                    revisions[key] = revisions.get(key, 0) + 1
+                    by_wording[wording] = ScreenerQuestion.objects.create(
+                        screener_version=answer.screener_version,
+                        order=answer.legacy_question_id,
+                        revision=revisions[key],
+                        topic=wording[2],
+                        skill=wording[3],
+                        text=wording[4],
+                    ).pk
+                answer.question_id = by_wording[wording]
+                # The UI only sends Yes/No; summaries counted anything else as strong.
+                answer.answered_yes = str(answer.answer).strip().lower() != "no"
+            LearnerAssessmentAnswer.objects.bulk_update(
+                batch, ["question", "answered_yes"]
+            )
+
+
+def restore_answer_text(apps, schema_editor):
+    LearnerAssessmentAnswer = apps.get_model("littleTalkApp", "LearnerAssessmentAnswer")
+
+    pending = LearnerAssessmentAnswer.objects.filter(
+        legacy_question_id__isnull=True, question__isnull=False
+    ).order_by("pk")
+    while True:
+        with transaction.atomic():
+            batch = list(pending.select_related("question")[:BATCH_SIZE])
+            if not batch:
+                break
+            for answer in batch:
+                answer.legacy_question_id = answer.question.order
+                answer.topic = answer.question.topic
+                answer.skill = answer.question.skill
+                answer.text = answer.question.text
+                answer.answer = "Yes" if answer.answered_yes else "No"
+            LearnerAssessmentAnswer.objects.bulk_update(
+                batch, ["legacy_question_id", "topic", "skill", "text", "answer"]
+            )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("littleTalkApp", "0089_screenerquestion"),
+    ]
+
+    operations = [
+        migrations.RunPython(convert_answers, reverse_code=restore_answer_text),
+    ]
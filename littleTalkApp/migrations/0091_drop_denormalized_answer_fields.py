@@ -0,0 +1,48 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("littleTalkApp", "0090_convert_assessment_answers"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="learnerassessmentanswer",
+            name="legacy_question_id",
+        ),
+        migrations.RemoveField(
+            model_name="learnerassessmentanswer",
+            name="topic",
+        ),
+        migrations.RemoveField(
+            model_name="learnerassessmentanswer",
+            name="skill",
+        ),
+        migrations.RemoveField(
+            model_name="learnerassessmentanswer",
+            name="text",
+        ),
+        migrations.RemoveField(
+            model_name="learnerassessmentanswer",
+            name="answer",
+        ),
+        migrations.AlterField(
+            model_name="learnerassessmentanswer",
+            name="question",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="answers",
+                to="littleTalkApp.screenerquestion",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="learnerassessmentanswer",
+            name="answered_yes",
+            field=models.BooleanField(),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-18 17:47
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("littleTalkApp", "0091_drop_denormalized_answer_fields"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="access_version",
+            field=models.UUIDField(default=uuid.uuid4, editable=False),
+        ),
+    ]
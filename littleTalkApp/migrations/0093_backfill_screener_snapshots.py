@@ -0,0 +1,176 @@
+from django.db import migrations, transaction
+
+BATCH_SIZE = 200
+
+READINESS_SKILL = "Attention and listening"
+MOSTLY_YES_THRESHOLD = 0.6
+
+# Screener V2 question order -> (exercise_id, stage, is_readiness), frozen from
+# QUESTIONS_V2 when this migration was written. Later content changes are
+# applied with `manage.py backfill_screener_snapshots --rebuild`.
+V2_QUESTIONS = {
+    1: (None, None, True),
+    2: (None, None, True),
+    3: ("whats-in-the-bag", 1, False),
+    4: ("whats-in-the-bag", 1, False),
+    5: ("spot-on", 1, False),
+    6: ("whos-who", 1, False),
+    7: ("colourful-semantics-early", 1, False),
+    8: ("colourful-semantics", 2, False),
+    9: ("concept-quest", 2, False),
+    10: ("categorisation", 2, False),
+    11: ("story-train", 2, False),
+    12: ("think-and-find", 2, False),
+    13: ("story-train", 2, False),
+    14: ("story-train-plus", 3, False),
+    15: ("in-the-know", 3, False),
+    16: ("colourful-semantics-plus", 3, False),
+    17: ("what-happens-next", 3, False),
+    18: ("task-master", 3, False),
+    19: ("in-the-know", 3, False),
+}
+
+ANSWER_FIELDS = (
+    "learner_id",
+    "session_id",
+    "screener_version",
+    "question__order",
+    "question__skill",
+    "answered_yes",
+    "timestamp",
+    "assessment_date",
+)
+
+
+def _stage_mastery(answered_yes_by_order):
+    stage_stats = {stage: [0, 0] for stage in (1, 2, 3)}
+    for order, answered_yes in answered_yes_by_order.items():
+        _, stage, is_readiness = V2_QUESTIONS.get(order, (None, None, True))
+        if is_readiness or stage not in stage_stats:
+            continue
+        stage_stats[stage][1] += 1
+        if answered_yes:
+            stage_stats[stage][0] += 1
+
+    mastery = {
+        stage: (yes / total if total else 0.0) >= MOSTLY_YES_THRESHOLD
+        for stage, (yes, total) in stage_stats.items()
+    }
+    allowed_max_stage = 1
+    if mastery[1]:
+        allowed_max_stage = 2
+    if mastery[1] and mastery[2]:
+        allowed_max_stage = 3
+    return {str(stage): mastered for stage, mastered in mastery.items()}, allowed_max_stage
+
+
+def _snapshot_fields(screener_version, answers):
+    """Return the ScreenerSessionSnapshot fields of one session's answer rows.
+
+    A frozen copy of screener_snapshots.build_screener_snapshot, so later
+    changes to it cannot change what this migration writes.
+    """
+
+    skill_answers = {}
+    readiness_answers = []
+    support_skills_by_exercise = {}
+    for _, _, _, order, skill, answered_yes, _, _ in answers:
+        skill_answers.setdefault(skill, []).append(answered_yes)
+        if skill == READINESS_SKILL:
+            readiness_answers.append(answered_yes)
+        if screener_version == 2 and not answered_yes:
+            exercise_id = V2_QUESTIONS.get(order, (None,))[0]
+            if exercise_id:
+                skills = support_skills_by_exercise.setdefault(exercise_id, [])
+                if skill not in skills:
+                    skills.append(skill)
+
+    if False in readiness_answers:
+        readiness_status = "not_ready"
+    elif readiness_answers:
+        readiness_status = "ready"
+    else:
+        readiness_status = "mixed"
+
+    stage_mastery, allowed_max_stage = {}, None
+    if screener_version == 2:
+        stage_mastery, allowed_max_stage = _stage_mastery(
+            {order: answered_yes for _, _, _, order, _, answered_yes, _, _ in answers}
+        )
+
+    return {
+        "started_at": min(answer[6] for answer in answers),
+        "assessment_date": min((answer[7] for answer in answers if answer[7]), default=None),
+        "strong_skills": [skill for skill, yes in skill_answers.items() if all(yes)],
+        "support_skills": [skill for skill, yes in skill_answers.items() if not all(yes)],
+        "readiness_status": readiness_status,
+        "support_skills_by_exercise": support_skills_by_exercise,
+        "stage_mastery": stage_mastery,
+        "allowed_max_stage": allowed_max_stage,
+    }
+
+
+def backfill_screener_snapshots(apps, schema_editor):
+    """Create the snapshots of sessions saved before ScreenerSessionSnapshot existed.
+
+    Learners are taken in primary key order, and sessions that already have
+    a snapshot are skipped, so an interrupted run resumes where it stopped.
+    """
+
+    Learner = apps.get_model("littleTalkApp", "Learner")
+    LearnerAssessmentAnswer = apps.get_model("littleTalkApp", "LearnerAssessmentAnswer")
+    ScreenerSessionSnapshot = apps.get_model("littleTalkApp", "ScreenerSessionSnapshot")
+
+    learner_ids = (
+        Learner.objects.filter(answers__isnull=False).distinct().values_list("id", flat=True)
+    )
+    last_id = 0
+    while True:
+        chunk = list(learner_ids.filter(id__gt=last_id).order_by("id")[:BATCH_SIZE])
+        if not chunk:
+            break
+
+        sessions = {}
+        answers = (
+            LearnerAssessmentAnswer.objects.filter(learner_id__in=chunk)
+            .order_by("learner_id", "timestamp", "id")
+            .values_list(*ANSWER_FIELDS)
+            .iterator(chunk_size=2000)
+        )
+        for answer in answers:
+            learner_id, session_id, screener_version = answer[:3]
+            sessions.setdefault((learner_id, session_id), (screener_version, []))[1].append(answer)
+
+        with transaction.atomic():
+            recorded = set(
+                ScreenerSessionSnapshot.objects.filter(learner_id__in=chunk).values_list(
+                    "learner_id", "session_id"
+                )
+            )
+            ScreenerSessionSnapshot.objects.bulk_create(
+                [
+                    ScreenerSessionSnapshot(
+                        learner_id=learner_id,
+                        session_id=session_id,
+                        screener_version=screener_version,
+                        **_snapshot_fields(screener_version, session_answers),
+                    )
+                    for (learner_id, session_id), (screener_version, session_answers) in sessions.items()
+                    if (learner_id, session_id) not in recorded
+                ],
+                batch_size=1000,
+            )
+        last_id = chunk[-1]
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("littleTalkApp", "0092_profile_access_version"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_screener_snapshots, migrations.RunPython.noop),
+    ]
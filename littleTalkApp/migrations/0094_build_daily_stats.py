@@ -0,0 +1,127 @@
+from django.db import migrations, transaction
+from django.utils import timezone
+
+BATCH_SIZE = 100
+
+# XP counted for sessions recorded before ExerciseSession.exp_earned was stored.
+LEGACY_SESSION_EXP = 10
+
+SESSION_FIELDS = (
+    "learner_id",
+    "exercise_id",
+    "difficulty_selected",
+    "started_at",
+    "completed_at",
+    "total_questions",
+    "incorrect_answers",
+    "accuracy_percentage",
+    "elapsed_seconds",
+    "exp_earned",
+    "created_at",
+)
+
+
+def _aggregate(sessions):
+    """Return {(learner_id, date, exercise_id): counters} for session value rows.
+
+    A frozen copy of LearnerDailyStats.aggregate_sessions, so later changes to
+    the live models cannot change what this migration computes.
+    """
+
+    totals = {}
+    for session in sessions:
+        (
+            learner_id,
+            exercise_id,
+            difficulty_selected,
+            started_at,
+            completed_at,
+            total_questions,
+            incorrect_answers,
+            accuracy_percentage,
+            elapsed_seconds,
+            exp_earned,
+            created_at,
+        ) = session
+        if elapsed_seconds is None:
+            accuracy_percentage = None
+            if total_questions and total_questions > 0:
+                accuracy_percentage = round(
+                    (total_questions - incorrect_answers) / total_questions * 100, 1
+                )
+            if started_at and completed_at:
+                elapsed_seconds = int(max((completed_at - started_at).total_seconds(), 0))
+
+        key = (learner_id, timezone.localdate(created_at), exercise_id)
+        counters = totals.setdefault(
+            key,
+            {
+                "session_count": 0,
+                "accuracy_sum": 0,
+                "accuracy_count": 0,
+                "difficulty_sum": 0,
+                "difficulty_count": 0,
+                "elapsed_seconds_total": 0,
+                "exp_total": 0,
+            },
+        )
+        counters["session_count"] += 1
+        if accuracy_percentage is not None:
+            counters["accuracy_sum"] += accuracy_percentage
+            counters["accuracy_count"] += 1
+        try:
+            counters["difficulty_sum"] += float(difficulty_selected)
+            counters["difficulty_count"] += 1
+        except (TypeError, ValueError):
+            pass
+        counters["elapsed_seconds_total"] += elapsed_seconds or 0
+        counters["exp_total"] += LEGACY_SESSION_EXP if exp_earned is None else exp_earned
+    return totals
+
+
+def build_daily_stats(apps, schema_editor):
+    """Build the rollups of sessions recorded before LearnerDailyStats existed.
+
+    Each batch of learners has its rollups replaced in its own transaction,
+    so an interrupted run can simply be applied again.
+    """
+
+    Learner = apps.get_model("littleTalkApp", "Learner")
+    ExerciseSession = apps.get_model("littleTalkApp", "ExerciseSession")
+    LearnerDailyStats = apps.get_model("littleTalkApp", "LearnerDailyStats")
+
+    learner_ids = Learner.objects.filter(exercise_sessions__isnull=False).distinct().values_list(
+        "id", flat=True
+    )
+    last_id = 0
+    while True:
+        chunk = list(learner_ids.filter(id__gt=last_id).order_by("id")[:BATCH_SIZE])
+        if not chunk:
+            break
+
+        sessions = (
+            ExerciseSession.objects.filter(learner_id__in=chunk)
+            .values_list(*SESSION_FIELDS)
+            .iterator(chunk_size=2000)
+        )
+        rollups = [
+            LearnerDailyStats(learner_id=learner_id, date=day, exercise_id=exercise_id, **counters)
+            for (learner_id, day, exercise_id), counters in _aggregate(sessions).items()
+        ]
+        with transaction.atomic():
+            LearnerDailyStats.objects.filter(learner_id__in=chunk).delete()
+            LearnerDailyStats.objects.bulk_create(rollups, batch_size=1000)
+        last_id = chunk[-1]
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("littleTalkApp", "0093_backfill_screener_snapshots"),
+    ]
+
+    operations = [
+        migrations.RunPython(build_daily_stats, migrations.RunPython.noop),
+    ]
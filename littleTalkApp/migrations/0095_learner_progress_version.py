@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-18 17:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("littleTalkApp", "0094_build_daily_stats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="learner",
+            name="progress_version",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -1,16 +1,19 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.conf import settings
-from encrypted_model_fields.fields import (
+from littleTalkApp.fields import (
     EncryptedCharField,
     EncryptedDateField,
     EncryptedTextField,
+    LazyDecryptManager,
+    is_undecrypted,
 )
 import uuid
 from django.utils import timezone
-from datetime import date, timedelta
+from datetime import date, datetime, time, timedelta
 import random
 import string
 
+from littleTalkApp import blind_index
 from littleTalkApp.content.avatars import DEFAULT_AVATAR_CHARACTER, DEFAULT_AVATAR_COLOR
 
 
@@ -113,6 +116,15 @@ class Profile(models.Model):
     # Support multiple schools per user via M2M relation.
     schools = models.ManyToManyField(School, blank=True, related_name="profiles")
     role = models.CharField(max_length=20, choices=Role.CHOICES, default=Role.PARENT)
+    # Replaced whenever the profile's school access changes; cached access
+    # contexts are keyed by it (see littleTalkApp/access.py).
+    access_version = models.UUIDField(default=uuid.uuid4, editable=False)
+
+    objects = LazyDecryptManager()
+
+    # Set by littleTalkApp.access.get_access_context() on the request's profile so the
+    # school/role helpers below reuse the request's resolved access instead of querying.
+    _access_context = None
 
     def __str__(self):
         return f"{self.user.username}'s Profile"
@@ -177,7 +189,10 @@ class Profile(models.Model):
         # return None if parent
         if self.is_parent():
             return None
-        
+
+        if self._access_context is not None:
+            return self._access_context.current_school(request)
+
         # 1) Session-selected school
         if request is not None:
             try:
@@ -213,6 +228,9 @@ class Profile(models.Model):
         if not school or self.is_parent():
             return self.role
 
+        if self._access_context is not None:
+            return self._access_context.role_for_school(school)
+
         try:
             membership_qs = self.memberships.filter(school=school)
             if membership_qs.exists():
@@ -239,6 +257,8 @@ class Profile(models.Model):
 
     def has_multiple_schools(self):
         """Return True if this profile has access to multiple schools."""
+        if self._access_context is not None:
+            return self._access_context.has_multiple_schools
         return self.get_accessible_schools().count() > 1
 
     def select_school(self, school_id, request=None):
@@ -316,22 +336,104 @@ class SchoolMembership(models.Model):
         return f"{self.profile.user.username} @ {self.school.name}: {self.role}"
 
 
+class ScreenerQuestion(models.Model):
+    """One screener question as it was asked, shared by every answer to it.
+
+    Questions are identified by screener version and order (the ids used in
+    content/assessments.py and content/assessments_v2.py). When a question's
+    wording or skill changes, a new revision is added so earlier answers keep
+    the text they were given for. See littleTalkApp/screener_answers.py.
+    """
+
+    screener_version = models.PositiveSmallIntegerField()
+    order = models.PositiveSmallIntegerField()
+    revision = models.PositiveSmallIntegerField(default=1)
+    topic = models.CharField(max_length=100)
+    skill = models.CharField(max_length=100)
+    text = models.TextField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["screener_version", "order", "revision"],
+                name="screener_question_revision_uniq",
+            ),
+        ]
+
+    def __str__(self):
+        return f"V{self.screener_version} Q{self.order} (r{self.revision}): {self.skill}"
+
+
 class LearnerAssessmentAnswer(models.Model):
     learner = models.ForeignKey(
         "Learner", on_delete=models.CASCADE, related_name="answers"
     )
-    question_id = models.IntegerField()
-    topic = models.CharField(max_length=100)
-    skill = models.CharField(max_length=100)
-    text = models.TextField()
-    answer = models.CharField(max_length=10)  # 'Yes' or 'No'
+    # Topic, skill and wording live on the shared catalogue row.
+    question = models.ForeignKey(ScreenerQuestion, on_delete=models.PROTECT, related_name="answers")
+    answered_yes = models.BooleanField()
     timestamp = models.DateTimeField(auto_now_add=True)
     session_id = models.UUIDField(default=uuid.uuid4)  # Groups answers by screener session
     screener_version = models.IntegerField(default=2)
     assessment_date = models.DateField(auto_now_add=True, null=True)  # Date screener was completed
 
     def __str__(self):
-        return f"{self.learner.name} - Q{self.question_id}: {self.answer}"
+        return f"{self.learner.name} - Q{self.question.order}: {self.answer}"
+
+    @property
+    def answer(self):
+        """The answer as the screener form posts it: "Yes" or "No"."""
+        return "Yes" if self.answered_yes else "No"
+
+
+class ScreenerSessionSnapshot(models.Model):
+    """Skill results of one screener session, derived once from its answers.
+
+    Written by `save_assessment_v2_for_learner`; regenerate from
+    LearnerAssessmentAnswer rows with `manage.py backfill_screener_snapshots`.
+    See littleTalkApp/screener_snapshots.py.
+    """
+
+    learner = models.ForeignKey(
+        "Learner", on_delete=models.CASCADE, related_name="screener_snapshots"
+    )
+    session_id = models.UUIDField()
+    screener_version = models.IntegerField(default=2)
+    # Timestamp of the session's first answer; orders sessions like the answers do.
+    started_at = models.DateTimeField()
+    assessment_date = models.DateField(null=True, blank=True)
+    strong_skills = models.JSONField(default=list)
+    support_skills = models.JSONField(default=list)
+    readiness_status = models.CharField(max_length=16)
+    # {exercise_id: [skills answered "No" on that exercise's questions]} (V2 only).
+    support_skills_by_exercise = models.JSONField(default=dict)
+    # {"1": bool, "2": bool, "3": bool} and the stage ceiling it allows (V2 only).
+    stage_mastery = models.JSONField(default=dict)
+    allowed_max_stage = models.PositiveSmallIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["learner", "session_id"],
+                name="screener_snapshot_learner_session_uniq",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["learner", "screener_version", "-started_at"],
+                name="screener_snapshot_latest",
+            ),
+        ]
+
+    def __str__(self):
+        return f"ScreenerSessionSnapshot({self.learner_id}: {self.session_id})"
+
+    def get_skill_status(self):
+        """Return {skill: "strong" | "needs_support"} for the session."""
+
+        status = {skill: "strong" for skill in self.strong_skills}
+        status.update((skill, "needs_support") for skill in self.support_skills)
+        return status
 
 
 class Cohort(models.Model):
@@ -353,6 +455,8 @@ class Learner(models.Model):
         School, on_delete=models.CASCADE, related_name="learners", null=True, blank=True
     )
     name = EncryptedCharField(max_length=255)
+    # Keyed-HMAC blind index of the normalised name; see littleTalkApp/blind_index.py.
+    name_index = models.CharField(max_length=32, blank=True, null=True, db_index=True, editable=False)
     learner_uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     exp = models.IntegerField(default=0)
     total_exercises = models.IntegerField(default=0)
@@ -361,6 +465,11 @@ class Learner(models.Model):
     secondary_exercise_ids = models.JSONField(blank=True, null=True)
     recommendation_index = models.IntegerField(default=0)
     recommendation_index_updated_at = models.DateTimeField(blank=True, null=True)
+    # Set with every recorded submission; versions the dashboard progress ETag.
+    last_exercise_at = models.DateTimeField(blank=True, null=True)
+    # Bumped when sessions or rollups are rewritten outside submissions
+    # (maintenance commands, admin edits); also versions the progress ETag.
+    progress_version = models.PositiveIntegerField(default=0)
     deleted = models.BooleanField(default=False)
     date_of_birth = EncryptedDateField(null=True, blank=True)
     avatar_character = models.CharField(max_length=64, default=DEFAULT_AVATAR_CHARACTER)
@@ -375,9 +484,61 @@ class Learner(models.Model):
     assessment2 = models.IntegerField(blank=True, null=True)
     cohort = models.ForeignKey(Cohort, on_delete=models.SET_NULL, null=True, blank=True)
 
+    objects = LazyDecryptManager()
+
+    # (name_index, school_id) the stored LearnerNameToken rows were built from.
+    _indexed_state = None
+
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._indexed_state = (
+            instance.__dict__.get("name_index"),
+            instance.__dict__.get("school_id"),
+        )
+        return instance
+
+    @classmethod
+    def search_by_name(cls, school, query, limit=20):
+        """Return up to `limit` active learners at `school` whose name matches `query`.
+
+        Every query word must be a prefix of some word in the name. Candidates
+        are found through the LearnerNameToken index alone; only the matches are
+        decrypted, to sort them and to confirm words longer than the indexed
+        prefixes.
+        """
+
+        tokens = set(blind_index.query_prefix_tokens(query))
+        if not tokens:
+            return []
+
+        matching_ids = (
+            LearnerNameToken.objects.filter(school=school, token__in=tokens)
+            .values("learner_id")
+            .annotate(matched=models.Count("token", distinct=True))
+            .filter(matched=len(tokens))
+            .values("learner_id")
+        )
+        learners = cls.objects.filter(id__in=matching_ids, school=school, deleted=False)
+        return blind_index.sort_by_name(
+            learner for learner in learners if blind_index.name_matches_query(learner.name, query)
+        )[:limit]
+
+    def rebuild_name_tokens(self):
+        """Replace this learner's LearnerNameToken rows from its current name."""
+        with transaction.atomic():
+            LearnerNameToken.objects.filter(learner=self).delete()
+            LearnerNameToken.objects.bulk_create(
+                [
+                    LearnerNameToken(learner=self, school_id=self.school_id, token=token)
+                    for token in blind_index.name_prefix_tokens(self.name)
+                ]
+            )
+        self._indexed_state = (self.name_index, self.school_id)
+
     @staticmethod
     def derive_age_group(dob, today=None):
         if not dob:
@@ -392,17 +553,82 @@ class Learner(models.Model):
         )
         return AgeGroup.from_age(age_years)
 
+    def add_progress(self, exp, total_exercises):
+        """Atomically add XP and completed exercises to this learner.
+
+        Issues a single F()-expression UPDATE touching only the counter columns
+        and `last_exercise_at`, so concurrent submissions never lose increments
+        and encrypted fields are not rewritten. The totals are read back while the row lock is held, so
+        the refreshed `exp` is exact for this submission even under contention.
+        Returns the learner's new total XP.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            Learner.objects.filter(pk=self.pk).update(
+                exp=models.F("exp") + exp,
+                total_exercises=models.F("total_exercises") + total_exercises,
+                last_exercise_at=now,
+            )
+            self.last_exercise_at = now
+            self.exp, self.total_exercises = (
+                Learner.objects.filter(pk=self.pk)
+                .values_list("exp", "total_exercises")
+                .get()
+            )
+        return self.exp
+
+    @classmethod
+    def bump_progress_version(cls, learner_ids):
+        """Change the progress ETag of learners whose sessions or rollups were rewritten."""
+        cls.objects.filter(pk__in=learner_ids).update(
+            progress_version=models.F("progress_version") + 1
+        )
+
     def save(self, *args, **kwargs):
         self.age_group = self.derive_age_group(self.date_of_birth)
 
         update_fields = kwargs.get("update_fields")
+        saves_name = update_fields is None or "name" in update_fields
+        # A name still undecrypted is unchanged since load, so its index is too.
+        if saves_name and (self.name_index is None or not is_undecrypted(self, "name")):
+            self.name_index = blind_index.name_index(self.name)
         if update_fields is not None:
             update_fields = set(update_fields)
             update_fields.add("age_group")
+            if saves_name:
+                update_fields.add("name_index")
             kwargs["update_fields"] = update_fields
 
         super().save(*args, **kwargs)
 
+        saves_index_state = saves_name or "school" in update_fields
+        if saves_index_state and self._indexed_state != (self.name_index, self.school_id):
+            self.rebuild_name_tokens()
+
+
+class LearnerNameToken(models.Model):
+    """One blind-index prefix digest of a learner's name (see blind_index.py).
+
+    `school` is copied from the learner so a search is one indexed lookup on
+    (school, token).
+    """
+
+    learner = models.ForeignKey(Learner, on_delete=models.CASCADE, related_name="name_tokens")
+    school = models.ForeignKey(
+        School, on_delete=models.CASCADE, related_name="+", null=True, blank=True
+    )
+    token = models.CharField(max_length=32)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["school", "token"], name="learner_name_token_lookup"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["learner", "token"], name="learner_name_token_uniq"
+            ),
+        ]
+
 
 class LogEntry(models.Model):
     user = models.ForeignKey(
@@ -430,6 +656,8 @@ class LogEntry(models.Model):
     deleted = models.BooleanField(default=False)
     created_by_role = models.CharField(max_length=20, blank=True, null=True)
 
+    objects = LazyDecryptManager()
+
     def __str__(self):
         return f"{self.title} - {self.user.username}"
 
@@ -549,6 +777,11 @@ class ExerciseSession(models.Model):
     incorrect_answers = models.IntegerField()
     attempts_per_question = models.JSONField()  # List of integers, e.g. [1, 2, 3] for attempts per question
     learner_total_exp_after_session = models.IntegerField(null=True, blank=True)
+    # Derived from the fields above when the session is saved so dashboards can
+    # aggregate and filter in SQL. Backfilled by `manage.py backfill_session_metrics`.
+    accuracy_percentage = models.FloatField(null=True, blank=True)
+    elapsed_seconds = models.PositiveIntegerField(null=True, blank=True)
+    exp_earned = models.IntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -560,6 +793,222 @@ class ExerciseSession(models.Model):
     def __str__(self):
         return f"{self.learner.name} - {self.exercise_id} ({self.completed_at})"
 
+    @staticmethod
+    def derive_accuracy_percentage(total_questions, incorrect_answers):
+        if not total_questions or total_questions <= 0:
+            return None
+        correct = total_questions - incorrect_answers
+        return round((correct / total_questions) * 100, 1)
+
+    @staticmethod
+    def derive_elapsed_seconds(started_at, completed_at):
+        if not started_at or not completed_at:
+            return None
+        return int(max((completed_at - started_at).total_seconds(), 0))
+
+    def populate_derived_metrics(self):
+        """Set accuracy_percentage and elapsed_seconds; exp_earned comes from the submission."""
+        self.accuracy_percentage = self.derive_accuracy_percentage(
+            self.total_questions, self.incorrect_answers
+        )
+        self.elapsed_seconds = self.derive_elapsed_seconds(self.started_at, self.completed_at)
+
+    def save(self, *args, **kwargs):
+        self.populate_derived_metrics()
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            update_fields.update({"accuracy_percentage", "elapsed_seconds"})
+            kwargs["update_fields"] = update_fields
+
+        super().save(*args, **kwargs)
+
+
+# XP counted for sessions recorded before ExerciseSession.exp_earned was stored.
+LEGACY_SESSION_EXP = 10
+
+
+class LearnerDailyStats(models.Model):
+    """Per-learner, per-day, per-exercise totals so long-range charts skip raw sessions.
+
+    Incremented by the exercise submission path via `add_sessions`. Saving or
+    deleting a single session rebuilds its day (see littleTalkApp/signals.py);
+    after queryset `.update()`s regenerate with `manage.py rebuild_daily_stats`.
+    """
+
+    learner = models.ForeignKey(Learner, on_delete=models.CASCADE, related_name="daily_stats")
+    date = models.DateField()
+    exercise_id = models.CharField(max_length=255)
+    session_count = models.PositiveIntegerField(default=0)
+    accuracy_sum = models.FloatField(default=0)
+    accuracy_count = models.PositiveIntegerField(default=0)
+    difficulty_sum = models.FloatField(default=0)
+    difficulty_count = models.PositiveIntegerField(default=0)
+    elapsed_seconds_total = models.PositiveBigIntegerField(default=0)
+    exp_total = models.IntegerField(default=0)
+
+    COUNTER_FIELDS = (
+        "session_count",
+        "accuracy_sum",
+        "accuracy_count",
+        "difficulty_sum",
+        "difficulty_count",
+        "elapsed_seconds_total",
+        "exp_total",
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["learner", "date", "exercise_id"],
+                name="daily_stats_learner_date_exercise_uniq",
+            ),
+        ]
+
+    def __str__(self):
+        return f"LearnerDailyStats({self.learner_id}: {self.date} {self.exercise_id})"
+
+    @classmethod
+    def aggregate_sessions(cls, sessions):
+        """Return {(learner_id, date, exercise_id): {counter: value}} for saved sessions."""
+
+        totals = {}
+        for session in sessions:
+            if session.elapsed_seconds is None:
+                session.populate_derived_metrics()
+
+            key = (
+                session.learner_id,
+                timezone.localdate(session.created_at),
+                session.exercise_id,
+            )
+            counters = totals.setdefault(key, dict.fromkeys(cls.COUNTER_FIELDS, 0))
+            counters["session_count"] += 1
+            if session.accuracy_percentage is not None:
+                counters["accuracy_sum"] += session.accuracy_percentage
+                counters["accuracy_count"] += 1
+            try:
+                counters["difficulty_sum"] += float(session.difficulty_selected)
+                counters["difficulty_count"] += 1
+            except (TypeError, ValueError):
+                pass
+            counters["elapsed_seconds_total"] += session.elapsed_seconds or 0
+            counters["exp_total"] += (
+                LEGACY_SESSION_EXP if session.exp_earned is None else session.exp_earned
+            )
+        return totals
+
+    @classmethod
+    def rebuild(cls, learner_ids, day=None):
+        """Replace the learners' rollups (only `day`'s, if given) with totals from their sessions."""
+
+        sessions = ExerciseSession.objects.filter(learner_id__in=learner_ids)
+        rollups = cls.objects.filter(learner_id__in=learner_ids)
+        if day is not None:
+            day_start = timezone.make_aware(datetime.combine(day, time.min))
+            sessions = sessions.filter(
+                created_at__gte=day_start, created_at__lt=day_start + timedelta(days=1)
+            )
+            rollups = rollups.filter(date=day)
+
+        sessions = sessions.only(
+            "learner_id",
+            "exercise_id",
+            "difficulty_selected",
+            "started_at",
+            "completed_at",
+            "total_questions",
+            "incorrect_answers",
+            "accuracy_percentage",
+            "elapsed_seconds",
+            "exp_earned",
+            "created_at",
+        ).iterator(chunk_size=2000)
+        rebuilt = [
+            cls(learner_id=learner_id, date=rollup_day, exercise_id=exercise_id, **counters)
+            for (learner_id, rollup_day, exercise_id), counters in cls.aggregate_sessions(
+                sessions
+            ).items()
+        ]
+
+        with transaction.atomic():
+            rollups.delete()
+            cls.objects.bulk_create(rebuilt, batch_size=1000)
+        return rebuilt
+
+    @classmethod
+    def add_sessions(cls, sessions):
+        """Add newly saved sessions to their rollup rows with atomic F() increments."""
+
+        for (learner_id, day, exercise_id), counters in cls.aggregate_sessions(sessions).items():
+            rollup = cls.objects.filter(learner_id=learner_id, date=day, exercise_id=exercise_id)
+            increments = {
+                field: models.F(field) + value for field, value in counters.items()
+            }
+            if rollup.update(**increments):
+                continue
+            try:
+                with transaction.atomic():
+                    cls.objects.create(
+                        learner_id=learner_id, date=day, exercise_id=exercise_id, **counters
+                    )
+            except IntegrityError:
+                # Another submission created the row first; add on top of it.
+                rollup.update(**increments)
+
+
+class PendingExerciseSubmission(models.Model):
+    """A validated exercise result queued by SubmitExerciseView in write-behind mode.
+
+    Rows are applied in batches and deleted by `manage.py drain_exercise_submissions`.
+    """
+
+    learner = models.ForeignKey(
+        Learner, on_delete=models.CASCADE, related_name="pending_submissions"
+    )
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"PendingExerciseSubmission({self.learner_id}: {self.created_at})"
+
+
+IDEMPOTENCY_KEY_TTL = timedelta(days=1)
+
+
+def default_idempotency_expiry():
+    return timezone.now() + IDEMPOTENCY_KEY_TTL
+
+
+class IdempotencyKey(models.Model):
+    """Records a processed exercise submission so retries replay the stored response.
+
+    Written in the same transaction as the ExerciseSession insert, so the unique
+    (user, key) constraint deduplicates retries across every worker process.
+    Expired rows are removed by `manage.py prune_idempotency_keys`.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="idempotency_keys"
+    )
+    key = models.CharField(max_length=100)
+    response_status = models.PositiveSmallIntegerField(default=200)
+    response_body = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(default=default_idempotency_expiry, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "key"], name="idempotency_user_key_uniq"),
+        ]
+
+    def __str__(self):
+        return f"IdempotencyKey({self.user_id}: {self.key})"
+
+    def is_expired(self):
+        return timezone.now() >= self.expires_at
+
 
 class Target(models.Model):
     class Status(models.TextChoices):
@@ -578,6 +1027,8 @@ class Target(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = LazyDecryptManager()
+
     class Meta:
         ordering = ['created_at']
 
@@ -585,6 +1036,33 @@ class Target(models.Model):
         return f"{self.learner.name} - {self.text} ({self.status})"
 
 
+class EncryptionRotationCheckpoint(models.Model):
+    """Progress of `manage.py rotate_encryption_keys` through one model's rows.
+
+    Keyed by model and by a fingerprint of the primary FIELD_ENCRYPTION_KEY, so
+    an interrupted run resumes after `last_pk` while a run for a new key starts
+    from the beginning.
+    """
+
+    model_label = models.CharField(max_length=100)
+    key_fingerprint = models.CharField(max_length=16)
+    last_pk = models.BigIntegerField(default=0)
+    rows_rotated = models.BigIntegerField(default=0)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["model_label", "key_fingerprint"],
+                name="encryption_rotation_checkpoint_uniq",
+            ),
+        ]
+
+    def __str__(self):
+        return f"EncryptionRotationCheckpoint({self.model_label}: {self.last_pk})"
+
+
 # =============================================================================
 # Skolon integration models
 # =============================================================================
@@ -0,0 +1,68 @@
+"""Per-request SQL query accounting.
+
+`record_queries()` counts every statement run on a connection together with
+its total time and how many statements repeated an earlier one verbatim
+(same SQL, any parameters), which is how N+1 loops show up. It hooks
+`connection.execute_wrapper`, so it works with DEBUG off and is shared by
+QueryBudgetMiddleware and the query budget tests.
+"""
+
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+
+DEFAULT_QUERY_BUDGET = 30
+
+
+class QueryStats:
+    def __init__(self):
+        self.statements = Counter()
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.statements[sql] += 1
+
+    @property
+    def duration_ms(self):
+        return round(self.duration * 1000, 2)
+
+    @property
+    def duplicate_count(self):
+        """Statements that repeated an earlier statement in the same block."""
+        return sum(count - 1 for count in self.statements.values())
+
+    def duplicates(self):
+        """Return [(sql, count)] for repeated statements, most repeated first."""
+        return [(sql, count) for sql, count in self.statements.most_common() if count > 1]
+
+
+@contextmanager
+def record_queries(using=None):
+    """Yield a QueryStats collecting every query run inside the block."""
+    stats = QueryStats()
+    conn = connection if using is None else using
+    with conn.execute_wrapper(stats):
+        yield stats
+
+
+def get_query_budget(url_name):
+    """Return the query budget for a URL name.
+
+    QUERY_BUDGETS maps URL names to budgets; anything else uses
+    QUERY_BUDGET_DEFAULT.
+    """
+
+    budgets = getattr(settings, "QUERY_BUDGETS", {})
+    if url_name in budgets:
+        return budgets[url_name]
+    return getattr(settings, "QUERY_BUDGET_DEFAULT", DEFAULT_QUERY_BUDGET)
@@ -0,0 +1,176 @@
+"""Screener answers stored against the ScreenerQuestion catalogue.
+
+A LearnerAssessmentAnswer row holds only the learner, session, question
+foreign key and a yes/no boolean; the topic, skill and wording are stored
+once per question revision in ScreenerQuestion. The helpers here write rows
+against the catalogue revision matching the current content, and read them
+back, joined in one query, as ScreenerAnswer tuples with the fields the
+answer rows used to carry, so snapshot building and other readers keep
+working on the same shape.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime
+from uuid import UUID
+
+from django.db import transaction
+
+from littleTalkApp.content.assessments import QUESTIONS_BY_ORDER
+from littleTalkApp.content.assessments_v2 import QUESTIONS_V2_BY_ORDER
+from littleTalkApp.models import LearnerAssessmentAnswer, ScreenerQuestion
+
+SCREENER_CONTENT = {1: QUESTIONS_BY_ORDER, 2: QUESTIONS_V2_BY_ORDER}
+
+ANSWER_VALUES = {"yes": True, "no": False}
+
+ANSWER_FIELDS = (
+    "learner_id",
+    "session_id",
+    "screener_version",
+    "question__order",
+    "question__topic",
+    "question__skill",
+    "question__text",
+    "answered_yes",
+    "timestamp",
+    "assessment_date",
+)
+
+
+@dataclass(frozen=True)
+class ScreenerAnswer:
+    """One answer joined with its question; `question_id` is the question's order."""
+
+    learner_id: int
+    session_id: UUID
+    screener_version: int
+    question_id: int
+    topic: str
+    skill: str
+    text: str
+    answer: str
+    timestamp: datetime
+    assessment_date: date
+
+    @classmethod
+    def from_row(cls, row):
+        """Build from a saved LearnerAssessmentAnswer whose `question` is loaded."""
+        question = row.question
+        return cls(
+            row.learner_id,
+            row.session_id,
+            row.screener_version,
+            question.order,
+            question.topic,
+            question.skill,
+            question.text,
+            row.answer,
+            row.timestamp,
+            row.assessment_date,
+        )
+
+
+def get_screener_questions(screener_version):
+    """Return {order: ScreenerQuestion} for the current wording of the content.
+
+    Reads the version's catalogue in one query. Questions whose topic, skill
+    or text were edited since the catalogue was written get a new revision.
+    """
+
+    content = SCREENER_CONTENT[screener_version]
+    current = {}
+    latest_revision = {}
+    for question in ScreenerQuestion.objects.filter(screener_version=screener_version):
+        latest_revision[question.order] = max(
+            latest_revision.get(question.order, 0), question.revision
+        )
+        if _has_current_wording(question, content):
+            current[question.order] = question
+
+    missing = [
+        ScreenerQuestion(
+            screener_version=screener_version,
+            order=order,
+            revision=latest_revision.get(order, 0) + 1,
+            topic=question["topic"],
+            skill=question["skill"],
+            text=question["text"],
+        )
+        for order, question in content.items()
+        if order not in current
+    ]
+    if missing:
+        # A concurrent request may add the same revision first.
+        with transaction.atomic():
+            ScreenerQuestion.objects.bulk_create(missing, ignore_conflicts=True)
+        for question in ScreenerQuestion.objects.filter(
+            screener_version=screener_version,
+            order__in=[question.order for question in missing],
+        ):
+            if _has_current_wording(question, content):
+                current[question.order] = question
+    return current
+
+
+def _has_current_wording(question, content):
+    expected = content.get(question.order)
+    return bool(expected) and (question.topic, question.skill, question.text) == (
+        expected["topic"],
+        expected["skill"],
+        expected["text"],
+    )
+
+
+def build_answer_rows(learner, answers, questions, session_id, screener_version):
+    """Return unsaved LearnerAssessmentAnswer rows for the submitted answers.
+
+    `questions` is get_screener_questions(screener_version). Answers to
+    unknown question ids, or other than yes/no, are skipped.
+    """
+
+    rows = []
+    for question_id_str, user_answer in answers.items():
+        try:
+            question = questions.get(int(question_id_str))
+        except (TypeError, ValueError):
+            continue
+        answered_yes = ANSWER_VALUES.get(str(user_answer).strip().lower())
+        if not question or answered_yes is None:
+            continue
+
+        rows.append(
+            LearnerAssessmentAnswer(
+                learner=learner,
+                question=question,
+                answered_yes=answered_yes,
+                session_id=session_id,
+                screener_version=screener_version,
+            )
+        )
+    return rows
+
+
+def iter_screener_answers(answers):
+    """Yield a queryset of LearnerAssessmentAnswer rows as ScreenerAnswer tuples.
+
+    The question fields are joined in the same query; rows keep the
+    queryset's ordering.
+    """
+
+    for values in answers.values_list(*ANSWER_FIELDS).iterator(chunk_size=2000):
+        *fields, answered_yes, timestamp, assessment_date = values
+        yield ScreenerAnswer(
+            *fields, "Yes" if answered_yes else "No", timestamp, assessment_date
+        )
+
+
+def get_session_answers(learner, session_id):
+    """Return one session's answers as ScreenerAnswer tuples, in the order given."""
+
+    return list(
+        iter_screener_answers(
+            LearnerAssessmentAnswer.objects.filter(
+                learner=learner, session_id=session_id
+            ).order_by("timestamp", "id")
+        )
+    )
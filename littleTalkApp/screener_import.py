@@ -0,0 +1,280 @@
+"""Class-wide Screener V2 import from a CSV or XLSX sheet.
+
+Teachers who screen a class on paper fill in one row per learner: a
+``learner_uuid`` column, an optional ``name`` column for their own reference,
+and one column per QUESTIONS_V2 question, headed by the question's order
+number (``12`` or ``12. Question text``, as in the downloadable template).
+Answers are Yes or No in any case. Like the screener form, each row must
+answer every question except the readiness ones, which may be left blank.
+
+Header cells are resolved to questions once per sheet, and the whole sheet is
+checked before anything is saved, so a mistake in one row rejects the upload
+with a list of row-level errors instead of importing part of the class.
+"""
+
+import csv
+import io
+import os
+import re
+import uuid
+
+from django.core.exceptions import ValidationError
+from openpyxl import load_workbook
+
+from littleTalkApp.content.assessments_v2 import QUESTIONS_V2, QUESTIONS_V2_BY_ORDER
+
+LEARNER_COLUMN = "learner_uuid"
+NAME_COLUMN = "name"
+
+MAX_IMPORT_BYTES = 2 * 1024 * 1024
+MAX_IMPORT_ROWS = 500
+MAX_REPORTED_ERRORS = 20
+# Bounds on what is read from a sheet, blank rows and columns included, so a
+# small compressed workbook formatted down to row 1,000,000 is never expanded.
+MAX_SHEET_ROWS = 10 * MAX_IMPORT_ROWS
+MAX_SHEET_COLUMNS = 100
+
+REQUIRED_QUESTION_ORDERS = tuple(
+    question["order"] for question in QUESTIONS_V2 if not question.get("is_readiness")
+)
+
+ANSWER_VALUES = {"yes": "Yes", "no": "No"}
+
+QUESTION_HEADER_PATTERN = re.compile(r"^(\d+)(?:[.:)]?\s+.*|[.:)])?$", re.DOTALL)
+
+CSV_DELIMITERS = (",", ";", "\t")
+QUOTED_CELL_PATTERN = re.compile(r'"[^"]*"')
+
+# Spreadsheet apps run cells starting with these characters as formulas.
+FORMULA_PREFIXES = ("=", "+", "-", "@")
+
+
+def read_sheet_rows(upload):
+    """Return the rows of an uploaded .csv or .xlsx file as lists of cell values.
+
+    Reading stops once the sheet has more learner rows than MAX_IMPORT_ROWS,
+    so parse_screener_import can report it without the rest being loaded.
+    """
+
+    extension = os.path.splitext(upload.name or "")[1].lower()
+    if upload.size > MAX_IMPORT_BYTES:
+        raise ValidationError(
+            f"The file is larger than {MAX_IMPORT_BYTES // (1024 * 1024)} MB."
+        )
+
+    if extension == ".csv":
+        try:
+            text = upload.read().decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise ValidationError("The CSV file must be saved as UTF-8.")
+        # Excel saves CSV with ";" or tabs in some locales; pick whichever
+        # separator the header row uses most outside quoted cells.
+        header = QUOTED_CELL_PATTERN.sub("", text.split("\n", 1)[0])
+        delimiter = max(CSV_DELIMITERS, key=header.count)
+        return _limit_rows(csv.reader(io.StringIO(text), delimiter=delimiter))
+
+    if extension == ".xlsx":
+        try:
+            workbook = load_workbook(upload, read_only=True, data_only=True)
+        except Exception:
+            raise ValidationError("The XLSX file could not be read.")
+        try:
+            return _limit_rows(
+                workbook.worksheets[0].iter_rows(
+                    max_row=MAX_SHEET_ROWS + 1,
+                    max_col=MAX_SHEET_COLUMNS + 1,
+                    values_only=True,
+                )
+            )
+        finally:
+            workbook.close()
+
+    raise ValidationError("Upload a .csv or .xlsx file.")
+
+
+def _limit_rows(rows):
+    """Read rows until one past MAX_IMPORT_ROWS learner rows.
+
+    Blank rows are kept, as empty lists, so error messages keep the sheet's
+    row numbers.
+    """
+
+    kept = []
+    learner_rows = 0
+    for row_number, row in enumerate(rows, start=1):
+        if row_number > MAX_SHEET_ROWS:
+            raise ValidationError(
+                f"The sheet has more than {MAX_SHEET_ROWS} rows; delete the empty rows below the class."
+            )
+        row = list(row)
+        if row_number == 1 and any(_cell_text(value) for value in row[MAX_SHEET_COLUMNS:]):
+            raise ValidationError(f"The sheet has more than {MAX_SHEET_COLUMNS} columns.")
+        row = row[:MAX_SHEET_COLUMNS]
+        if row_number > 1:
+            if not any(_cell_text(value) for value in row):
+                kept.append([])
+                continue
+            learner_rows += 1
+        kept.append(row)
+        if learner_rows > MAX_IMPORT_ROWS:
+            break
+    return kept
+
+
+def _cell_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def resolve_import_columns(header):
+    """Map the header row to (learner column index, {column index: question order}).
+
+    Raises ValidationError for a missing learner column or unknown, duplicate
+    or invalid question columns.
+    """
+
+    errors = []
+    learner_column = None
+    question_columns = {}
+    seen_orders = set()
+    for index, value in enumerate(header):
+        text = _cell_text(value)
+        if not text or text.lower() == NAME_COLUMN:
+            continue
+        if text.lower() == LEARNER_COLUMN:
+            learner_column = index
+            continue
+
+        match = QUESTION_HEADER_PATTERN.match(text)
+        order = int(match.group(1)) if match else None
+        if order not in QUESTIONS_V2_BY_ORDER:
+            errors.append(f"Column {index + 1} ({text!r}) is not a screener question.")
+        elif order in seen_orders:
+            errors.append(f"Question {order} has more than one column.")
+        else:
+            seen_orders.add(order)
+            question_columns[index] = order
+
+    missing = [order for order in REQUIRED_QUESTION_ORDERS if order not in seen_orders]
+    if learner_column is None:
+        errors.insert(0, f"The first row must include a {LEARNER_COLUMN!r} column.")
+    elif missing and not errors:
+        errors.append(f"The first row has no column for questions {_format_orders(missing)}.")
+    if errors:
+        raise ValidationError(errors)
+    return learner_column, question_columns
+
+
+def parse_screener_import(rows, learners):
+    """Validate sheet rows and return a list of (learner, answers) pairs.
+
+    `learners` is the queryset of learners the uploader may screen; it is
+    queried once. `answers` maps question order to "Yes" or "No", like the
+    answers posted by the screener form. Raises ValidationError listing every
+    problem found (up to MAX_REPORTED_ERRORS).
+    """
+
+    if not rows:
+        raise ValidationError("The file is empty.")
+
+    learner_column, question_columns = resolve_import_columns(rows[0])
+
+    errors = []
+    parsed = []
+    for row_number, row in enumerate(rows[1:], start=2):
+        cells = [_cell_text(value) for value in row]
+        if not any(cells):
+            continue
+
+        learner_text = cells[learner_column] if learner_column < len(cells) else ""
+        try:
+            learner_uuid = uuid.UUID(learner_text)
+        except ValueError:
+            errors.append(f"Row {row_number}: {learner_text!r} is not a learner id.")
+            continue
+
+        answers = {}
+        invalid = False
+        for index, order in question_columns.items():
+            value = cells[index] if index < len(cells) else ""
+            if not value:
+                continue
+            answer = ANSWER_VALUES.get(value.lower())
+            if answer is None:
+                errors.append(f"Row {row_number}, question {order}: expected Yes or No, not {value!r}.")
+                invalid = True
+                continue
+            answers[str(order)] = answer
+
+        if not answers:
+            errors.append(f"Row {row_number}: no answers.")
+            continue
+        unanswered = [order for order in REQUIRED_QUESTION_ORDERS if str(order) not in answers]
+        if unanswered and not invalid:
+            errors.append(f"Row {row_number}: questions {_format_orders(unanswered)} are unanswered.")
+        if unanswered or invalid:
+            continue
+        parsed.append((row_number, learner_uuid, answers))
+
+    if len(parsed) > MAX_IMPORT_ROWS:
+        errors.append(f"The file has more than {MAX_IMPORT_ROWS} learners; split it up.")
+
+    first_rows = {}
+    for row_number, learner_uuid, _ in parsed:
+        if learner_uuid in first_rows:
+            errors.append(
+                f"Row {row_number}: learner {learner_uuid} is also on row {first_rows[learner_uuid]}."
+            )
+        else:
+            first_rows[learner_uuid] = row_number
+
+    if not errors and not parsed:
+        errors.append("The file has no learner rows.")
+    _raise_if_errors(errors)
+
+    learners_by_uuid = {
+        learner.learner_uuid: learner for learner in learners.filter(learner_uuid__in=first_rows)
+    }
+    for row_number, learner_uuid, _ in parsed:
+        if learner_uuid not in learners_by_uuid:
+            errors.append(f"Row {row_number}: learner {learner_uuid} was not found in your school.")
+    _raise_if_errors(errors)
+
+    return [(learners_by_uuid[learner_uuid], answers) for _, learner_uuid, answers in parsed]
+
+
+def _format_orders(orders):
+    return ", ".join(str(order) for order in orders)
+
+
+def _raise_if_errors(errors):
+    if not errors:
+        return
+    if len(errors) > MAX_REPORTED_ERRORS:
+        hidden = len(errors) - MAX_REPORTED_ERRORS
+        errors = errors[:MAX_REPORTED_ERRORS] + [f"…and {hidden} more problems."]
+    raise ValidationError(errors)
+
+
+def build_import_template(learners):
+    """Return the CSV import template for `learners` as a string.
+
+    One row per learner with its id and name, and one empty column per
+    QUESTIONS_V2 question headed "<order>. <text>".
+    """
+
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(
+        [LEARNER_COLUMN, NAME_COLUMN]
+        + [f"{question['order']}. {question['text']}" for question in QUESTIONS_V2]
+    )
+    for learner in learners:
+        name = str(learner.name or "")
+        if name.startswith(FORMULA_PREFIXES):
+            name = f"'{name}"
+        writer.writerow([str(learner.learner_uuid), name] + [""] * len(QUESTIONS_V2))
+    return output.getvalue()
@@ -0,0 +1,182 @@
+"""Materialized screener session results.
+
+The summary, learner dashboard, screener comparison and practise
+recommendation explanation all need the same facts about a screener session:
+which skills are strong or need support, the readiness status, the skills
+needing support per recommended exercise and the V2 stage mastery. Rather
+than re-reading the session's answers and re-indexing QUESTIONS_V2 on every
+request, they are derived once into a ScreenerSessionSnapshot when the
+session is saved; readers fetch the latest snapshot(s) with one indexed query.
+"""
+
+from collections import defaultdict
+
+from django.db import transaction
+
+from littleTalkApp.content.assessments_v2 import QUESTIONS_V2_BY_ORDER
+from littleTalkApp.models import ScreenerSessionSnapshot
+from littleTalkApp.screener_answers import get_session_answers
+
+MOSTLY_YES_THRESHOLD = 0.6
+
+READINESS_SKILL = "Attention and listening"
+
+
+def iter_v2_scored_answers(answers):
+    """Yield non-readiness V2 answers normalized as lowercase yes/no strings."""
+
+    for question_id_str, user_answer in answers.items():
+        try:
+            question_id = int(question_id_str)
+        except (TypeError, ValueError):
+            continue
+
+        question = QUESTIONS_V2_BY_ORDER.get(question_id)
+        if not question or question.get("is_readiness"):
+            continue
+
+        normalized_answer = str(user_answer).strip().lower()
+        if normalized_answer not in {"yes", "no"}:
+            continue
+
+        yield question, normalized_answer
+
+
+def compute_stage_mastery(answers, tau=MOSTLY_YES_THRESHOLD):
+    """Compute per-stage mastery and stage ceiling based on clustered yes answers."""
+
+    return compute_scored_stage_mastery(iter_v2_scored_answers(answers), tau)
+
+
+def compute_scored_stage_mastery(scored_answers, tau=MOSTLY_YES_THRESHOLD):
+    """compute_stage_mastery for answers already passed through iter_v2_scored_answers."""
+
+    stage_stats = {
+        1: {"yes": 0, "total": 0},
+        2: {"yes": 0, "total": 0},
+        3: {"yes": 0, "total": 0},
+    }
+
+    for question, normalized_answer in scored_answers:
+        stage = question.get("stage")
+        if stage not in stage_stats:
+            continue
+        stage_stats[stage]["total"] += 1
+        if normalized_answer == "yes":
+            stage_stats[stage]["yes"] += 1
+
+    stage_mastery = {}
+    for stage, counts in stage_stats.items():
+        yes_ratio = (counts["yes"] / counts["total"]) if counts["total"] else 0.0
+        stage_mastery[stage] = yes_ratio >= tau
+
+    allowed_max_stage = 1
+    if stage_mastery[1]:
+        allowed_max_stage = 2
+    if stage_mastery[1] and stage_mastery[2]:
+        allowed_max_stage = 3
+
+    return stage_mastery, allowed_max_stage
+
+
+def build_screener_snapshot(learner_id, session_id, screener_version, answers):
+    """Return an unsaved ScreenerSessionSnapshot for one session's answers.
+
+    `answers` are the session's ScreenerAnswer tuples (see
+    screener_answers.py), in the order they were given.
+    """
+
+    skill_answers = defaultdict(list)
+    readiness_answers = []
+    support_skills_by_exercise = defaultdict(list)
+    for answer in answers:
+        skill_answers[answer.skill].append(answer.answer)
+        if answer.skill == READINESS_SKILL:
+            readiness_answers.append(str(answer.answer).strip().lower())
+        if screener_version == 2 and answer.answer == "No":
+            exercise_id = QUESTIONS_V2_BY_ORDER.get(answer.question_id, {}).get("exercise_id")
+            if exercise_id and answer.skill not in support_skills_by_exercise[exercise_id]:
+                support_skills_by_exercise[exercise_id].append(answer.skill)
+
+    if "no" in readiness_answers:
+        readiness_status = "not_ready"
+    elif readiness_answers and all(answer == "yes" for answer in readiness_answers):
+        readiness_status = "ready"
+    else:
+        readiness_status = "mixed"
+
+    stage_mastery = {}
+    allowed_max_stage = None
+    if screener_version == 2:
+        mastery, allowed_max_stage = compute_stage_mastery(
+            {answer.question_id: answer.answer for answer in answers}
+        )
+        stage_mastery = {str(stage): mastered for stage, mastered in mastery.items()}
+
+    return ScreenerSessionSnapshot(
+        learner_id=learner_id,
+        session_id=session_id,
+        screener_version=screener_version,
+        started_at=min(answer.timestamp for answer in answers),
+        assessment_date=min(
+            (answer.assessment_date for answer in answers if answer.assessment_date),
+            default=None,
+        ),
+        strong_skills=[
+            skill for skill, responses in skill_answers.items() if "No" not in responses
+        ],
+        support_skills=[skill for skill, responses in skill_answers.items() if "No" in responses],
+        readiness_status=readiness_status,
+        support_skills_by_exercise=dict(support_skills_by_exercise),
+        stage_mastery=stage_mastery,
+        allowed_max_stage=allowed_max_stage,
+    )
+
+
+def build_screener_snapshots(answers):
+    """Group answers by (learner, session) and return one unsaved snapshot per session.
+
+    `answers` must be ordered by learner and timestamp so each session's
+    answers keep the order they were given in.
+    """
+
+    sessions = {}
+    for answer in answers:
+        key = (answer.learner_id, answer.session_id)
+        sessions.setdefault(key, (answer.screener_version, []))[1].append(answer)
+
+    return [
+        build_screener_snapshot(learner_id, session_id, screener_version, session_answers)
+        for (learner_id, session_id), (screener_version, session_answers) in sessions.items()
+    ]
+
+
+def record_screener_snapshot(learner, session_id, screener_version, answers=None):
+    """Derive and store the snapshot of one saved session, replacing any earlier one."""
+
+    if answers is None:
+        answers = get_session_answers(learner, session_id)
+    if not answers:
+        return None
+
+    snapshot = build_screener_snapshot(learner.id, session_id, screener_version, answers)
+    with transaction.atomic():
+        ScreenerSessionSnapshot.objects.filter(learner=learner, session_id=session_id).delete()
+        snapshot.save()
+    return snapshot
+
+
+def get_latest_screener_snapshots(learner, screener_version=None, limit=1):
+    """Return the learner's newest snapshots, newest first, in one indexed query."""
+
+    snapshots = ScreenerSessionSnapshot.objects.filter(learner=learner)
+    if screener_version is not None:
+        snapshots = snapshots.filter(screener_version=screener_version)
+    return list(snapshots.order_by("-started_at")[:limit])
+
+
+def get_latest_screener_snapshot(learner, screener_version=None):
+    """Return the learner's newest snapshot, or None."""
+
+    snapshots = get_latest_screener_snapshots(learner, screener_version, limit=1)
+    return snapshots[0] if snapshots else None
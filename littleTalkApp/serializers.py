@@ -31,6 +31,18 @@ class SubmitExerciseSerializer(serializers.Serializer):
             raise serializers.ValidationError("Unsupported exercise_id.")
         return value
 
+
+MAX_BATCH_SUBMISSIONS = 100
+
+"""Envelope serializer for batched exercise submissions; each item is validated with SubmitExerciseSerializer."""
+class SubmitExerciseBatchSerializer(serializers.Serializer):
+    results = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=MAX_BATCH_SUBMISSIONS,
+    )
+
+
 class LearnerExpUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Learner
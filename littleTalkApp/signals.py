@@ -0,0 +1,72 @@
+"""Signal receivers that keep cached request access contexts and daily rollups fresh.
+
+Connected in LittletalkappConfig.ready(). See littleTalkApp/access.py and
+LearnerDailyStats.
+"""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from littleTalkApp.access import invalidate_access_context, invalidate_school_access
+from littleTalkApp.models import (
+    ExerciseSession,
+    Learner,
+    LearnerDailyStats,
+    Profile,
+    School,
+    SchoolMembership,
+)
+
+
+@receiver(post_save, sender=SchoolMembership)
+@receiver(post_delete, sender=SchoolMembership)
+def invalidate_membership_access(sender, instance, **kwargs):
+    invalidate_access_context(instance.profile_id)
+
+
+@receiver(post_save, sender=School)
+def invalidate_school_change(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_school_access(instance.pk)
+
+
+@receiver(pre_delete, sender=School)
+def invalidate_school_delete(sender, instance, **kwargs):
+    # pre_delete: the memberships and Profile.schools rows naming the school
+    # are still there to be looked up.
+    invalidate_school_access(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+def invalidate_profile_change(sender, instance, **kwargs):
+    invalidate_access_context(instance.pk)
+
+
+@receiver(m2m_changed, sender=Profile.schools.through)
+def invalidate_profile_schools_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear" and reverse:
+        # pk_set is None for clears; capture the linked profiles before they go.
+        invalidate_school_access(instance.pk)
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        invalidate_access_context(instance.pk)
+    elif pk_set:
+        invalidate_access_context(*pk_set)
+
+
+@receiver(post_save, sender=ExerciseSession)
+@receiver(post_delete, sender=ExerciseSession)
+def rebuild_session_day(sender, instance, origin=None, **kwargs):
+    # The submission path bulk-inserts sessions and increments the rollups
+    # itself; this covers sessions saved or deleted one at a time (admin,
+    # shell). Any other delete origin is a learner deletion cascading to
+    # sessions and rollups alike.
+    if origin is not None and getattr(origin, "model", type(origin)) is not ExerciseSession:
+        return
+    LearnerDailyStats.rebuild(
+        [instance.learner_id], day=timezone.localdate(instance.created_at)
+    )
+    Learner.bump_progress_version([instance.learner_id])
@@ -1,9 +1,41 @@
+from contextlib import contextmanager
 from datetime import timedelta
 
 from django.utils import timezone
 
 from accounts.models import User
-from littleTalkApp.models import ParentProfile, Profile, Role, School, SchoolMembership, SkolonUser, SkolonOrg
+from littleTalkApp.models import (
+    ParentProfile,
+    Profile,
+    Role,
+    School,
+    SchoolMembership,
+    ScreenerQuestion,
+    SkolonOrg,
+    SkolonUser,
+)
+from littleTalkApp.query_budget import record_queries
+from littleTalkApp.screener_answers import get_screener_questions
+
+
+def screener_question(order=None, skill=None, screener_version=2):
+    """Return the catalogue question with this content order, or a made-up
+    question for `skill` numbered after the real ones."""
+
+    if order is not None:
+        return get_screener_questions(screener_version)[order]
+    question = ScreenerQuestion.objects.filter(
+        screener_version=screener_version, skill=skill, order__gte=100
+    ).first()
+    if question is None:
+        question = ScreenerQuestion.objects.create(
+            screener_version=screener_version,
+            order=100 + ScreenerQuestion.objects.filter(order__gte=100).count(),
+            topic="Topic",
+            skill=skill,
+            text=f"Question about {skill}",
+        )
+    return question
 
 
 class BaseFlowTestMixin:
@@ -57,3 +89,28 @@ class BaseFlowTestMixin:
         session = self.client.session
         session["selected_school_id"] = school_id
         session.save()
+
+
+class QueryBudgetTestMixin:
+    @contextmanager
+    def assertQueryBudget(self, max_queries, max_duplicates=None):
+        """Fail if the block runs more than max_queries queries (or repeats too many).
+
+        Unlike assertNumQueries this is an upper bound, and the failure message
+        lists the most repeated statements so N+1 loops are easy to spot.
+        """
+        with record_queries() as stats:
+            yield stats
+
+        duplicates = "\n".join(f"  {count}x {sql}" for sql, count in stats.duplicates()[:5])
+        self.assertLessEqual(
+            stats.count,
+            max_queries,
+            f"{stats.count} queries exceeds budget of {max_queries}. Repeated:\n{duplicates}",
+        )
+        if max_duplicates is not None:
+            self.assertLessEqual(
+                stats.duplicate_count,
+                max_duplicates,
+                f"{stats.duplicate_count} duplicate queries exceeds {max_duplicates}:\n{duplicates}",
+            )
@@ -0,0 +1,208 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from littleTalkApp import access as access_module
+from littleTalkApp.access import AccessContext, get_access_context, load_access_context
+from littleTalkApp.integrations import skolon_sync
+from littleTalkApp.models import Learner, Profile, Role, School, SchoolMembership, SkolonOrg
+from littleTalkApp.tests.base import BaseFlowTestMixin
+
+
+class AccessContextTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="access_user", password="password123")
+        self.profile = Profile.objects.create(user=self.user, role=Role.STAFF)
+        self.school_a = School.objects.create(name="School A", is_licensed=True)
+        self.school_b = School.objects.create(name="School B", is_licensed=True)
+
+    def _request(self, selected_school_id=None):
+        request = RequestFactory().get("/")
+        request.user = self.user
+        request.session = {}
+        if selected_school_id:
+            request.session["selected_school_id"] = selected_school_id
+        return request
+
+    def test_active_memberships_define_schools_and_roles(self):
+        SchoolMembership.objects.create(
+            profile=self.profile, school=self.school_a, role=Role.ADMIN, is_active=True
+        )
+        SchoolMembership.objects.create(
+            profile=self.profile, school=self.school_b, role=Role.STAFF, is_active=False
+        )
+
+        with self.assertNumQueries(1):
+            access = AccessContext.build(self.profile)
+
+        self.assertEqual(access.schools, [self.school_a])
+        self.assertEqual(access.role_for_school(self.school_a), Role.ADMIN)
+        self.assertIsNone(access.role_for_school(self.school_b))
+        self.assertTrue(access.can_manage_school(self.school_a))
+
+    def test_legacy_profiles_fall_back_to_schools_m2m(self):
+        self.profile.schools.add(self.school_a, self.school_b)
+
+        access = AccessContext.build(self.profile)
+
+        self.assertTrue(access.has_multiple_schools)
+        self.assertEqual(access.role_for_school(self.school_b), Role.STAFF)
+        self.assertEqual(access.current_school(self._request(self.school_b.id)), self.school_b)
+        self.assertEqual(access.current_school(self._request(999)), self.school_a)
+
+    def test_context_is_built_once_and_shared_with_profile_helpers(self):
+        SchoolMembership.objects.create(
+            profile=self.profile, school=self.school_a, role=Role.TEAM_MANAGER, is_active=True
+        )
+        request = self._request()
+        access = get_access_context(request)
+        profile = request.user.profile
+
+        with self.assertNumQueries(0):
+            self.assertIs(get_access_context(request), access)
+            self.assertEqual(profile.get_current_school(request), self.school_a)
+            self.assertTrue(profile.is_manager_for_school(self.school_a))
+            self.assertFalse(profile.has_multiple_schools())
+
+    def test_parent_has_no_schools(self):
+        self.profile.role = Role.PARENT
+        self.profile.save()
+
+        access = AccessContext.build(self.profile)
+
+        self.assertTrue(access.is_parent)
+        self.assertIsNone(access.current_school(self._request()))
+
+
+class AccessContextQueryCountTests(BaseFlowTestMixin, TestCase):
+    def test_staff_dashboard_resolves_access_with_one_membership_query(self):
+        user, _, school = self.create_staff_user_with_school(
+            username="access_query_staff", role=Role.STAFF
+        )
+        learner = Learner.objects.create(
+            user=user, school=school, name="Query Learner", date_of_birth=timezone.now().date()
+        )
+        self.client.force_login(user)
+        self.set_selected_school(school.id)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("learner_dashboard"), {"learner": str(learner.learner_uuid)}
+            )
+
+        self.assertEqual(response.status_code, 200)
+        access_queries = [
+            q["sql"]
+            for q in queries
+            if '"littleTalkApp_schoolmembership"' in q["sql"]
+            or 'FROM "littleTalkApp_school"' in q["sql"]
+        ]
+        self.assertEqual(len(access_queries), 1)
+        self.assertEqual(len(queries), 13)
+
+
+class AccessContextCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="cached_access_user", password="password123")
+        self.profile = Profile.objects.create(user=self.user, role=Role.STAFF)
+        self.school = School.objects.create(name="Cached School", is_licensed=True)
+        self.other_school = School.objects.create(name="Other School", is_licensed=True)
+        SchoolMembership.objects.create(
+            profile=self.profile, school=self.school, role=Role.STAFF, is_active=True
+        )
+
+    def _load(self):
+        return load_access_context(Profile.objects.get(pk=self.profile.pk))
+
+    def test_second_load_is_served_from_cache(self):
+        self._load()
+        profile = Profile.objects.get(pk=self.profile.pk)
+
+        with self.assertNumQueries(0):
+            access = load_access_context(profile)
+
+        self.assertEqual(access.schools, [self.school])
+
+    def test_membership_changes_invalidate(self):
+        self._load()
+        SchoolMembership.objects.create(
+            profile=self.profile, school=self.other_school, role=Role.ADMIN, is_active=True
+        )
+        self.assertEqual(self._load().schools, [self.school, self.other_school])
+
+        SchoolMembership.objects.filter(school=self.other_school).get().delete()
+        self.assertEqual(self._load().schools, [self.school])
+
+    def test_profile_schools_m2m_changes_invalidate(self):
+        SchoolMembership.objects.all().delete()
+        self.assertEqual(self._load().schools, [])
+
+        self.other_school.profiles.add(self.profile)
+        self.assertEqual(self._load().schools, [self.other_school])
+
+        self.other_school.profiles.clear()
+        self.assertEqual(self._load().schools, [])
+
+    def _load_in_other_worker(self):
+        # Each gunicorn worker has its own LocMemCache, which never sees the
+        # invalidations made by the worker that handled the write.
+        with mock.patch.object(access_module, "cache", self.other_worker_cache):
+            return self._load()
+
+    def test_deactivation_reaches_other_workers(self):
+        self.other_worker_cache = LocMemCache("other-worker", {})
+        self.assertEqual(self._load_in_other_worker().schools, [self.school])
+
+        membership = SchoolMembership.objects.get(profile=self.profile)
+        membership.is_active = False
+        membership.save()
+
+        self.assertEqual(self._load_in_other_worker().schools, [])
+
+    def test_license_change_reaches_other_workers(self):
+        self.other_worker_cache = LocMemCache("other-worker", {})
+        self._load_in_other_worker()
+
+        self.school.is_licensed = False
+        self.school.save()
+
+        self.assertFalse(self._load_in_other_worker().schools[0].has_valid_license())
+
+    def test_school_license_change_invalidates(self):
+        self._load()
+        self.school.is_licensed = False
+        self.school.save()
+
+        self.assertFalse(self._load().schools[0].has_valid_license())
+
+    def test_skolon_license_sync_invalidates(self):
+        self._load()
+        SkolonOrg.objects.create(skolon_id="org-1", name="Org", school=self.school)
+
+        client = mock.MagicMock()
+        client.get_licenses.return_value = {"licenses": [], "hasMore": False}
+
+        skolon_sync.sync_licenses(client)
+
+        self.assertFalse(self._load().schools[0].is_licensed)
+
+    def test_cache_never_outlives_license_expiry(self):
+        self.school.license_expires_at = timezone.now() + timedelta(seconds=90)
+        self.school.save()
+
+        with mock.patch.object(cache, "set", wraps=cache.set) as cache_set:
+            self._load()
+
+        timeout = cache_set.call_args.args[2]
+        self.assertLessEqual(timeout, 91)
+        self.assertGreater(timeout, 0)
@@ -0,0 +1,108 @@
+from django.contrib import admin
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connection
+from django.db.models.constants import LOOKUP_SEP
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from encrypted_model_fields.fields import EncryptedMixin
+
+from accounts.models import User
+from littleTalkApp.models import JoinRequest, Learner, LogEntry, Profile, Role, School
+from littleTalkApp.tests.base import BaseFlowTestMixin
+from littleTalkApp.utilities import hash_email
+
+
+def _resolve_field(model, path):
+    """Return the field at the end of a lookup path, or None if it is not a field."""
+    field = None
+    for part in path.lstrip("^=@").split(LOOKUP_SEP):
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            return None
+        model = field.related_model or model
+    return field
+
+
+class AdminUserSearchTests(BaseFlowTestMixin, TestCase):
+    def setUp(self):
+        self.user, self.profile, self.school = self.create_staff_user_with_school(
+            username="support_target", role=Role.STAFF
+        )
+        self.user.email_encrypted = "Teacher@Example.com"
+        self.user.email_hash = hash_email("teacher@example.com")
+        self.user.save()
+        self.school.created_by = self.user
+        self.school.save()
+        self.other_user, _, _ = self.create_staff_user_with_school(
+            username="someone_else", role=Role.STAFF
+        )
+        self.learner = Learner.objects.create(user=self.user, school=self.school, name="Maja")
+        LogEntry.objects.create(user=self.user, learner=self.learner, school=self.school, title="Visit")
+
+        superuser = User.objects.create_superuser(username="support_admin", password="password123")
+        self.client.force_login(superuser)
+
+    def _search(self, model, query):
+        url = reverse(f"admin:{model._meta.app_label}_{model._meta.model_name}_changelist")
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url, {"q": query})
+        self.assertEqual(response.status_code, 200)
+        return list(response.context["cl"].result_list), captured
+
+    def test_email_queries_match_the_indexed_hash(self):
+        results, captured = self._search(Profile, "  TEACHER@example.com ")
+
+        self.assertEqual(results, [self.profile])
+        self.assertTrue(any("email_hash" in query["sql"] for query in captured.captured_queries))
+
+    def test_email_search_covers_every_user_reference(self):
+        cases = [
+            (User, self.user),
+            (School, self.school),
+            (Learner, self.learner),
+            (LogEntry, LogEntry.objects.get()),
+        ]
+        for model, expected in cases:
+            with self.subTest(model=model.__name__):
+                results, _ = self._search(model, "teacher@example.com")
+                self.assertEqual(results, [expected])
+
+    def test_other_terms_fall_back_to_username(self):
+        results, _ = self._search(Profile, "support_tar")
+
+        self.assertEqual(results, [self.profile])
+
+    def test_uuid_queries_match_exactly(self):
+        Learner.objects.create(user=self.other_user, school=self.school, name="Nils")
+
+        results, _ = self._search(Learner, str(self.learner.learner_uuid))
+
+        self.assertEqual(results, [self.learner])
+
+    def test_join_requests_match_their_own_plaintext_email(self):
+        join_request = JoinRequest.objects.create(
+            full_name="New Teacher", email="New.Teacher@example.com", school=self.school
+        )
+
+        results, _ = self._search(JoinRequest, "new.teacher@EXAMPLE.com")
+
+        self.assertEqual(results, [join_request])
+
+    def test_admins_never_search_or_sort_by_ciphertext(self):
+        for model, model_admin in admin.site._registry.items():
+            paths = [(name, "search") for name in model_admin.search_fields]
+            sortable = model_admin.sortable_by
+            if sortable is None:
+                sortable = model_admin.list_display
+            for name in model_admin.list_display:
+                if name not in sortable:
+                    continue
+                attribute = getattr(model_admin, name, None)
+                order_field = name if attribute is None else getattr(attribute, "admin_order_field", None)
+                if order_field:
+                    paths.append((order_field, "order"))
+            for path, usage in paths:
+                with self.subTest(model=model._meta.label, path=path, usage=usage):
+                    self.assertNotIsInstance(_resolve_field(model, path), EncryptedMixin)
@@ -25,17 +25,28 @@ class ApiTypicalFlowTests(BaseFlowTestMixin, TestCase):
         payload = {
             "exp": 10,
             "total_exercises": 1,
-            "timestamp": timezone.now().isoformat(),
             "nonce": "nonce-abc-123",
+            "exercise_id": "categorisation",
+            "difficulty_level": 2,
+            "started_at": (timezone.now() - timedelta(minutes=2)).isoformat(),
+            "completed_at": timezone.now().isoformat(),
+            "total_questions": 4,
+            "incorrect_answers": 1,
+            "attempts_per_question": [1, 2, 1, 1],
         }
 
-        url = reverse("update_learner_exp", kwargs={"learner_uuid": learner.learner_uuid})
+        url = reverse("submit_exercise", kwargs={"learner_uuid": learner.learner_uuid})
         first_response = self.client.post(url, data=json.dumps(payload), content_type="application/json")
         self.assertEqual(first_response.status_code, 200)
 
         second_response = self.client.post(url, data=json.dumps(payload), content_type="application/json")
-        self.assertEqual(second_response.status_code, 400)
-        self.assertIn("Nonce already used", second_response.content.decode())
+        self.assertEqual(second_response.status_code, 200)
+        self.assertEqual(second_response.json(), first_response.json())
+        self.assertEqual(second_response["Idempotent-Replayed"], "true")
+
+        learner.refresh_from_db()
+        self.assertEqual(learner.exp, 10)
+        self.assertEqual(learner.exercise_sessions.count(), 1)
 
     def test_update_exp_rejects_old_timestamp(self):
         user, _, school = self.create_staff_user_with_school(username="api_staff_2", role=Role.STAFF)
@@ -1,16 +1,27 @@
 import json
+import uuid
 from datetime import timedelta
+from unittest.mock import patch
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
+from accounts.models import User
+from littleTalkApp.content.assessments import QUESTIONS_BY_ORDER
+from littleTalkApp.content.assessments_v2 import QUESTIONS_V2
 from littleTalkApp.models import Learner, LearnerAssessmentAnswer, Role
-from littleTalkApp.tests.base import BaseFlowTestMixin
+from littleTalkApp.screener_snapshots import record_screener_snapshot
+from littleTalkApp.tests.base import BaseFlowTestMixin, screener_question
 from littleTalkApp.views_modules.assessment import (
     compute_stage_mastery,
     compute_v2_recommendations,
     compute_v2_secondary_recommendations,
+    get_screener_comparison_data,
+    save_assessment_for_learner,
+    save_assessment_v2_for_learner,
 )
 
 
@@ -233,3 +244,108 @@ class AssessmentRecommendationTests(TestCase):
             ["colourful-semantics", "categorisation", "concept-quest"],
         )
         self.assertEqual(secondary, ["story-train"])
+
+
+class ScreenerComparisonTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username="comparison-owner", password="password123")
+        self.learner = Learner.objects.create(user=user, name="Comparison Learner", assessment2=2)
+        self.learner.recommendation_level = 3
+
+    def _create_session(self, days_ago, answers):
+        session_id = uuid.uuid4()
+        for skill, answer in answers.items():
+            LearnerAssessmentAnswer.objects.create(
+                learner=self.learner,
+                question=screener_question(skill=skill),
+                answered_yes=answer == "Yes",
+                session_id=session_id,
+            )
+        LearnerAssessmentAnswer.objects.filter(session_id=session_id).update(
+            timestamp=timezone.now() - timedelta(days=days_ago),
+            assessment_date=(timezone.now() - timedelta(days=days_ago)).date(),
+        )
+        record_screener_snapshot(self.learner, session_id, 2)
+        return session_id
+
+    def test_compares_only_the_two_latest_sessions(self):
+        self._create_session(200, {"Nouns": "Yes", "Verbs": "Yes", "Plurals": "Yes"})
+        self._create_session(100, {"Nouns": "No", "Verbs": "Yes", "Plurals": "No"})
+        self._create_session(1, {"Nouns": "Yes", "Verbs": "No", "Plurals": "No"})
+
+        with self.assertNumQueries(1):
+            comparison = get_screener_comparison_data(self.learner, screener_version=2)
+
+        self.assertEqual(comparison["skills_gained"], ["Nouns"])
+        self.assertEqual(comparison["skills_lost"], ["Verbs"])
+        self.assertEqual(comparison["skills_maintained_support"], ["Plurals"])
+        self.assertEqual(
+            comparison["previous_session_date"],
+            (timezone.now() - timedelta(days=100)).date(),
+        )
+        self.assertEqual(comparison["recommendation_change"]["direction"], "improved")
+
+    def test_comparison_follows_the_newest_snapshots(self):
+        self._create_session(100, {"Nouns": "No"})
+        self._create_session(10, {"Nouns": "Yes"})
+        first = get_screener_comparison_data(self.learner, screener_version=2)
+
+        self._create_session(1, {"Nouns": "No"})
+        after_new_session = get_screener_comparison_data(self.learner, screener_version=2)
+
+        self.assertEqual(first["skills_gained"], ["Nouns"])
+        self.assertEqual(after_new_session["skills_lost"], ["Nouns"])
+
+    def test_returns_none_with_a_single_session(self):
+        self._create_session(1, {"Nouns": "Yes"})
+
+        self.assertIsNone(get_screener_comparison_data(self.learner, screener_version=2))
+
+
+class ScreenerPersistenceTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username="persistence-owner", password="password123")
+        self.learner = Learner.objects.create(user=user, name="Persistence Learner")
+
+    def _count_save_queries(self, answers):
+        with CaptureQueriesContext(connection) as captured:
+            save_assessment_v2_for_learner(self.learner, answers)
+        return len(captured.captured_queries)
+
+    def test_v2_save_uses_a_constant_number_of_queries(self):
+        short = self._count_save_queries({"1": "Yes", "3": "No"})
+        full = self._count_save_queries(
+            {str(question["order"]): "No" for question in QUESTIONS_V2}
+        )
+
+        self.assertEqual(short, full)
+        self.assertEqual(
+            LearnerAssessmentAnswer.objects.filter(learner=self.learner).count(),
+            2 + len(QUESTIONS_V2),
+        )
+
+    def test_v2_save_is_all_or_nothing(self):
+        with patch(
+            "littleTalkApp.views_modules.assessment.record_screener_snapshot",
+            side_effect=RuntimeError("boom"),
+        ):
+            with self.assertRaises(RuntimeError):
+                save_assessment_v2_for_learner(self.learner, {"1": "Yes", "3": "No"})
+
+        self.assertFalse(LearnerAssessmentAnswer.objects.exists())
+        self.learner.refresh_from_db()
+        self.assertIsNone(self.learner.recommended_exercise_ids)
+
+    def test_legacy_save_records_a_version_one_session(self):
+        self.learner.recommendation_level = 1
+        answers = {"1": "Yes", "3": "Yes", "9": "Yes", "10": "No", "11": "Yes", "bad": "Yes"}
+
+        save_assessment_for_learner(self.learner, answers)
+
+        saved = LearnerAssessmentAnswer.objects.filter(learner=self.learner)
+        self.assertEqual(saved.count(), 5)
+        self.assertEqual(set(saved.values_list("screener_version", flat=True)), {1})
+        self.learner.refresh_from_db()
+        self.assertEqual(self.learner.assessment2, 1)
+        self.assertEqual(self.learner.assessment1, 3)
+        self.assertEqual(self.learner.recommendation_level, QUESTIONS_BY_ORDER[9]["complexity"])
@@ -0,0 +1,428 @@
+import importlib
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from littleTalkApp.models import ExerciseSession, Learner, LearnerDailyStats, Role, Target
+from littleTalkApp.tests.base import BaseFlowTestMixin
+from littleTalkApp.views_modules import dashboard
+from littleTalkApp.views_modules.dashboard import (
+    _build_targets_data,
+    _downsample_progress_series,
+)
+
+BUILD_DAILY_STATS_MIGRATION = importlib.import_module(
+    "littleTalkApp.migrations.0094_build_daily_stats"
+)
+
+
+class DashboardTestMixin(BaseFlowTestMixin):
+    def setUp(self):
+        self.user, _, self.school = self.create_staff_user_with_school(
+            username="dashboard_staff", role=Role.STAFF
+        )
+        self.learner = Learner.objects.create(
+            user=self.user,
+            school=self.school,
+            name="Dashboard Learner",
+            date_of_birth=timezone.now().date() - timedelta(days=365 * 7),
+        )
+        self.client.force_login(self.user)
+        self.set_selected_school(self.school.id)
+
+    def _create_session(self, completed_at, incorrect_answers=1, exp_total=None, **overrides):
+        session = ExerciseSession.objects.create(
+            learner=self.learner,
+            exercise_id=overrides.pop("exercise_id", "categorisation"),
+            difficulty_selected="2",
+            started_at=completed_at - timedelta(minutes=2),
+            completed_at=completed_at,
+            total_questions=4,
+            incorrect_answers=incorrect_answers,
+            attempts_per_question=[1, 1, 1, 1],
+            learner_total_exp_after_session=exp_total,
+            **overrides,
+        )
+        # created_at is auto_now_add; the progress date range filters on it.
+        ExerciseSession.objects.filter(pk=session.pk).update(created_at=completed_at)
+        return session
+
+    def _get_progress(self, **params):
+        params.setdefault("learner_uuid", str(self.learner.learner_uuid))
+        return self.client.get(reverse("learner_progress_data"), params)
+
+    def _metric_values(self, response, metric):
+        for entry in response.json()["metrics_data"]:
+            if entry["metric"] == metric:
+                return entry["values"]
+        raise AssertionError(f"{metric} missing from response")
+
+
+class LearnerProgressDataTests(DashboardTestMixin, TestCase):
+    def test_progress_reads_stored_session_metrics(self):
+        now = timezone.now()
+        self._create_session(now - timedelta(days=2), incorrect_answers=1, exp_earned=15)
+        self._create_session(now - timedelta(days=1), incorrect_answers=3, exp_earned=5)
+
+        response = self._get_progress(date_range="7", metrics="exp,accuracy,time_elapsed")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._metric_values(response, "exp"), [15, 20])
+        self.assertEqual(self._metric_values(response, "accuracy"), [75.0, 25.0])
+        self.assertEqual(response.json()["granularity"], "session")
+        self.assertEqual(self._metric_values(response, "time_elapsed"), [2.0, 2.0])
+
+    def test_cumulative_exp_counts_prior_sessions_and_legacy_rows(self):
+        now = timezone.now()
+        self._create_session(now - timedelta(days=20), exp_earned=25)
+        self._create_session(now - timedelta(days=15))
+        self._create_session(now - timedelta(days=1), exp_earned=5)
+
+        response = self._get_progress(date_range="7", metrics="exp,exercises")
+
+        self.assertEqual(self._metric_values(response, "exp"), [40])
+        self.assertEqual(self._metric_values(response, "exercises"), [3])
+
+    def test_max_accuracy_keeps_only_lower_accuracy_sessions(self):
+        now = timezone.now()
+        self._create_session(now - timedelta(days=3), incorrect_answers=0)
+        self._create_session(now - timedelta(days=2), incorrect_answers=3)
+        self._create_session(now - timedelta(days=1), incorrect_answers=2)
+
+        response = self._get_progress(metrics="accuracy", max_accuracy="50")
+
+        self.assertEqual(self._metric_values(response, "accuracy"), [25.0])
+
+    def test_max_accuracy_must_be_numeric(self):
+        response = self._get_progress(metrics="accuracy", max_accuracy="low")
+
+        self.assertEqual(response.status_code, 400)
+
+
+class LearnerDailyStatsProgressTests(DashboardTestMixin, TestCase):
+    def _rebuild(self):
+        output = StringIO()
+        call_command("rebuild_daily_stats", stdout=output)
+        return output.getvalue()
+
+    def test_long_ranges_return_one_point_per_day_from_rollups(self):
+        now = timezone.now()
+        self._create_session(now - timedelta(days=45), exp_earned=50)
+        self._create_session(now - timedelta(days=3, hours=1), incorrect_answers=0, exp_earned=10)
+        self._create_session(now - timedelta(days=3), incorrect_answers=2, exp_earned=20)
+        self._create_session(now - timedelta(days=1), incorrect_answers=1, exp_earned=5)
+        self._rebuild()
+
+        response = self._get_progress(date_range="30", metrics="exp,exercises,accuracy,time_elapsed")
+
+        self.assertEqual(response.json()["granularity"], "day")
+        self.assertEqual(len(response.json()["dates"]), 2)
+        self.assertEqual(self._metric_values(response, "exp"), [80, 85])
+        self.assertEqual(self._metric_values(response, "exercises"), [3, 4])
+        self.assertEqual(self._metric_values(response, "accuracy"), [75.0, 75.0])
+        self.assertEqual(self._metric_values(response, "time_elapsed"), [2.0, 2.0])
+
+    def test_all_range_starts_at_first_rollup_without_scanning_sessions(self):
+        first_day = timezone.now() - timedelta(days=200)
+        self._create_session(first_day)
+        self._create_session(timezone.now() - timedelta(days=2))
+        self._rebuild()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self._get_progress(date_range="all", metrics="exercises")
+
+        self.assertFalse(
+            [q["sql"] for q in queries if "littletalkapp_exercisesession" in q["sql"].lower()]
+        )
+
+        self.assertEqual(response.json()["date_start"], first_day.date().isoformat())
+        self.assertEqual(self._metric_values(response, "exercises"), [1, 2])
+
+    def test_rebuild_replaces_stale_rollups(self):
+        day = timezone.now() - timedelta(days=1)
+        self._create_session(day)
+        LearnerDailyStats.objects.create(
+            learner=self.learner, date=day.date(), exercise_id="categorisation", session_count=9
+        )
+
+        output = self._rebuild()
+
+        rollup = LearnerDailyStats.objects.get(learner=self.learner)
+        self.assertEqual(rollup.session_count, 1)
+        self.assertEqual(rollup.exp_total, 10)
+        self.assertIn("Rebuilt 1 daily rollups for 1 learners", output)
+
+    def test_submissions_increment_daily_rollups(self):
+        url = reverse("submit_exercise", kwargs={"learner_uuid": self.learner.learner_uuid})
+        for nonce, incorrect in (("rollup-1", 0), ("rollup-2", 2)):
+            self.client.post(
+                url,
+                data={
+                    "nonce": nonce,
+                    "exp": 10,
+                    "total_exercises": 1,
+                    "exercise_id": "categorisation",
+                    "difficulty_level": 2,
+                    "started_at": (timezone.now() - timedelta(minutes=1)).isoformat(),
+                    "completed_at": timezone.now().isoformat(),
+                    "total_questions": 4,
+                    "incorrect_answers": incorrect,
+                    "attempts_per_question": [1, 1, 1, 1],
+                },
+                content_type="application/json",
+            )
+
+        rollup = LearnerDailyStats.objects.get(learner=self.learner)
+        self.assertEqual(rollup.date, timezone.localdate())
+        self.assertEqual(rollup.session_count, 2)
+        self.assertEqual(rollup.exp_total, 20)
+        self.assertEqual(rollup.accuracy_sum, 150.0)
+        self.assertEqual(rollup.accuracy_count, 2)
+        self.assertEqual(rollup.difficulty_sum, 4.0)
+
+    def test_migration_builds_rollups_for_existing_sessions(self):
+        self._create_session(timezone.now() - timedelta(days=3), exp_earned=15)
+        self._create_session(timezone.now() - timedelta(days=1), exp_earned=5)
+        legacy = self._create_session(timezone.now() - timedelta(days=1), incorrect_answers=3)
+        ExerciseSession.objects.filter(pk=legacy.pk).update(
+            accuracy_percentage=None, elapsed_seconds=None, difficulty_selected="n/a"
+        )
+        counters = ("learner_id", "date", "exercise_id", *LearnerDailyStats.COUNTER_FIELDS)
+        LearnerDailyStats.rebuild([self.learner.id])
+        expected = sorted(LearnerDailyStats.objects.values_list(*counters))
+        LearnerDailyStats.objects.all().delete()
+
+        BUILD_DAILY_STATS_MIGRATION.build_daily_stats(apps, schema_editor=None)
+
+        self.assertEqual(sorted(LearnerDailyStats.objects.values_list(*counters)), expected)
+        response = self._get_progress(date_range="30", metrics="exp")
+        self.assertEqual(self._metric_values(response, "exp"), [15, 30])
+
+    def test_editing_or_deleting_a_session_rebuilds_its_day(self):
+        day = timezone.now() - timedelta(days=2)
+        kept = self._create_session(day, exp_earned=15)
+        removed = self._create_session(day, exp_earned=5)
+        self._rebuild()
+
+        kept.refresh_from_db()
+        kept.exp_earned = 25
+        kept.save()
+        ExerciseSession.objects.get(pk=removed.pk).delete()
+
+        rollup = LearnerDailyStats.objects.get(learner=self.learner)
+        self.assertEqual((rollup.session_count, rollup.exp_total), (1, 25))
+
+        kept.delete()
+        self.assertFalse(LearnerDailyStats.objects.exists())
+
+    def test_deleting_a_learner_skips_rollup_rebuilds(self):
+        self._create_session(timezone.now() - timedelta(days=1))
+        self._rebuild()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.learner.delete()
+
+        self.assertFalse([q["sql"] for q in queries if q["sql"].startswith("INSERT")])
+        self.assertFalse(LearnerDailyStats.objects.exists())
+
+
+class ProgressDownsamplingTests(DashboardTestMixin, TestCase):
+    def test_downsample_keeps_cumulative_edges_and_averages_other_metrics(self):
+        dates, metrics_data, labels = _downsample_progress_series(
+            ["d1", "d2", "d3", "d4", "d5"],
+            {
+                "exp": [10, 20, 30, 40, 50],
+                "accuracy": [50.0, None, 100.0, 25.0, 75.0],
+                "difficulty": [1.0, 2.0, 2.0, 3.0, 3.0],
+            },
+            ["a", "b", "c", "d", "e"],
+            max_points=2,
+        )
+
+        self.assertEqual(dates, ["d2", "d5"])
+        self.assertEqual(metrics_data["exp"], [20, 50])
+        self.assertEqual(metrics_data["accuracy"], [50.0, 66.7])
+        self.assertEqual(metrics_data["difficulty"], [1.5, 2.67])
+        self.assertEqual(labels, ["b", "e"])
+
+    def test_downsample_leaves_short_series_untouched(self):
+        series = (["d1", "d2"], {"exp": [10, 20]}, ["", ""])
+
+        self.assertEqual(_downsample_progress_series(*series, max_points=5), series)
+
+    def test_max_points_limits_progress_response(self):
+        now = timezone.now()
+        for index in range(6):
+            self._create_session(now - timedelta(hours=6 - index), exp_earned=10)
+
+        response = self._get_progress(date_range="7", metrics="exp,exercises", max_points="3")
+
+        data = response.json()
+        self.assertEqual(len(data["dates"]), 3)
+        self.assertEqual(data["downsampled_from"], 6)
+        self.assertEqual(self._metric_values(response, "exp"), [20, 40, 60])
+        self.assertEqual(self._metric_values(response, "exercises"), [2, 4, 6])
+
+    def test_progress_is_downsampled_by_default(self):
+        now = timezone.now()
+        for index in range(6):
+            self._create_session(now - timedelta(hours=6 - index), exp_earned=10)
+
+        with mock.patch.object(dashboard, "DEFAULT_MAX_PROGRESS_POINTS", 3):
+            response = self._get_progress(date_range="7", metrics="exp")
+
+        self.assertEqual(response.json()["downsampled_from"], 6)
+        self.assertEqual(self._metric_values(response, "exp"), [20, 40, 60])
+
+    def test_max_points_must_be_at_least_two(self):
+        for value in ("1", "many"):
+            with self.subTest(max_points=value):
+                response = self._get_progress(max_points=value)
+
+                self.assertEqual(response.status_code, 400)
+
+
+class DashboardConditionalGetTests(DashboardTestMixin, TestCase):
+    def _session_table_queries(self, queries):
+        return [
+            q["sql"]
+            for q in queries
+            if "exercisesession" in q["sql"].lower() or "learnerdailystats" in q["sql"].lower()
+        ]
+
+    def test_progress_returns_304_without_session_queries(self):
+        self._create_session(timezone.now() - timedelta(hours=1))
+        first = self._get_progress(date_range="7", metrics="exp")
+        etag = first.headers["ETag"]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("learner_progress_data"),
+                {
+                    "learner_uuid": str(self.learner.learner_uuid),
+                    "date_range": "7",
+                    "metrics": "exp",
+                },
+                HTTP_IF_NONE_MATCH=etag,
+            )
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["ETag"], etag)
+        self.assertEqual(self._session_table_queries(queries), [])
+
+    def test_progress_etag_changes_with_new_submission_and_params(self):
+        first = self._get_progress(date_range="7", metrics="exp")
+        other_params = self._get_progress(date_range="7", metrics="exp,accuracy")
+
+        self.learner.add_progress(10, 1)
+        after_submission = self._get_progress(date_range="7", metrics="exp")
+
+        self.assertNotEqual(first.headers["ETag"], other_params.headers["ETag"])
+        self.assertNotEqual(first.headers["ETag"], after_submission.headers["ETag"])
+
+    def test_progress_etag_changes_when_maintenance_commands_rewrite_progress(self):
+        session = self._create_session(timezone.now() - timedelta(days=40))
+        params = {"learner_uuid": str(self.learner.learner_uuid), "date_range": "all"}
+        url = reverse("learner_progress_data")
+
+        etag = self.client.get(url, params).headers["ETag"]
+        call_command("rebuild_daily_stats", stdout=StringIO())
+        after_rebuild = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+
+        ExerciseSession.objects.filter(pk=session.pk).update(elapsed_seconds=None)
+        etag = after_rebuild.headers["ETag"]
+        call_command("backfill_session_metrics", stdout=StringIO())
+        after_backfill = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(after_rebuild.status_code, 200)
+        self.assertEqual(after_backfill.status_code, 200)
+
+    def test_selected_learner_context_returns_304_until_learner_changes(self):
+        session = self.client.session
+        session["selected_learner_id"] = self.learner.id
+        session.save()
+        url = reverse("get_current_session_learner_context")
+
+        first = self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            repeat = self.client.get(url, HTTP_IF_NONE_MATCH=first.headers["ETag"])
+        Learner.objects.filter(pk=self.learner.pk).update(assessment2=3)
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=first.headers["ETag"])
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(repeat.status_code, 304)
+        self.assertEqual(self._session_table_queries(queries), [])
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.json()["cs_level"], 3)
+
+
+class DashboardTargetsPanelTests(DashboardTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        statuses = [
+            Target.Status.ACHIEVED,
+            Target.Status.ACHIEVED,
+            Target.Status.NOT_ACHIEVED,
+            Target.Status.ONGOING,
+            Target.Status.NOT_SET,
+        ]
+        for index, status in enumerate(statuses):
+            Target.objects.create(learner=self.learner, text=f"Target {index}", status=status)
+
+    def test_targets_panel_is_built_from_one_query(self):
+        with self.assertNumQueries(1):
+            targets_data = _build_targets_data(self.learner)
+
+        self.assertEqual(targets_data["total_count"], 5)
+        self.assertEqual(targets_data["achieved_count"], 2)
+        self.assertEqual(targets_data["percentage"], 40)
+        self.assertEqual(len(targets_data["not_achieved"]), 1)
+        self.assertEqual(len(targets_data["ongoing"]), 1)
+        self.assertEqual(len(targets_data["not_set"]), 1)
+        self.assertEqual(
+            [target.text for target in targets_data["all"]],
+            ["Target 4", "Target 3", "Target 2", "Target 1", "Target 0"],
+        )
+
+    def test_dashboard_renders_targets_panel(self):
+        response = self.client.get(
+            reverse("learner_dashboard"), {"learner": str(self.learner.learner_uuid)}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["targets_data"]["achieved_count"], 2)
+
+
+class BackfillSessionMetricsCommandTests(DashboardTestMixin, TestCase):
+    def test_backfill_populates_metrics_in_chunks(self):
+        now = timezone.now()
+        self._create_session(now - timedelta(hours=3), incorrect_answers=0, exp_total=10)
+        self._create_session(now - timedelta(hours=2), incorrect_answers=2, exp_total=25)
+        self._create_session(now - timedelta(hours=1), incorrect_answers=1, exp_total=None)
+        ExerciseSession.objects.update(
+            accuracy_percentage=None, elapsed_seconds=None, exp_earned=None
+        )
+
+        output = StringIO()
+        call_command("backfill_session_metrics", "--batch-size", "2", stdout=output)
+
+        rows = list(
+            ExerciseSession.objects.order_by("id").values_list(
+                "accuracy_percentage", "elapsed_seconds", "exp_earned"
+            )
+        )
+        self.assertEqual(rows, [(100.0, 120, None), (50.0, 120, 15), (75.0, 120, None)])
+        self.assertIn("last id", output.getvalue())
+        self.assertIn("Backfilled metrics for 3 sessions", output.getvalue())
+
+        output = StringIO()
+        call_command("backfill_session_metrics", stdout=output)
+        self.assertIn("Backfilled metrics for 0 sessions", output.getvalue())
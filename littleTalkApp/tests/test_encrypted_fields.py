@@ -0,0 +1,223 @@
+from datetime import date
+from io import StringIO
+from unittest.mock import patch
+
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from encrypted_model_fields import fields as encrypted_fields
+
+from accounts.models import User
+from littleTalkApp.fields import Ciphertext
+from littleTalkApp.management.commands import rotate_encryption_keys
+from littleTalkApp.management.commands.rotate_encryption_keys import get_key_fingerprint
+from littleTalkApp.models import EncryptionRotationCheckpoint, Learner, LogEntry, Role, Target
+from littleTalkApp.tests.base import BaseFlowTestMixin
+
+
+class LazyDecryptionTests(BaseFlowTestMixin, TestCase):
+    def setUp(self):
+        self.user, _, self.school = self.create_staff_user_with_school(
+            username="lazy_staff", role=Role.STAFF
+        )
+        self.learner = Learner.objects.create(
+            user=self.user, school=self.school, name="Maja Berg", date_of_birth=date(2018, 5, 1)
+        )
+
+    def _stored(self, table, column, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT {column} FROM {table} WHERE id = %s", [pk])
+            return cursor.fetchone()[0]
+
+    def test_values_stay_encrypted_until_read(self):
+        learner = Learner.objects.get(pk=self.learner.pk)
+
+        self.assertIs(type(learner.__dict__["name"]), Ciphertext)
+        self.assertIs(type(learner.__dict__["date_of_birth"]), Ciphertext)
+        self.assertEqual(learner.name, "Maja Berg")
+        self.assertEqual(learner.__dict__["name"], "Maja Berg")
+        self.assertIs(type(learner.__dict__["date_of_birth"]), Ciphertext)
+        self.assertEqual(learner.date_of_birth, date(2018, 5, 1))
+
+    def test_each_value_is_decrypted_once(self):
+        field = Learner._meta.get_field("name")
+        learner = Learner.objects.get(pk=self.learner.pk)
+
+        with patch.object(field, "decrypt", wraps=field.decrypt) as decrypt:
+            for _ in range(3):
+                self.assertEqual(learner.name, "Maja Berg")
+
+        self.assertEqual(decrypt.call_count, 1)
+
+    def test_select_related_instances_decrypt_lazily(self):
+        LogEntry.objects.create(
+            user=self.user, learner=self.learner, school=self.school, title="Visit", notes="Notes"
+        )
+
+        entry = LogEntry.objects.select_related("learner").get()
+
+        self.assertIs(type(entry.__dict__["notes"]), Ciphertext)
+        self.assertIs(type(entry.learner.__dict__["name"]), Ciphertext)
+        self.assertEqual((entry.title, entry.learner.name), ("Visit", "Maja Berg"))
+
+    def test_values_queries_decrypt_eagerly(self):
+        self.assertEqual(list(Learner.objects.values_list("name", flat=True)), ["Maja Berg"])
+        self.assertEqual(
+            list(Learner.objects.values("date_of_birth")), [{"date_of_birth": date(2018, 5, 1)}]
+        )
+
+    def test_untouched_values_are_saved_without_reencryption(self):
+        stored_name = self._stored("littleTalkApp_learner", "name", self.learner.pk)
+        learner = Learner.objects.get(pk=self.learner.pk)
+
+        learner.exp = 20
+        learner.date_of_birth = date(2019, 1, 2)
+        learner.save()
+
+        self.assertEqual(self._stored("littleTalkApp_learner", "name", self.learner.pk), stored_name)
+        reloaded = Learner.objects.get(pk=self.learner.pk)
+        self.assertEqual((reloaded.name, reloaded.date_of_birth), ("Maja Berg", date(2019, 1, 2)))
+
+    def test_user_email_decrypts_lazily(self):
+        user = User.objects.create_user(username="lazy_email", email_encrypted="lazy@example.com")
+
+        loaded = User.objects.get(pk=user.pk)
+
+        self.assertIs(type(loaded.__dict__["email_encrypted"]), Ciphertext)
+        self.assertEqual(loaded.email_encrypted, "lazy@example.com")
+
+    @override_settings(ENCRYPTED_FIELDS_LAZY_DECRYPTION=False)
+    def test_setting_restores_eager_decryption(self):
+        learner = Learner.objects.get(pk=self.learner.pk)
+
+        self.assertIs(type(learner.__dict__["name"]), str)
+        self.assertEqual(learner.__dict__["date_of_birth"], date(2018, 5, 1))
+
+
+class BenchmarkEncryptedFieldsCommandTests(TestCase):
+    def test_reports_decryptions_saved_per_page(self):
+        output = StringIO()
+
+        call_command("benchmark_encrypted_fields", "--learners", "3", "--repeat", "1", stdout=output)
+
+        report = output.getvalue()
+        for url_name in ("learner_dashboard", "screener", "logbook"):
+            self.assertIn(f"{url_name:<18} saved", report)
+        self.assertFalse(Learner.objects.exists())
+
+
+class RotateEncryptionKeysCommandTests(BaseFlowTestMixin, TestCase):
+    def setUp(self):
+        self.user, self.profile, self.school = self.create_staff_user_with_school(
+            username="rotation_staff", role=Role.STAFF
+        )
+        self.learners = [
+            Learner.objects.create(user=self.user, school=self.school, name=name)
+            for name in ("Maja Berg", "Nils Holm", "Ali Majid")
+        ]
+        Target.objects.create(learner=self.learners[0], text="Use two-word phrases")
+
+        self.new_key = Fernet.generate_key()
+        rotated_keys = [self.new_key.decode(), settings.FIELD_ENCRYPTION_KEY]
+        overrides = override_settings(FIELD_ENCRYPTION_KEY=rotated_keys)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        patcher = patch.object(
+            encrypted_fields, "CRYPTER", MultiFernet([Fernet(key) for key in rotated_keys])
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _stored_name(self, learner):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM littleTalkApp_learner WHERE id = %s", [learner.pk])
+            return cursor.fetchone()[0]
+
+    def _is_under_new_key(self, token):
+        try:
+            Fernet(self.new_key).decrypt(token.encode())
+        except InvalidToken:
+            return False
+        return True
+
+    def _rotate(self, *args):
+        output = StringIO()
+        call_command("rotate_encryption_keys", "--batch-size", "2", *args, stdout=output)
+        return output.getvalue()
+
+    def test_reencrypts_every_model_under_the_primary_key(self):
+        output = self._rotate()
+
+        self.assertIn("littleTalkApp.Learner: rotated 2 rows (last pk", output)
+        for learner in self.learners:
+            self.assertTrue(self._is_under_new_key(self._stored_name(learner)))
+        self.assertEqual(
+            sorted(Learner.objects.values_list("name", flat=True)),
+            ["Ali Majid", "Maja Berg", "Nils Holm"],
+        )
+        self.assertEqual(Target.objects.get().text, "Use two-word phrases")
+        self.assertEqual(Learner.objects.get(pk=self.learners[0].pk).name, "Maja Berg")
+        self.assertFalse(
+            EncryptionRotationCheckpoint.objects.filter(completed_at__isnull=True).exists()
+        )
+
+    def test_resumes_after_the_checkpoint_and_skips_finished_models(self):
+        EncryptionRotationCheckpoint.objects.create(
+            model_label="littleTalkApp.Learner",
+            key_fingerprint=get_key_fingerprint(),
+            last_pk=self.learners[0].pk,
+            rows_rotated=1,
+        )
+
+        self._rotate("--models", "littleTalkApp.Learner")
+
+        self.assertFalse(self._is_under_new_key(self._stored_name(self.learners[0])))
+        self.assertTrue(self._is_under_new_key(self._stored_name(self.learners[2])))
+        self.assertIn("already rotated (3 rows)", self._rotate("--models", "littleTalkApp.Learner"))
+
+        self._rotate("--models", "littleTalkApp.Learner", "--restart")
+
+        self.assertTrue(self._is_under_new_key(self._stored_name(self.learners[0])))
+
+    def test_refuses_to_run_without_a_name_index_key(self):
+        with override_settings(LEARNER_NAME_INDEX_KEY=None):
+            with self.assertRaisesMessage(CommandError, "LEARNER_NAME_INDEX_KEY"):
+                self._rotate()
+
+        self.assertFalse(self._is_under_new_key(self._stored_name(self.learners[0])))
+
+    def test_each_chunk_is_locked_until_it_is_written(self):
+        with patch.object(
+            QuerySet, "select_for_update", autospec=True, side_effect=QuerySet.select_for_update
+        ) as select_for_update:
+            self._rotate("--models", "littleTalkApp.Learner")
+
+        # Two chunks of two learners, then the empty read that ends the walk.
+        self.assertEqual(select_for_update.call_count, 3)
+
+    def test_worker_progress_goes_to_the_command_stdout(self):
+        output = StringIO()
+        rotate_encryption_keys._init_worker(output)
+
+        label, rotated, unreadable = rotate_encryption_keys._rotate_model_in_worker(
+            "littleTalkApp.Learner", 2
+        )
+
+        self.assertEqual((label, rotated, unreadable), ("littleTalkApp.Learner", 3, 0))
+        self.assertIn("littleTalkApp.Learner: rotated 3 rows", output.getvalue())
+
+    def test_leaves_undecryptable_values_unchanged(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE littleTalkApp_learner SET name = %s WHERE id = %s",
+                ["not-a-token", self.learners[1].pk],
+            )
+
+        output = self._rotate("--models", "littleTalkApp.learner")
+
+        self.assertIn(f"pk={self.learners[1].pk}: name cannot be decrypted", output)
+        self.assertIn("1 values could not be decrypted with any key.", output)
+        self.assertEqual(self._stored_name(self.learners[1]), "not-a-token")
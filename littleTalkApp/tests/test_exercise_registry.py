@@ -0,0 +1,69 @@
+from unittest.mock import patch
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from littleTalkApp import exercise_registry
+from littleTalkApp.content.exercises import CANONICAL_TO_PRACTISE_KEY, PRACTISE_STAGES
+from littleTalkApp.exercise_ids import VALID_EXERCISE_IDS
+from littleTalkApp.exercise_registry import build_exercise_registry, get_exercise_registry
+
+
+class ExerciseRegistryTests(SimpleTestCase):
+    def test_registry_is_built_at_startup(self):
+        self.assertIsNotNone(exercise_registry._registry)
+        self.assertIs(get_exercise_registry(), exercise_registry._registry)
+
+    def test_indexes_every_exercise_by_both_ids(self):
+        registry = get_exercise_registry()
+
+        self.assertEqual(set(registry.by_id), VALID_EXERCISE_IDS)
+        for exercise_id, practise_key in CANONICAL_TO_PRACTISE_KEY.items():
+            with self.subTest(exercise_id=exercise_id):
+                self.assertIs(registry.get(exercise_id), registry.get_by_practise_key(practise_key))
+        self.assertIsNone(registry.get("not-an-exercise"))
+
+    def test_stages_keep_the_content_order(self):
+        registry = get_exercise_registry()
+
+        self.assertEqual([stage.number for stage in registry.stages], sorted(PRACTISE_STAGES))
+        for stage in registry.stages:
+            self.assertEqual(
+                [exercise.practise_key for exercise in stage.exercises],
+                PRACTISE_STAGES[stage.number]["exercises"],
+            )
+            self.assertEqual(
+                stage.exercise_cards, tuple(exercise.card for exercise in stage.exercises)
+            )
+
+    def test_cards_carry_precomputed_start_urls(self):
+        registry = get_exercise_registry()
+
+        story_train = registry.get("story-train-plus")
+        self.assertEqual(story_train.stage_number, 3)
+        self.assertEqual(story_train.card["start_url"], f"{reverse('story_train')}?variant=advanced")
+        self.assertEqual(story_train.card["icon"], "exercise_icons/story_train_advanced_icon.webp")
+        self.assertEqual(registry.get("categorisation").start_url, reverse("categorisation_example"))
+
+    def test_entries_are_immutable(self):
+        exercise = get_exercise_registry().get("spot-on")
+
+        with self.assertRaises(AttributeError):
+            exercise.stage_number = 2
+        with self.assertRaises(TypeError):
+            exercise.card["title"] = "Changed"
+        with self.assertRaises(TypeError):
+            get_exercise_registry().by_id["spot-on"] = exercise
+
+    def test_inconsistent_tables_fail_at_build(self):
+        with patch.object(
+            exercise_registry, "VALID_EXERCISE_IDS", VALID_EXERCISE_IDS | {"new-exercise"}
+        ):
+            with self.assertRaisesMessage(ImproperlyConfigured, "'new-exercise' has no practise key"):
+                build_exercise_registry()
+
+        stages = {**PRACTISE_STAGES, 4: {"label": "Extra", "exercises": ["spot_on"]}}
+        with patch.object(exercise_registry, "PRACTISE_STAGES", stages):
+            with self.assertRaisesMessage(ImproperlyConfigured, "'spot_on' is in stages [1, 4]"):
+                build_exercise_registry()
@@ -0,0 +1,204 @@
+from datetime import timedelta
+from io import StringIO
+
+from cryptography.fernet import Fernet
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from littleTalkApp.blind_index import name_index, name_prefix_tokens, normalize_name
+from littleTalkApp.models import Learner, LearnerNameToken, Role, School
+from littleTalkApp.tests.base import BaseFlowTestMixin
+
+
+class LearnerSearchTestMixin(BaseFlowTestMixin):
+    def setUp(self):
+        super().setUp()
+        self.user, _, self.school = self.create_staff_user_with_school(
+            username="search_staff", role=Role.STAFF
+        )
+
+    def _create_learner(self, name, school=None, **kwargs):
+        return Learner.objects.create(
+            user=self.user,
+            school=school or self.school,
+            name=name,
+            date_of_birth=timezone.now().date() - timedelta(days=365 * 7),
+            **kwargs,
+        )
+
+    def _search(self, query, school=None):
+        return [learner.name for learner in Learner.search_by_name(school or self.school, query)]
+
+
+class BlindIndexTests(TestCase):
+    def test_normalisation_ignores_case_width_and_spacing(self):
+        self.assertEqual(normalize_name("  ÅSA   Lindström "), "åsa lindström")
+        self.assertEqual(name_index("Åsa Lindström"), name_index("åsa  LINDSTRÖM"))
+        self.assertIsNone(name_index("   "))
+
+    def test_tokens_never_contain_the_name(self):
+        tokens = name_prefix_tokens("Maja Berg")
+
+        self.assertEqual(len(tokens), len({"ma", "maj", "maja", "be", "ber", "berg"}))
+        self.assertFalse(any("maja" in token or "berg" in token for token in tokens))
+
+    def test_key_changes_every_digest(self):
+        with override_settings(LEARNER_NAME_INDEX_KEY="first-key"):
+            first = name_index("Maja Berg")
+        with override_settings(LEARNER_NAME_INDEX_KEY="second-key"):
+            second = name_index("Maja Berg")
+
+        self.assertNotEqual(first, second)
+
+    def test_encryption_key_rotation_keeps_every_digest(self):
+        before = name_index("Maja Berg")
+        rotated_keys = [Fernet.generate_key().decode(), settings.FIELD_ENCRYPTION_KEY]
+        with override_settings(FIELD_ENCRYPTION_KEY=rotated_keys):
+            self.assertEqual(name_index("Maja Berg"), before)
+
+    def test_missing_key_is_a_configuration_error(self):
+        with override_settings(LEARNER_NAME_INDEX_KEY=None):
+            with self.assertRaises(ImproperlyConfigured):
+                name_index("Maja Berg")
+
+
+class LearnerNameIndexTests(LearnerSearchTestMixin, TestCase):
+    def test_save_indexes_the_name(self):
+        learner = self._create_learner("Maja Berg")
+
+        self.assertEqual(learner.name_index, name_index("maja berg"))
+        self.assertEqual(
+            set(learner.name_tokens.values_list("token", flat=True)),
+            name_prefix_tokens("Maja Berg"),
+        )
+
+    def test_renaming_replaces_the_tokens(self):
+        learner = self._create_learner("Maja Berg")
+
+        learner.name = "Nils Holm"
+        learner.save(update_fields=["name"])
+
+        self.assertEqual(self._search("maj"), [])
+        self.assertEqual(self._search("holm"), ["Nils Holm"])
+        learner.refresh_from_db()
+        self.assertEqual(learner.name_index, name_index("Nils Holm"))
+
+    def test_saving_other_fields_leaves_the_tokens_alone(self):
+        learner = Learner.objects.get(pk=self._create_learner("Maja Berg").pk)
+        token_ids = set(learner.name_tokens.values_list("id", flat=True))
+
+        learner.exp = 40
+        learner.save()
+
+        self.assertEqual(set(learner.name_tokens.values_list("id", flat=True)), token_ids)
+
+    def test_moving_school_moves_the_tokens(self):
+        other_school = School.objects.create(name="Other School")
+        learner = self._create_learner("Maja Berg")
+
+        learner.school = other_school
+        learner.save(update_fields=["school"])
+
+        self.assertEqual(self._search("maja"), [])
+        self.assertEqual(self._search("maja", school=other_school), ["Maja Berg"])
+
+
+class LearnerSearchTests(LearnerSearchTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        for name in ("Maja Berg", "Majken Ek", "Nils Bergström", "Ali Majid"):
+            self._create_learner(name)
+
+    def test_matches_word_prefixes_and_sorts_by_name(self):
+        self.assertEqual(self._search("maj"), ["Ali Majid", "Maja Berg", "Majken Ek"])
+        self.assertEqual(self._search("BERG"), ["Maja Berg", "Nils Bergström"])
+
+    def test_every_query_word_must_match(self):
+        self.assertEqual(self._search("maj berg"), ["Maja Berg"])
+        self.assertEqual(self._search("maj holm"), [])
+
+    def test_long_words_are_checked_against_the_decrypted_name(self):
+        self._create_learner("Alexandrianna Lund")
+
+        self.assertEqual(self._search("alexandriann"), ["Alexandrianna Lund"])
+        self.assertEqual(self._search("alexandriannx"), [])
+
+    def test_short_or_blank_queries_match_nothing(self):
+        self.assertEqual(self._search("m"), [])
+        self.assertEqual(self._search("  "), [])
+
+    def test_excludes_other_schools_and_deleted_learners(self):
+        other_school = School.objects.create(name="Other School")
+        self._create_learner("Maja Other", school=other_school)
+        self._create_learner("Maja Removed", deleted=True)
+
+        self.assertEqual(self._search("maja"), ["Maja Berg"])
+
+    def test_search_issues_no_name_comparison_in_sql(self):
+        with self.assertNumQueries(1) as captured:
+            self._search("maja")
+
+        self.assertNotIn("maja", captured.captured_queries[0]["sql"].lower())
+
+
+class LearnerSearchApiTests(LearnerSearchTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.learner = self._create_learner("Maja Berg")
+        self.client.force_login(self.user)
+        self.set_selected_school(self.school.id)
+
+    def test_returns_matches_for_the_selected_school(self):
+        response = self.client.get(reverse("search_learners"), {"q": "maj"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["results"],
+            [
+                {
+                    "learner_uuid": str(self.learner.learner_uuid),
+                    "name": "Maja Berg",
+                    "cohort_id": None,
+                }
+            ],
+        )
+
+    def test_parents_are_refused(self):
+        parent_user, _, _ = self.create_parent_user(username="search_parent")
+        self.client.force_login(parent_user)
+
+        response = self.client.get(reverse("search_learners"), {"q": "maj"})
+
+        self.assertEqual(response.status_code, 403)
+
+
+class BackfillLearnerNameIndexTests(LearnerSearchTestMixin, TestCase):
+    def _backfill(self, *args):
+        output = StringIO()
+        call_command("backfill_learner_name_index", "--batch-size", "2", *args, stdout=output)
+        return output.getvalue()
+
+    def test_indexes_learners_saved_before_the_index(self):
+        for name in ("Maja Berg", "Nils Holm", "Ali Majid"):
+            self._create_learner(name)
+        Learner.objects.update(name_index=None)
+        LearnerNameToken.objects.all().delete()
+
+        output = self._backfill()
+
+        self.assertIn("Indexed names for 3 learners.", output)
+        self.assertEqual(self._search("maj"), ["Ali Majid", "Maja Berg"])
+        self.assertFalse(Learner.objects.filter(name_index__isnull=True).exists())
+        self.assertIn("Indexed names for 0 learners.", self._backfill())
+
+    def test_rebuild_reindexes_with_a_new_key(self):
+        self._create_learner("Maja Berg")
+
+        with override_settings(LEARNER_NAME_INDEX_KEY="rotated-key"):
+            self.assertEqual(self._search("maja"), [])
+            self._backfill("--rebuild")
+            self.assertEqual(self._search("maja"), ["Maja Berg"])
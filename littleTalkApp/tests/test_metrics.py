@@ -0,0 +1,151 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from littleTalkApp import metrics
+from littleTalkApp.integrations.skolon_sync import sync_groups
+from littleTalkApp.models import Learner, Role
+from littleTalkApp.tests.base import BaseFlowTestMixin
+
+METRICS_TOKEN = "scrape-secret"
+METRICS_MIDDLEWARE = "littleTalkApp.middleware.MetricsMiddleware"
+
+
+class MetricsTestMixin:
+    def setUp(self):
+        super().setUp()
+        self.metrics_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.metrics_dir, ignore_errors=True)
+        overrides = override_settings(
+            METRICS_ENABLED=True,
+            METRICS_TOKEN=METRICS_TOKEN,
+            METRICS_DIR=self.metrics_dir,
+            METRICS_FLUSH_INTERVAL=0,
+            MIDDLEWARE=[
+                METRICS_MIDDLEWARE,
+                *(m for m in settings.MIDDLEWARE if m != METRICS_MIDDLEWARE),
+            ],
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        metrics._store.reset()
+        self.addCleanup(metrics._store.reset)
+
+    def scrape(self, token=METRICS_TOKEN):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"} if token else {}
+        return self.client.get(reverse("metrics"), **headers)
+
+    def sample_lines(self, prefix):
+        body = self.scrape().content.decode()
+        return [line for line in body.splitlines() if line.startswith(prefix)]
+
+
+class MetricsEndpointTests(MetricsTestMixin, TestCase):
+    def test_requires_the_shared_secret(self):
+        self.assertEqual(self.scrape(token=None).status_code, 401)
+        self.assertEqual(self.scrape(token="wrong").status_code, 401)
+
+        response = self.scrape()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn(
+            "# TYPE littletalk_http_request_duration_seconds histogram",
+            response.content.decode(),
+        )
+
+    def test_is_hidden_unless_enabled(self):
+        with override_settings(METRICS_ENABLED=False):
+            self.assertEqual(self.scrape().status_code, 404)
+        with override_settings(METRICS_TOKEN=""):
+            self.assertEqual(self.scrape().status_code, 404)
+
+    def test_sums_snapshots_from_every_worker(self):
+        metrics.EXERCISE_SUBMISSIONS.inc(2, mode="inline")
+        other_worker = os.path.join(self.metrics_dir, "999999.json")
+        with open(other_worker, "w") as handle:
+            json.dump([["littletalk_exercise_submissions_total", [["mode", "inline"]], 3]], handle)
+
+        self.assertIn(
+            'littletalk_exercise_submissions_total{mode="inline"} 5',
+            self.sample_lines("littletalk_exercise_submissions_total"),
+        )
+
+    def test_records_request_latency_by_url_name(self):
+        self.client.get(reverse("about"))
+
+        lines = self.sample_lines("littletalk_http_request_duration_seconds_count")
+
+        self.assertIn(
+            'littletalk_http_request_duration_seconds_count{view="about",method="GET"} 1', lines
+        )
+
+    def test_records_skolon_sync_duration_and_items(self):
+        client = MagicMock()
+        client.get_groups.return_value = {"groups": [{"id": "g1"}, {"id": "g2"}], "hasMore": False}
+
+        sync_groups(client)
+
+        self.assertEqual(
+            self.sample_lines('littletalk_skolon_sync_items_total{entity="group"}'),
+            ['littletalk_skolon_sync_items_total{entity="group"} 2'],
+        )
+        self.assertEqual(
+            self.sample_lines('littletalk_skolon_sync_duration_seconds_count{entity="group"}'),
+            ['littletalk_skolon_sync_duration_seconds_count{entity="group"} 1'],
+        )
+
+
+class SubmissionMetricsTests(MetricsTestMixin, BaseFlowTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        user, _, school = self.create_staff_user_with_school(
+            username="metrics_staff", role=Role.STAFF
+        )
+        learner = Learner.objects.create(
+            user=user,
+            school=school,
+            name="Metrics Learner",
+            date_of_birth=timezone.now().date() - timedelta(days=365 * 7),
+        )
+        self.client.force_login(user)
+        self.set_selected_school(school.id)
+        self.url = reverse("submit_exercise", kwargs={"learner_uuid": learner.learner_uuid})
+
+    def test_counts_submissions_and_duplicate_nonces(self):
+        payload = {
+            "nonce": "metrics-nonce",
+            "exp": 10,
+            "total_exercises": 1,
+            "exercise_id": "categorisation",
+            "difficulty_level": 3,
+            "difficulty_label": "3 options",
+            "started_at": (timezone.now() - timedelta(minutes=2)).isoformat(),
+            "completed_at": timezone.now().isoformat(),
+            "total_questions": 5,
+            "incorrect_answers": 1,
+            "attempts_per_question": [1, 1, 1, 2, 1],
+        }
+
+        for _ in range(2):
+            response = self.client.post(
+                self.url, data=json.dumps(payload), content_type="application/json"
+            )
+            self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(
+            self.sample_lines("littletalk_exercise_submissions_total"),
+            ['littletalk_exercise_submissions_total{mode="inline"} 1'],
+        )
+        self.assertEqual(
+            self.sample_lines("littletalk_duplicate_nonce_rejections_total"),
+            ['littletalk_duplicate_nonce_rejections_total{endpoint="submit_exercise"} 1'],
+        )
@@ -1,8 +1,15 @@
-from django.test import TestCase
+from datetime import timedelta
+
+from django.conf import settings
+from django.test import TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
+
+from littleTalkApp.tests.base import BaseFlowTestMixin
 
 from accounts.models import User
-from littleTalkApp.models import Profile, Role, School, SchoolMembership
+from littleTalkApp.middleware import compile_route_policies
+from littleTalkApp.models import ParentProfile, Profile, Role, School, SchoolMembership
 
 
 class MultiSchoolMiddlewareFlowTests(TestCase):
@@ -61,3 +68,84 @@ class MultiSchoolMiddlewareFlowTests(TestCase):
         self.assertEqual(response.request["PATH_INFO"], reverse("access_restricted"))
         self.assertContains(response, "Access to this account is currently paused")
         self.assertContains(response, 'action="/logout/"')
+
+
+class RoutePolicyTableTests(TestCase):
+    def test_policies_follow_exempt_url_names_and_their_subpaths(self):
+        policies, _ = compile_route_policies()
+
+        self.assertTrue(policies["learner_dashboard"].license_gated)
+        self.assertTrue(policies["learner_dashboard"].school_selection_required)
+        # cohort_list lives under /school/, which is exempt from the license gate.
+        self.assertFalse(policies["cohort_list"].license_gated)
+        self.assertTrue(policies["cohort_list"].school_selection_required)
+        self.assertFalse(policies["select_school"].school_selection_required)
+        self.assertFalse(policies["support"].school_required)
+        self.assertFalse(policies["admin:logout"].school_required)
+
+
+class AccessPolicyMiddlewareFlowTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="policy_user", password="password123")
+        self.client.force_login(self.user)
+
+    def test_parent_without_subscription_is_sent_to_subscribe(self):
+        profile = Profile.objects.create(user=self.user, role=Role.PARENT)
+        ParentProfile.objects.create(
+            profile=profile, trial_ends_at=timezone.now() - timedelta(days=1)
+        )
+
+        response = self.client.get(reverse("learner_dashboard"))
+        self.assertRedirects(response, reverse("subscribe"), fetch_redirect_response=False)
+
+        response = self.client.get(reverse("settings"))
+        self.assertEqual(response.status_code, 200)
+
+    def test_staff_without_school_can_still_reach_support(self):
+        Profile.objects.create(user=self.user, role=Role.STAFF)
+
+        response = self.client.get(reverse("learner_dashboard"))
+        self.assertRedirects(response, reverse("access_restricted"), fetch_redirect_response=False)
+
+        response = self.client.get(reverse("support"))
+        self.assertEqual(response.status_code, 200)
+
+    def test_unlicensed_school_only_gates_non_exempt_routes(self):
+        profile = Profile.objects.create(user=self.user, role=Role.STAFF)
+        profile.schools.add(School.objects.create(name="Lapsed", is_licensed=False))
+
+        response = self.client.get(reverse("learner_dashboard"))
+        self.assertRedirects(response, reverse("license_expired"), fetch_redirect_response=False)
+
+        response = self.client.get(reverse("profile"))
+        self.assertEqual(response.status_code, 200)
+
+
+QUERY_BUDGET_MIDDLEWARE = [
+    "littleTalkApp.middleware.QueryBudgetMiddleware",
+    *(m for m in settings.MIDDLEWARE if m != "littleTalkApp.middleware.QueryBudgetMiddleware"),
+]
+
+
+@override_settings(MIDDLEWARE=QUERY_BUDGET_MIDDLEWARE)
+class QueryBudgetMiddlewareTests(BaseFlowTestMixin, TestCase):
+    def setUp(self):
+        user, _, school = self.create_staff_user_with_school(username="budget_staff")
+        self.client.force_login(user)
+        self.set_selected_school(school.id)
+
+    @override_settings(DEBUG=True)
+    def test_debug_responses_report_query_headers(self):
+        response = self.client.get(reverse("support"))
+
+        self.assertGreater(int(response["X-Query-Count"]), 0)
+        self.assertIn("X-Query-Time-Ms", response)
+        self.assertEqual(response["X-Query-Duplicates"], "0")
+
+    @override_settings(QUERY_BUDGET_ENABLED=True, QUERY_BUDGETS={"support": 1})
+    def test_over_budget_views_are_logged_without_debug_headers(self):
+        with self.assertLogs("littleTalkApp.middleware", level="WARNING") as logs:
+            response = self.client.get(reverse("support"))
+
+        self.assertNotIn("X-Query-Count", response)
+        self.assertIn("Query budget exceeded for support", logs.output[0])
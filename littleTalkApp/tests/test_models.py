@@ -1,10 +1,20 @@
 from datetime import timedelta
 
+from django.db import connection
 from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from accounts.models import User
-from littleTalkApp.models import AgeGroup, Learner, Profile, Role, School, SchoolMembership
+from littleTalkApp.models import (
+    AgeGroup,
+    ExerciseSession,
+    Learner,
+    Profile,
+    Role,
+    School,
+    SchoolMembership,
+)
 
 
 class SchoolModelTests(TestCase):
@@ -61,6 +71,74 @@ class LearnerModelTests(TestCase):
 
         self.assertEqual(learner.age_group, AgeGroup.GROUP_3)
 
+    def test_add_progress_does_not_lose_increments_from_stale_instances(self):
+        user = User.objects.create_user(username="progress-owner", password="password123")
+        learner = Learner.objects.create(user=user, name="Progress Learner", exp=50)
+        first_tab = Learner.objects.get(pk=learner.pk)
+        second_tab = Learner.objects.get(pk=learner.pk)
+
+        self.assertEqual(first_tab.add_progress(10, 1), 60)
+        self.assertEqual(second_tab.add_progress(15, 1), 75)
+
+        learner.refresh_from_db()
+        self.assertEqual(learner.exp, 75)
+        self.assertEqual(learner.total_exercises, 2)
+        self.assertEqual(second_tab.total_exercises, 2)
+
+    def test_add_progress_updates_only_counter_columns(self):
+        user = User.objects.create_user(username="progress-columns", password="password123")
+        learner = Learner.objects.create(user=user, name="Column Learner")
+
+        with CaptureQueriesContext(connection) as queries:
+            learner.add_progress(10, 1)
+
+        updates = [q["sql"] for q in queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"exp"', updates[0])
+        self.assertIn('"total_exercises"', updates[0])
+        self.assertNotIn('"name"', updates[0])
+        self.assertNotIn('"date_of_birth"', updates[0])
+
+
+class ExerciseSessionModelTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username="session-owner", password="password123")
+        self.learner = Learner.objects.create(user=user, name="Session Learner")
+
+    def _create_session(self, **overrides):
+        completed_at = timezone.now()
+        fields = {
+            "learner": self.learner,
+            "exercise_id": "categorisation",
+            "difficulty_selected": "2",
+            "started_at": completed_at - timedelta(minutes=1, seconds=30),
+            "completed_at": completed_at,
+            "total_questions": 8,
+            "incorrect_answers": 3,
+            "attempts_per_question": [1] * 8,
+        }
+        fields.update(overrides)
+        return ExerciseSession.objects.create(**fields)
+
+    def test_save_populates_accuracy_and_elapsed_seconds(self):
+        session = self._create_session()
+
+        self.assertEqual(session.accuracy_percentage, 62.5)
+        self.assertEqual(session.elapsed_seconds, 90)
+
+    def test_accuracy_is_null_without_questions(self):
+        session = self._create_session(total_questions=0, incorrect_answers=0)
+
+        self.assertIsNone(session.accuracy_percentage)
+
+    def test_save_with_update_fields_refreshes_derived_metrics(self):
+        session = self._create_session()
+        session.incorrect_answers = 0
+        session.save(update_fields=["incorrect_answers"])
+
+        session.refresh_from_db()
+        self.assertEqual(session.accuracy_percentage, 100.0)
+
 
 class ProfileModelTests(TestCase):
     def setUp(self):
@@ -1,12 +1,15 @@
 import uuid
 from datetime import timedelta
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
 from littleTalkApp.models import Learner, LearnerAssessmentAnswer, Role
-from littleTalkApp.tests.base import BaseFlowTestMixin
+from littleTalkApp.screener_snapshots import record_screener_snapshot
+from littleTalkApp.tests.base import BaseFlowTestMixin, screener_question
 from littleTalkApp.views_modules.practise import resolve_recommendation_index
 
 
@@ -35,11 +38,8 @@ class PractiseRecommendationRotationTests(BaseFlowTestMixin, TestCase):
         # Treat fixture learner as having completed Screener V2 so recommendations are eligible.
         LearnerAssessmentAnswer.objects.create(
             learner=self.learner,
-            question_id=1,
-            topic="Blank Level 1",
-            skill="Naming common objects",
-            text="Can the child name familiar objects in pictures?",
-            answer="Yes",
+            question=screener_question(order=3),
+            answered_yes=True,
             session_id=uuid.uuid4(),
             screener_version=2,
         )
@@ -48,9 +48,33 @@ class PractiseRecommendationRotationTests(BaseFlowTestMixin, TestCase):
         index = resolve_recommendation_index(self.learner)
         self.assertEqual(index, 2)
 
+        anchor = self.learner.recommendation_index_updated_at
+        for hours, expected in ((0, 0), (23, 0), (24, 1), (49, 2), (72, 0), (97, 1)):
+            with self.subTest(hours=hours):
+                now = anchor + timedelta(hours=hours)
+                self.assertEqual(resolve_recommendation_index(self.learner, now=now), expected)
+
         self.learner.refresh_from_db()
-        self.assertEqual(self.learner.recommendation_index, 2)
-        self.assertIsNotNone(self.learner.recommendation_index_updated_at)
+        self.assertEqual(self.learner.recommendation_index, 0)
+        self.assertEqual(self.learner.recommendation_index_updated_at, anchor)
+
+    def test_resolve_recommendation_index_without_anchor_uses_stored_index(self):
+        self.learner.recommendation_index = 4
+        self.learner.recommendation_index_updated_at = None
+
+        self.assertEqual(resolve_recommendation_index(self.learner), 1)
+
+    def test_practise_page_never_writes_the_rotation(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse("practise"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["recommended_exercise_key"], "in_the_know_inferencing")
+        updates = [
+            query["sql"] for query in captured.captured_queries
+            if query["sql"].lstrip().upper().startswith("UPDATE")
+        ]
+        self.assertEqual(updates, [])
 
     def test_practise_context_contains_three_highlighted_recommendations(self):
         response = self.client.get(reverse("practise"))
@@ -85,26 +109,15 @@ class PractiseRecommendationRotationTests(BaseFlowTestMixin, TestCase):
 
     def test_practise_recommendation_explanation_uses_current_screener_gap(self):
         session_id = uuid.uuid4()
-        LearnerAssessmentAnswer.objects.create(
-            learner=self.learner,
-            question_id=15,
-            topic="Blank Level 3",
-            skill="Understanding emotions/mental states",
-            text="Can the child work out how someone is feeling from a situation or picture?",
-            answer="No",
-            session_id=session_id,
-            screener_version=2,
-        )
-        LearnerAssessmentAnswer.objects.create(
-            learner=self.learner,
-            question_id=19,
-            topic="Blank Level 4",
-            skill="Justifying with evidence",
-            text="Can the child explain how they know something (e.g. 'How do you know the girl is upset?')?",
-            answer="No",
-            session_id=session_id,
-            screener_version=2,
-        )
+        for order in (15, 19):
+            LearnerAssessmentAnswer.objects.create(
+                learner=self.learner,
+                question=screener_question(order=order),
+                answered_yes=False,
+                session_id=session_id,
+                screener_version=2,
+            )
+        record_screener_snapshot(self.learner, session_id, 2)
 
         response = self.client.get(reverse("practise"))
         self.assertEqual(response.status_code, 200)
@@ -0,0 +1,286 @@
+import uuid
+from datetime import timedelta
+
+from django.contrib import admin
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+
+from accounts.models import User
+from littleTalkApp import urls as app_urls
+from littleTalkApp.models import (
+    Cohort,
+    ExerciseSession,
+    Learner,
+    LearnerAssessmentAnswer,
+    LogEntry,
+    ParentAccessToken,
+    Role,
+    StaffInvite,
+    Target,
+)
+from littleTalkApp.screener_snapshots import record_screener_snapshot
+from littleTalkApp.tests.base import BaseFlowTestMixin, QueryBudgetTestMixin, screener_question
+
+SYNTHETIC_LEARNERS = 3
+
+# Query budgets for a GET of every named route in littleTalkApp/urls.py, made
+# by a signed-in school admin against the synthetic school below (three
+# learners, each with log entries, targets, screener answers and sessions).
+# Some routes only answer POST; their budget pins the cost of rejecting a GET.
+# Budgets are upper bounds: lower one when a view gets cheaper, and treat any
+# increase as a regression to explain in review.
+QUERY_BUDGETS = {
+    "home": 4,
+    "game_description": 4,
+    "practise": 6,
+    "tips": 4,
+    "method": 4,
+    "about": 4,
+    "terms": 4,
+    "privacy": 4,
+    "data_policy": 4,
+    "support": 4,
+    "send_support_email": 3,
+    "screener": 10,
+    "import_screener_answers": 3,
+    "screener_import_template": 4,
+    "start_assessment": 3,
+    "save_all_assessment_answers": 3,
+    "assessment_summary": 6,
+    "assessment_summary_old": 6,
+    "start_assessment_v2": 8,
+    "save_all_assessment_answers_v2": 3,
+    "assessment_summary_v2": 6,
+    "login": 3,
+    "account_setup": 4,
+    "sso_launch": 3,
+    "sso_callback": 3,
+    "profile": 10,
+    "add_learner": 5,
+    "select_learner": 3,
+    "edit_learner": 7,
+    "avatar_editor": 6,
+    "confirm_delete_learner": 6,
+    "cohort_list": 5,
+    "cohort_create": 4,
+    "select_school": 8,
+    "cohort_edit": 5,
+    "cohort_delete": 5,
+    "logbook": 7,
+    "new_log_entry": 5,
+    "log_entry_detail": 8,
+    "edit_log_entry": 7,
+    "delete_log_entry": 3,
+    "generate_summary": 6,
+    "settings": 4,
+    "change_user_details": 4,
+    "change_password": 4,
+    "logout": 3,
+    "school_signup": 4,
+    "invite_staff": 4,
+    "accept_invite": 7,
+    "school": 10,
+    "update_school_name": 4,
+    "request_join_school": 5,
+    "invite_audit_trail": 6,
+    "view_parent_token": 6,
+    "generate_parent_token": 5,
+    "parent_signup": 3,
+    "add_pac_learner": 3,
+    "subscribe": 4,
+    "license_expired": 4,
+    "access_restricted": 4,
+    "subscribe_success": 4,
+    "manage_subscription": 4,
+    "skolon_webhook": 3,
+    "skolon_remove_user": 3,
+    "skolon_remove_class": 3,
+    "submit_exercise": 3,
+    "submit_exercise_batch": 3,
+    "update_learner_avatar": 3,
+    "get_current_session_learner_context": 4,
+    "search_learners": 4,
+    "create_target": 3,
+    "target_detail": 6,
+    "learner_dashboard": 13,
+    "learner_progress_data": 6,
+    "metrics": 3,
+    "categorisation_example": 5,
+    "think_and_find": 5,
+    "concept_quest": 5,
+    "colourful_semantics": 5,
+    "story_train": 5,
+    "spot_on": 5,
+    "whats_in_the_bag": 5,
+    "what_happens_next": 5,
+    "in_the_know": 5,
+    "whos_who": 5,
+    "task_master": 5,
+}
+
+# Repeated statements allowed per view; every other view must issue none.
+DUPLICATE_QUERY_ALLOWANCES = {
+    "edit_log_entry": 1,
+    "log_entry_detail": 2,
+    "profile": 1,
+    "screener": 1,
+}
+
+# Views a plain GET cannot exercise, with the reason. They still have to be
+# listed so that new views cannot slip past the budget check.
+UNMEASURED_VIEWS = {
+    "create_checkout_session": "calls the Stripe API",
+    "email_parent_token": "POST-only; returns no response to GET",
+    "stripe_webhook": "requires a signed Stripe payload",
+}
+
+# Admin changelist budgets for a superuser, keyed by model label. Each model
+# admin must select or annotate whatever its list_display reads per row.
+ADMIN_CHANGELIST_BUDGETS = {
+    "accounts.user": 7,
+    "littleTalkApp.exercisesession": 8,
+    "littleTalkApp.idempotencykey": 6,
+    "littleTalkApp.joinrequest": 6,
+    "littleTalkApp.learner": 7,
+    "littleTalkApp.logentry": 8,
+    "littleTalkApp.parentprofile": 6,
+    "littleTalkApp.pendingexercisesubmission": 6,
+    "littleTalkApp.profile": 8,
+    "littleTalkApp.school": 6,
+    "littleTalkApp.schoollicensecode": 6,
+    "littleTalkApp.schoolmembership": 7,
+    "littleTalkApp.skolonorg": 6,
+    "littleTalkApp.skolonsynccursor": 6,
+    "littleTalkApp.skolonuser": 7,
+    "littleTalkApp.target": 6,
+}
+
+QUERY_PARAMS = {
+    "learner_progress_data": lambda fixture: {"learner_uuid": str(fixture["learner"].learner_uuid)},
+    "search_learners": lambda fixture: {"q": "budget learn"},
+}
+
+
+class QueryBudgetRegressionTests(BaseFlowTestMixin, QueryBudgetTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.fixture = cls._create_synthetic_school()
+
+    @classmethod
+    def _create_synthetic_school(cls):
+        user, profile, school = BaseFlowTestMixin().create_staff_user_with_school(
+            username="budget_admin", role=Role.ADMIN
+        )
+        cohort = Cohort.objects.create(school=school, name="Budget Cohort")
+        learners = []
+        for index in range(SYNTHETIC_LEARNERS):
+            learner = Learner.objects.create(
+                user=user,
+                school=school,
+                cohort=cohort,
+                name=f"Budget Learner {index}",
+                date_of_birth=timezone.now().date() - timedelta(days=365 * 6),
+            )
+            learners.append(learner)
+            for session_offset in (2, 1):
+                session_id = uuid.uuid4()
+                for order in range(1, 4):
+                    LearnerAssessmentAnswer.objects.create(
+                        learner=learner,
+                        question=screener_question(order=order),
+                        answered_yes=bool(order % 2),
+                        session_id=session_id,
+                    )
+                LearnerAssessmentAnswer.objects.filter(session_id=session_id).update(
+                    timestamp=timezone.now() - timedelta(days=session_offset)
+                )
+                record_screener_snapshot(learner, session_id, 2)
+            for _ in range(2):
+                LogEntry.objects.create(
+                    user=user, learner=learner, school=school, title="Budget log"
+                )
+            Target.objects.create(learner=learner, text="Budget target")
+            ExerciseSession.objects.create(
+                learner=learner,
+                exercise_id="categorisation",
+                difficulty_selected="2",
+                started_at=timezone.now() - timedelta(minutes=2),
+                completed_at=timezone.now(),
+                total_questions=4,
+                incorrect_answers=1,
+                attempts_per_question=[1, 1, 1, 1],
+                learner_total_exp_after_session=10 * (index + 1),
+            )
+            ParentAccessToken.objects.create(learner=learner)
+
+        invite = StaffInvite.objects.create(
+            school=school, email="invitee@example.com", role=Role.STAFF, sent_by=user
+        )
+        return {
+            "user": user,
+            "school": school,
+            "cohort": cohort,
+            "learner": learners[0],
+            "log_entry": LogEntry.objects.filter(learner=learners[0]).first(),
+            "target": Target.objects.filter(learner=learners[0]).get(),
+            "invite": invite,
+        }
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.fixture["user"])
+        session = self.client.session
+        session["selected_school_id"] = self.fixture["school"].id
+        session["selected_learner_id"] = self.fixture["learner"].id
+        session.save()
+
+    def _url_kwargs(self):
+        learner = self.fixture["learner"]
+        return {
+            "game_name": "think_and_find",
+            "learner_uuid": learner.learner_uuid,
+            "cohort_id": self.fixture["cohort"].id,
+            "entry_id": self.fixture["log_entry"].id,
+            "token": self.fixture["invite"].token,
+            "target_id": self.fixture["target"].id,
+        }
+
+    def _reverse(self, pattern):
+        kwargs = self._url_kwargs()
+        return reverse(
+            pattern.name,
+            kwargs={name: kwargs[name] for name in pattern.pattern.converters},
+        )
+
+    def test_every_app_view_has_a_budget(self):
+        names = {p.name for p in app_urls.urlpatterns if isinstance(p, URLPattern)}
+        self.assertEqual(sorted(names - set(QUERY_BUDGETS) - set(UNMEASURED_VIEWS)), [])
+
+    def test_views_stay_within_query_budget(self):
+        for pattern in app_urls.urlpatterns:
+            if pattern.name in UNMEASURED_VIEWS:
+                continue
+            params = QUERY_PARAMS[pattern.name](self.fixture) if pattern.name in QUERY_PARAMS else {}
+            with self.subTest(url_name=pattern.name):
+                with self.assertQueryBudget(
+                    QUERY_BUDGETS[pattern.name],
+                    max_duplicates=DUPLICATE_QUERY_ALLOWANCES.get(pattern.name, 0),
+                ):
+                    self.client.get(self._reverse(pattern), params)
+
+    def test_admin_changelists_stay_within_query_budget(self):
+        superuser = User.objects.create_superuser(username="budget_superuser", password="password123")
+        self.client.force_login(superuser)
+
+        registered = {model._meta.label_lower: model for model in admin.site._registry}
+        self.assertEqual(sorted(set(registered) - set(ADMIN_CHANGELIST_BUDGETS)), [])
+
+        for label, model in registered.items():
+            url = reverse(f"admin:{model._meta.app_label}_{model._meta.model_name}_changelist")
+            with self.subTest(model=label):
+                # The changelist counts the filtered and the full queryset with
+                # the same statement when no filter is applied.
+                with self.assertQueryBudget(ADMIN_CHANGELIST_BUDGETS[label], max_duplicates=1):
+                    self.client.get(url)
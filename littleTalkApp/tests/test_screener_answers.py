@@ -0,0 +1,129 @@
+import uuid
+from unittest.mock import patch
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+
+from accounts.models import User
+from littleTalkApp import screener_answers
+from littleTalkApp.content.assessments import QUESTIONS
+from littleTalkApp.content.assessments_v2 import QUESTIONS_V2, QUESTIONS_V2_BY_ORDER
+from littleTalkApp.models import Learner, LearnerAssessmentAnswer, ScreenerQuestion
+from littleTalkApp.screener_answers import (
+    ScreenerAnswer,
+    get_screener_questions,
+    get_session_answers,
+)
+from littleTalkApp.views_modules.assessment import save_assessment_v2_for_learner
+
+
+class ScreenerAnswerStorageTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username="answers-owner", password="password123")
+        self.learner = Learner.objects.create(user=user, name="Answers Learner")
+
+    def test_catalogue_is_seeded_from_both_screeners(self):
+        self.assertEqual(
+            ScreenerQuestion.objects.filter(screener_version=1).count(), len(QUESTIONS)
+        )
+        self.assertEqual(
+            set(get_screener_questions(2)), {question["order"] for question in QUESTIONS_V2}
+        )
+
+    def test_answers_read_back_in_the_old_row_shape(self):
+        session_id = uuid.uuid4()
+        save_assessment_v2_for_learner(
+            self.learner, {"3": "No", "1": "yes", "5": "Sometimes"}, session_id=session_id
+        )
+
+        answers = get_session_answers(self.learner, session_id)
+
+        self.assertEqual([answer.question_id for answer in answers], [3, 1])
+        self.assertEqual([answer.answer for answer in answers], ["No", "Yes"])
+        first = answers[0]
+        self.assertIsInstance(first, ScreenerAnswer)
+        self.assertEqual(
+            (first.learner_id, first.session_id, first.screener_version),
+            (self.learner.id, session_id, 2),
+        )
+        self.assertEqual(
+            (first.topic, first.skill, first.text),
+            tuple(QUESTIONS_V2_BY_ORDER[3][field] for field in ("topic", "skill", "text")),
+        )
+        self.assertIsNotNone(first.timestamp)
+
+    def test_edited_question_gets_a_new_revision(self):
+        save_assessment_v2_for_learner(self.learner, {"3": "No"})
+        original = get_screener_questions(2)[3]
+        edited = {**QUESTIONS_V2_BY_ORDER[3], "text": "Can the child name objects?"}
+
+        with patch.dict(screener_answers.SCREENER_CONTENT, {2: {**QUESTIONS_V2_BY_ORDER, 3: edited}}):
+            session_id = uuid.uuid4()
+            save_assessment_v2_for_learner(self.learner, {"3": "Yes"}, session_id=session_id)
+            revised = get_screener_questions(2)[3]
+
+        self.assertEqual((revised.order, revised.revision), (3, original.revision + 1))
+        self.assertEqual(get_session_answers(self.learner, session_id)[0].text, edited["text"])
+        self.assertEqual(
+            list(LearnerAssessmentAnswer.objects.values_list("question__text", flat=True).order_by("id")),
+            [original.text, edited["text"]],
+        )
+
+
+class ConvertAssessmentAnswersMigrationTests(TransactionTestCase):
+    before = [("littleTalkApp", "0089_screenerquestion")]
+    after = [("littleTalkApp", "0091_drop_denormalized_answer_fields")]
+
+    def _migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_answers_convert_to_catalogue_rows_and_back(self):
+        apps = self._migrate(self.before)
+        Learner = apps.get_model("littleTalkApp", "Learner")
+        Answer = apps.get_model("littleTalkApp", "LearnerAssessmentAnswer")
+        user = User.objects.create_user(username="migration-owner", password="password123")
+        learner = Learner.objects.create(user_id=user.id, name="Migration Learner")
+        question = QUESTIONS_V2_BY_ORDER[3]
+        rows = [
+            (2, 3, question["skill"], question["text"], "No"),
+            (2, 3, question["skill"], "An older wording", "no"),
+            (1, 3, QUESTIONS[2]["skill"], QUESTIONS[2]["text"], "Yes"),
+        ]
+        for version, order, skill, text, answer in rows:
+            Answer.objects.create(
+                learner=learner,
+                legacy_question_id=order,
+                topic=question["topic"] if version == 2 else QUESTIONS[2]["topic"],
+                skill=skill,
+                text=text,
+                answer=answer,
+                screener_version=version,
+            )
+
+        apps = self._migrate(self.after)
+        Answer = apps.get_model("littleTalkApp", "LearnerAssessmentAnswer")
+        converted = list(Answer.objects.select_related("question").order_by("id"))
+        self.assertEqual(
+            [(row.question.order, row.question.revision, row.answered_yes) for row in converted],
+            [(3, 1, False), (3, 2, False), (3, 1, True)],
+        )
+        self.assertEqual(converted[1].question.text, "An older wording")
+        self.assertEqual(converted[2].question.screener_version, 1)
+
+        apps = self._migrate(self.before)
+        Answer = apps.get_model("littleTalkApp", "LearnerAssessmentAnswer")
+        restored = Answer.objects.order_by("id").values_list(
+            "screener_version", "legacy_question_id", "skill", "text", "answer"
+        )
+        self.assertEqual(
+            list(restored),
+            [(version, order, skill, text, answer.capitalize()) for version, order, skill, text, answer in rows],
+        )
@@ -0,0 +1,214 @@
+import csv
+import io
+from datetime import timedelta
+from unittest import mock
+
+import openpyxl
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from littleTalkApp import screener_import
+from littleTalkApp.content.assessments_v2 import QUESTIONS_V2
+from littleTalkApp.models import Learner, LearnerAssessmentAnswer, Role, ScreenerSessionSnapshot
+from littleTalkApp.screener_import import read_sheet_rows
+from littleTalkApp.tests.base import BaseFlowTestMixin
+from littleTalkApp.views_modules.assessment import (
+    compute_v2_recommendation_sets,
+    compute_v2_recommendations,
+    compute_v2_secondary_recommendations,
+)
+
+ANSWER_SETS = [
+    {str(question["order"]): "No" if question["order"] in (3, 15, 19) else "Yes" for question in QUESTIONS_V2},
+    {str(question["order"]): "No" for question in QUESTIONS_V2},
+    {str(question["order"]): "Yes" for question in QUESTIONS_V2},
+]
+
+
+def sheet_csv(rows, delimiter=","):
+    output = io.StringIO()
+    writer = csv.writer(output, delimiter=delimiter)
+    writer.writerow(["learner_uuid", "name"] + [f"{q['order']}. {q['text']}" for q in QUESTIONS_V2])
+    for learner, answers in rows:
+        writer.writerow(
+            [str(learner.learner_uuid), learner.name]
+            + [answers.get(str(q["order"]), "") for q in QUESTIONS_V2]
+        )
+    return output.getvalue().encode()
+
+
+class ScreenerImportTests(BaseFlowTestMixin, TestCase):
+    def setUp(self):
+        self.user, _, self.school = self.create_staff_user_with_school(
+            username="import_staff", role=Role.STAFF
+        )
+        self.learners = [
+            Learner.objects.create(
+                user=self.user,
+                school=self.school,
+                name=f"Import Learner {index}",
+                date_of_birth=timezone.now().date() - timedelta(days=365 * 7),
+            )
+            for index in range(3)
+        ]
+        self.client.force_login(self.user)
+        self.set_selected_school(self.school.id)
+
+    def _upload(self, content, name="class.csv"):
+        return self.client.post(
+            reverse("import_screener_answers"),
+            {"file": SimpleUploadedFile(name, content, content_type="text/csv")},
+            follow=True,
+        )
+
+    def test_import_saves_every_learner_like_the_screener_form(self):
+        response = self._upload(sheet_csv(zip(self.learners, ANSWER_SETS)))
+
+        self.assertRedirects(response, reverse("screener"))
+        self.assertContains(response, "Saved screener answers for 3 learners.")
+        for learner, answers in zip(self.learners, ANSWER_SETS):
+            with self.subTest(learner=learner.name):
+                learner.refresh_from_db()
+                tier_one = compute_v2_recommendations(answers)
+                self.assertEqual(learner.recommended_exercise_ids, tier_one)
+                self.assertEqual(
+                    learner.secondary_exercise_ids,
+                    compute_v2_secondary_recommendations(answers, tier_one),
+                )
+                self.assertEqual(learner.recommendation_index, 0)
+                saved = LearnerAssessmentAnswer.objects.filter(learner=learner)
+                self.assertEqual(saved.count(), len(answers))
+                self.assertEqual(saved.values("session_id").distinct().count(), 1)
+                snapshot = ScreenerSessionSnapshot.objects.get(learner=learner)
+                self.assertEqual(snapshot.session_id, saved.first().session_id)
+                self.assertEqual(learner.assessment1, len(snapshot.strong_skills))
+
+    def test_import_query_count_does_not_grow_with_the_class(self):
+        # Warm the cached school access so both uploads measure the same work.
+        self.client.get(reverse("screener"))
+        with CaptureQueriesContext(connection) as one_learner:
+            self._upload(sheet_csv([(self.learners[0], ANSWER_SETS[0])]))
+        with CaptureQueriesContext(connection) as whole_class:
+            self._upload(sheet_csv(zip(self.learners, ANSWER_SETS)))
+
+        self.assertEqual(len(one_learner.captured_queries), len(whole_class.captured_queries))
+
+    def test_invalid_sheet_saves_nothing_and_lists_the_errors(self):
+        other_user, _, other_school = self.create_staff_user_with_school(
+            username="other_import_staff", role=Role.STAFF
+        )
+        outsider = Learner.objects.create(user=other_user, school=other_school, name="Outsider")
+        bad_answers = {**ANSWER_SETS[0], "4": "Maybe"}
+
+        response = self._upload(sheet_csv([(self.learners[0], bad_answers), (self.learners[1], {})]))
+
+        self.assertContains(response, "Row 2, question 4: expected Yes or No, not &#x27;Maybe&#x27;.")
+        self.assertContains(response, "Row 3: no answers.")
+
+        response = self._upload(sheet_csv([(self.learners[0], ANSWER_SETS[0]), (outsider, ANSWER_SETS[1])]))
+
+        self.assertContains(response, f"Row 3: learner {outsider.learner_uuid} was not found in your school.")
+        self.assertFalse(LearnerAssessmentAnswer.objects.exists())
+        self.assertFalse(ScreenerSessionSnapshot.objects.exists())
+
+    def test_rows_must_answer_every_question_but_readiness(self):
+        partial = {"3": "No", "4": "Yes"}
+        without_readiness = {
+            order: answer for order, answer in ANSWER_SETS[0].items() if order not in ("1", "2")
+        }
+
+        response = self._upload(
+            sheet_csv([(self.learners[0], partial), (self.learners[1], without_readiness)])
+        )
+
+        unanswered = ", ".join(
+            str(q["order"]) for q in QUESTIONS_V2 if not q["is_readiness"] and str(q["order"]) not in partial
+        )
+        self.assertContains(response, f"Row 2: questions {unanswered} are unanswered.")
+        self.assertNotContains(response, "Row 3:")
+        self.assertFalse(LearnerAssessmentAnswer.objects.exists())
+
+        response = self._upload(sheet_csv([(self.learners[1], without_readiness)]))
+
+        self.assertContains(response, "Saved screener answers for 1 learner.")
+
+    def test_reading_stops_after_the_row_limit(self):
+        content = sheet_csv([(learner, ANSWER_SETS[0]) for learner in self.learners * 3])
+
+        with mock.patch.object(screener_import, "MAX_IMPORT_ROWS", 2):
+            rows = read_sheet_rows(SimpleUploadedFile("class.csv", content))
+
+        self.assertEqual(len(rows), 4)
+
+    def test_formatted_empty_rows_are_not_expanded(self):
+        workbook = openpyxl.Workbook()
+        workbook.active.append(["learner_uuid", "1"])
+        workbook.active.cell(row=60, column=1).number_format = "0.00"
+        content = io.BytesIO()
+        workbook.save(content)
+
+        with mock.patch.object(screener_import, "MAX_SHEET_ROWS", 50):
+            with self.assertRaisesMessage(ValidationError, "more than 50 rows"):
+                read_sheet_rows(SimpleUploadedFile("class.xlsx", content.getvalue()))
+
+    def test_unknown_columns_and_file_types_are_rejected(self):
+        response = self._upload(b"learner_uuid,42\n")
+        self.assertContains(response, "Column 2 (&#x27;42&#x27;) is not a screener question.")
+
+        response = self._upload(b"learner_uuid,1\n", name="class.txt")
+        self.assertContains(response, "Upload a .csv or .xlsx file.")
+
+    def test_semicolon_separated_csv_is_read(self):
+        content = sheet_csv([(self.learners[0], ANSWER_SETS[0])], delimiter=";")
+
+        rows = read_sheet_rows(SimpleUploadedFile("class.csv", content))
+
+        self.assertEqual(rows[0][:3], ["learner_uuid", "name", f"1. {QUESTIONS_V2[0]['text']}"])
+        self.assertEqual(rows[1][0], str(self.learners[0].learner_uuid))
+
+    def test_xlsx_import(self):
+        workbook = openpyxl.Workbook()
+        for row in csv.reader(io.StringIO(sheet_csv([(self.learners[0], ANSWER_SETS[0])]).decode())):
+            workbook.active.append(row)
+        content = io.BytesIO()
+        workbook.save(content)
+
+        response = self._upload(content.getvalue(), name="class.xlsx")
+
+        self.assertContains(response, "Saved screener answers for 1 learner.")
+
+    def test_template_lists_the_school_learners_and_questions(self):
+        response = self.client.get(reverse("screener_import_template"))
+
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        rows = list(csv.reader(io.StringIO(response.content.decode())))
+        self.assertEqual(len(rows[0]), 2 + len(QUESTIONS_V2))
+        self.assertEqual(
+            sorted(row[0] for row in rows[1:]),
+            sorted(str(learner.learner_uuid) for learner in self.learners),
+        )
+
+    def test_parents_cannot_import(self):
+        parent, _, _ = self.create_parent_user(username="import_parent")
+        self.client.force_login(parent)
+
+        response = self._upload(sheet_csv([(self.learners[0], ANSWER_SETS[0])]))
+
+        self.assertContains(response, "Only school staff can import screener answers.")
+        self.assertFalse(LearnerAssessmentAnswer.objects.exists())
+
+
+class RecommendationSetTests(TestCase):
+    def test_matches_the_separate_recommendation_functions(self):
+        for answers in ANSWER_SETS:
+            with self.subTest(answers=answers):
+                tier_one = compute_v2_recommendations(answers)
+                self.assertEqual(
+                    compute_v2_recommendation_sets(answers),
+                    (tier_one, compute_v2_secondary_recommendations(answers, tier_one)),
+                )
@@ -0,0 +1,176 @@
+import importlib
+import uuid
+from datetime import timedelta
+from io import StringIO
+
+from django.apps import apps
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from littleTalkApp.models import LearnerAssessmentAnswer, Learner, Role, ScreenerSessionSnapshot
+from littleTalkApp.tests.base import BaseFlowTestMixin, screener_question
+from littleTalkApp.views_modules.assessment import (
+    save_assessment_for_learner,
+    save_assessment_v2_for_learner,
+)
+
+BACKFILL_MIGRATION = importlib.import_module(
+    "littleTalkApp.migrations.0093_backfill_screener_snapshots"
+)
+
+ANSWERS = {
+    "1": "Yes",
+    "2": "Yes",
+    "3": "No",
+    "4": "Yes",
+    "5": "Yes",
+    "6": "Yes",
+    "7": "Yes",
+    "15": "No",
+    "19": "No",
+}
+
+
+class ScreenerSessionSnapshotTests(BaseFlowTestMixin, TestCase):
+    def setUp(self):
+        self.user, _, self.school = self.create_staff_user_with_school(
+            username="snapshot_staff", role=Role.STAFF
+        )
+        self.learner = Learner.objects.create(
+            user=self.user,
+            school=self.school,
+            name="Snapshot Learner",
+            date_of_birth=timezone.now().date() - timedelta(days=365 * 7),
+        )
+
+    def _assert_snapshot_of_answers(self, snapshot):
+        self.assertEqual(
+            snapshot.strong_skills,
+            [
+                "Attention and listening",
+                "Vocabulary development",
+                "Understanding prepositions",
+                "Following pronoun instructions",
+                "Using action words",
+            ],
+        )
+        self.assertEqual(
+            snapshot.support_skills,
+            [
+                "Naming common objects",
+                "Understanding emotions/mental states",
+                "Justifying with evidence",
+            ],
+        )
+        self.assertEqual(snapshot.readiness_status, "ready")
+        self.assertEqual(
+            snapshot.support_skills_by_exercise,
+            {
+                "whats-in-the-bag": ["Naming common objects"],
+                "in-the-know": ["Understanding emotions/mental states", "Justifying with evidence"],
+            },
+        )
+        self.assertEqual(snapshot.stage_mastery, {"1": True, "2": False, "3": False})
+        self.assertEqual(snapshot.allowed_max_stage, 2)
+
+    def test_saving_a_screener_writes_its_snapshot(self):
+        session_id = uuid.uuid4()
+
+        save_assessment_v2_for_learner(self.learner, ANSWERS, session_id=session_id)
+
+        snapshot = ScreenerSessionSnapshot.objects.get(learner=self.learner)
+        self.assertEqual(snapshot.session_id, session_id)
+        self.assertEqual(snapshot.screener_version, 2)
+        self._assert_snapshot_of_answers(snapshot)
+        self.learner.refresh_from_db()
+        self.assertEqual(self.learner.assessment1, 5)
+
+    def test_summary_reads_the_snapshot_instead_of_answers(self):
+        save_assessment_v2_for_learner(self.learner, ANSWERS)
+        self.client.force_login(self.user)
+        self.set_selected_school(self.school.id)
+        session = self.client.session
+        session["selected_learner_id"] = self.learner.id
+        session.save()
+
+        response = self.client.get(reverse("assessment_summary"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["readiness_status"], "ready")
+        self.assertEqual(len(response.context["needs_support_skills"]), 3)
+        self.assertNotIn("answers", response.context)
+
+    def test_backfill_creates_missing_snapshots_from_answers(self):
+        save_assessment_v2_for_learner(self.learner, ANSWERS)
+        legacy_session = uuid.uuid4()
+        for question_id, answer in ANSWERS.items():
+            LearnerAssessmentAnswer.objects.create(
+                learner=self.learner,
+                question=screener_question(skill=f"Legacy skill {question_id}", screener_version=1),
+                answered_yes=answer == "Yes",
+                session_id=legacy_session,
+                screener_version=1,
+            )
+        LearnerAssessmentAnswer.objects.filter(session_id=legacy_session).update(
+            timestamp=timezone.now() - timedelta(days=30)
+        )
+        recorded = ScreenerSessionSnapshot.objects.get()
+        output = StringIO()
+
+        call_command("backfill_screener_snapshots", "--batch-size", "1", stdout=output)
+
+        self.assertIn("Created 1 screener snapshots for 1 learners.", output.getvalue())
+        legacy = ScreenerSessionSnapshot.objects.get(session_id=legacy_session)
+        self.assertEqual(legacy.screener_version, 1)
+        self.assertEqual(len(legacy.support_skills), 3)
+        self.assertEqual((legacy.stage_mastery, legacy.allowed_max_stage), ({}, None))
+        self.assertTrue(ScreenerSessionSnapshot.objects.filter(pk=recorded.pk).exists())
+
+    def test_backfill_rebuild_replaces_snapshots(self):
+        save_assessment_v2_for_learner(self.learner, ANSWERS)
+        ScreenerSessionSnapshot.objects.update(strong_skills=[], readiness_status="mixed")
+
+        call_command("backfill_screener_snapshots", "--rebuild", stdout=StringIO())
+
+        self._assert_snapshot_of_answers(ScreenerSessionSnapshot.objects.get())
+
+    def test_migration_backfills_sessions_without_snapshots(self):
+        save_assessment_v2_for_learner(self.learner, ANSWERS)
+        kept = ScreenerSessionSnapshot.objects.get()
+        session_id = uuid.uuid4()
+        save_assessment_v2_for_learner(self.learner, ANSWERS, session_id=session_id)
+        ScreenerSessionSnapshot.objects.filter(session_id=session_id).delete()
+
+        BACKFILL_MIGRATION.backfill_screener_snapshots(apps, schema_editor=None)
+
+        self.assertEqual(ScreenerSessionSnapshot.objects.count(), 2)
+        self.assertTrue(ScreenerSessionSnapshot.objects.filter(pk=kept.pk).exists())
+        snapshot = ScreenerSessionSnapshot.objects.get(session_id=session_id)
+        self._assert_snapshot_of_answers(snapshot)
+        self.assertIsNotNone(snapshot.created_at)
+
+    def test_migration_snapshot_of_a_v1_session_matches_the_saved_one(self):
+        save_assessment_for_learner(self.learner, {"1": "Yes", "2": "No", "3": "Yes"})
+        saved = ScreenerSessionSnapshot.objects.get()
+        ScreenerSessionSnapshot.objects.all().delete()
+
+        BACKFILL_MIGRATION.backfill_screener_snapshots(apps, schema_editor=None)
+
+        backfilled = ScreenerSessionSnapshot.objects.get()
+        fields = (
+            "session_id",
+            "screener_version",
+            "started_at",
+            "strong_skills",
+            "support_skills",
+            "readiness_status",
+            "support_skills_by_exercise",
+            "stage_mastery",
+            "allowed_max_stage",
+        )
+        self.assertEqual(
+            [getattr(backfilled, field) for field in fields],
+            [getattr(saved, field) for field in fields],
+        )
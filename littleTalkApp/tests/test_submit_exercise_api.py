@@ -1,11 +1,24 @@
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
+from io import StringIO
+from unittest import skipIf
 
-from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
-from littleTalkApp.models import ExerciseSession, Learner, Role
+from littleTalkApp.models import (
+    ExerciseSession,
+    IdempotencyKey,
+    Learner,
+    PendingExerciseSubmission,
+    Role,
+)
 from littleTalkApp.tests.base import BaseFlowTestMixin
 
 
@@ -168,6 +181,40 @@ class SubmitExerciseApiTests(BaseFlowTestMixin, TestCase):
         self.learner.refresh_from_db()
         self.assertEqual(self.learner.recommendation_index, 2)
 
+    def test_submit_exercise_moves_anchor_from_time_rotated_recommendation(self):
+        self.learner.recommended_exercise_ids = [
+            "whats-in-the-bag",
+            "story-train-plus",
+            "in-the-know",
+        ]
+        self.learner.recommendation_index = 0
+        self.learner.recommendation_index_updated_at = timezone.now() - timedelta(days=1, hours=2)
+        self.learner.save(
+            update_fields=[
+                "recommended_exercise_ids",
+                "recommendation_index",
+                "recommendation_index_updated_at",
+            ]
+        )
+
+        payload = self._build_payload(
+            exercise_id="story-train-plus",
+            nonce="nonce-advance-rotated",
+        )
+
+        response = self.client.post(
+            self.url,
+            data=json.dumps(payload),
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.learner.refresh_from_db()
+        self.assertEqual(self.learner.recommendation_index, 2)
+        self.assertGreater(
+            self.learner.recommendation_index_updated_at, timezone.now() - timedelta(minutes=1)
+        )
+
     def test_submit_exercise_does_not_advance_recommendation_index_for_non_current(self):
         self.learner.recommended_exercise_ids = [
             "whats-in-the-bag",
@@ -198,3 +245,470 @@ class SubmitExerciseApiTests(BaseFlowTestMixin, TestCase):
         self.assertEqual(response.status_code, 200)
         self.learner.refresh_from_db()
         self.assertEqual(self.learner.recommendation_index, 1)
+
+
+class SubmitExerciseBatchApiTests(BaseFlowTestMixin, TestCase):
+    def setUp(self):
+        self.user, _, self.school = self.create_staff_user_with_school(
+            username="submit_batch_staff", role=Role.STAFF
+        )
+        self.learner = Learner.objects.create(
+            user=self.user,
+            school=self.school,
+            name="Submit Batch Learner",
+            date_of_birth=timezone.now().date() - timedelta(days=365 * 7),
+            exp=100,
+        )
+        self.client.force_login(self.user)
+        self.set_selected_school(self.school.id)
+        self.url = reverse(
+            "submit_exercise_batch", kwargs={"learner_uuid": self.learner.learner_uuid}
+        )
+
+    def _build_item(self, exercise_id, nonce, exp=10):
+        started_at = timezone.now() - timedelta(minutes=2)
+        completed_at = timezone.now()
+        return {
+            "nonce": nonce,
+            "exp": exp,
+            "total_exercises": 1,
+            "exercise_id": exercise_id,
+            "difficulty_level": 2,
+            "difficulty_label": "2 options",
+            "started_at": started_at.isoformat(),
+            "completed_at": completed_at.isoformat(),
+            "total_questions": 4,
+            "incorrect_answers": 0,
+            "attempts_per_question": [1, 1, 1, 1],
+        }
+
+    def _post(self, items):
+        return self.client.post(
+            self.url,
+            data=json.dumps({"results": items}),
+            content_type="application/json",
+        )
+
+    def test_batch_records_all_sessions_with_running_exp_snapshots(self):
+        response = self._post(
+            [
+                self._build_item("categorisation", "batch-1", exp=10),
+                self._build_item("spot-on", "batch-2", exp=20),
+                self._build_item("whos-who", "batch-3", exp=5),
+            ]
+        )
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(
+            [result["status"] for result in body["results"]],
+            ["accepted", "accepted", "accepted"],
+        )
+        self.assertEqual(body["learner"]["exp"], 135)
+        self.assertEqual(body["learner"]["total_exercises"], 3)
+
+        self.learner.refresh_from_db()
+        self.assertEqual(self.learner.exp, 135)
+        self.assertEqual(self.learner.total_exercises, 3)
+        snapshots = list(
+            ExerciseSession.objects.filter(learner=self.learner)
+            .order_by("id")
+            .values_list("learner_total_exp_after_session", flat=True)
+        )
+        self.assertEqual(snapshots, [110, 130, 135])
+
+    def test_batch_reports_replayed_and_repeated_nonces_as_duplicates(self):
+        single_url = reverse(
+            "submit_exercise", kwargs={"learner_uuid": self.learner.learner_uuid}
+        )
+        self.client.post(
+            single_url,
+            data=json.dumps(self._build_item("categorisation", "already-sent")),
+            content_type="application/json",
+        )
+
+        response = self._post(
+            [
+                self._build_item("categorisation", "already-sent"),
+                self._build_item("spot-on", "fresh"),
+                self._build_item("spot-on", "fresh"),
+            ]
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [result["status"] for result in response.json()["results"]],
+            ["duplicate", "accepted", "duplicate"],
+        )
+        self.learner.refresh_from_db()
+        self.assertEqual(self.learner.exp, 120)
+        self.assertEqual(ExerciseSession.objects.filter(learner=self.learner).count(), 2)
+
+        replay = self._post([self._build_item("spot-on", "fresh")])
+        self.assertEqual(replay.json()["results"][0]["status"], "duplicate")
+        self.assertEqual(ExerciseSession.objects.filter(learner=self.learner).count(), 2)
+
+    def test_batch_reports_invalid_items_without_rejecting_valid_ones(self):
+        response = self._post(
+            [
+                self._build_item("colourful-semantics-unknown", "bad-id"),
+                self._build_item("story-train", "good-id"),
+            ]
+        )
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual(results[0]["status"], "invalid")
+        self.assertIn("exercise_id", results[0]["errors"])
+        self.assertEqual(results[1]["status"], "accepted")
+        self.assertEqual(
+            list(
+                ExerciseSession.objects.filter(learner=self.learner).values_list(
+                    "exercise_id", flat=True
+                )
+            ),
+            ["story-train"],
+        )
+
+    def test_batch_rejects_empty_results(self):
+        response = self._post([])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("results", response.json())
+
+    def test_batch_advances_recommendation_index_in_submission_order(self):
+        self.learner.recommended_exercise_ids = [
+            "whats-in-the-bag",
+            "story-train-plus",
+            "in-the-know",
+        ]
+        self.learner.recommendation_index = 0
+        self.learner.recommendation_index_updated_at = timezone.now()
+        self.learner.save(
+            update_fields=[
+                "recommended_exercise_ids",
+                "recommendation_index",
+                "recommendation_index_updated_at",
+            ]
+        )
+
+        response = self._post(
+            [
+                self._build_item("whats-in-the-bag", "rec-1"),
+                self._build_item("categorisation", "rec-2"),
+                self._build_item("story-train-plus", "rec-3"),
+            ]
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.learner.refresh_from_db()
+        self.assertEqual(self.learner.recommendation_index, 2)
+
+    def test_batch_forbidden_for_cross_school_staff(self):
+        other_user, _, other_school = self.create_staff_user_with_school(
+            username="submit_batch_other", role=Role.STAFF
+        )
+        self.client.force_login(other_user)
+        self.set_selected_school(other_school.id)
+
+        response = self._post([self._build_item("categorisation", "cross-school")])
+
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(ExerciseSession.objects.filter(learner=self.learner).exists())
+
+
+class SubmitExerciseConcurrencyTests(BaseFlowTestMixin, TransactionTestCase):
+    """Lost-update checks for learner XP.
+
+    The stale-instance tests run everywhere; the threaded test fires parallel
+    submissions from separate client sessions and needs PostgreSQL.
+    """
+
+    PARALLEL_SUBMISSIONS = 8
+
+    def setUp(self):
+        self.user, _, self.school = self.create_staff_user_with_school(
+            username="submit_concurrent_staff", role=Role.STAFF
+        )
+        self.learner = Learner.objects.create(
+            user=self.user,
+            school=self.school,
+            name="Concurrent Learner",
+            date_of_birth=timezone.now().date() - timedelta(days=365 * 7),
+        )
+        self.url = reverse(
+            "submit_exercise", kwargs={"learner_uuid": self.learner.learner_uuid}
+        )
+
+    def _submit(self, index, barrier):
+        client = Client()
+        client.force_login(self.user)
+        session = client.session
+        session["selected_school_id"] = self.school.id
+        session.save()
+        payload = {
+            "nonce": f"nonce-concurrent-{index}",
+            "exp": 10,
+            "total_exercises": 1,
+            "exercise_id": "categorisation",
+            "difficulty_level": 2,
+            "started_at": (timezone.now() - timedelta(minutes=1)).isoformat(),
+            "completed_at": timezone.now().isoformat(),
+            "total_questions": 4,
+            "incorrect_answers": 0,
+            "attempts_per_question": [1, 1, 1, 1],
+        }
+        try:
+            barrier.wait()
+            return client.post(
+                self.url, data=json.dumps(payload), content_type="application/json"
+            ).status_code
+        finally:
+            connections.close_all()
+
+    def test_stale_learner_instances_do_not_lose_exp(self):
+        # Two requests that each loaded the learner before either one wrote.
+        first = Learner.objects.get(pk=self.learner.pk)
+        second = Learner.objects.get(pk=self.learner.pk)
+
+        self.assertEqual(first.add_progress(15, 1), 15)
+        self.assertEqual(second.add_progress(10, 2), 25)
+
+        self.learner.refresh_from_db()
+        self.assertEqual((self.learner.exp, self.learner.total_exercises), (25, 3))
+        self.assertEqual((second.exp, second.total_exercises), (25, 3))
+
+    def test_submission_after_a_stale_read_adds_to_the_stored_exp(self):
+        stale = Learner.objects.get(pk=self.learner.pk)
+        self.assertEqual(self._submit(0, threading.Barrier(1)), 200)
+
+        stale.add_progress(5, 1)
+
+        self.learner.refresh_from_db()
+        self.assertEqual((self.learner.exp, self.learner.total_exercises), (15, 2))
+
+    @skipIf(
+        connection.vendor == "sqlite",
+        "SQLite serialises writers with table locks; run against PostgreSQL.",
+    )
+    def test_parallel_submissions_do_not_lose_exp(self):
+        barrier = threading.Barrier(self.PARALLEL_SUBMISSIONS)
+        with ThreadPoolExecutor(max_workers=self.PARALLEL_SUBMISSIONS) as executor:
+            status_codes = list(
+                executor.map(
+                    lambda index: self._submit(index, barrier),
+                    range(self.PARALLEL_SUBMISSIONS),
+                )
+            )
+
+        self.assertEqual(status_codes, [200] * self.PARALLEL_SUBMISSIONS)
+        self.learner.refresh_from_db()
+        self.assertEqual(self.learner.exp, 10 * self.PARALLEL_SUBMISSIONS)
+        self.assertEqual(self.learner.total_exercises, self.PARALLEL_SUBMISSIONS)
+        snapshots = sorted(
+            ExerciseSession.objects.filter(learner=self.learner).values_list(
+                "learner_total_exp_after_session", flat=True
+            )
+        )
+        self.assertEqual(
+            snapshots,
+            [10 * (index + 1) for index in range(self.PARALLEL_SUBMISSIONS)],
+        )
+
+
+class SubmitExerciseIdempotencyTests(BaseFlowTestMixin, TestCase):
+    def setUp(self):
+        self.user, _, self.school = self.create_staff_user_with_school(
+            username="submit_idempotency_staff", role=Role.STAFF
+        )
+        self.learner = Learner.objects.create(
+            user=self.user,
+            school=self.school,
+            name="Idempotency Learner",
+            date_of_birth=timezone.now().date() - timedelta(days=365 * 7),
+        )
+        self.client.force_login(self.user)
+        self.set_selected_school(self.school.id)
+        self.url = reverse(
+            "submit_exercise", kwargs={"learner_uuid": self.learner.learner_uuid}
+        )
+
+    def _payload(self, nonce):
+        return {
+            "nonce": nonce,
+            "exp": 10,
+            "total_exercises": 1,
+            "exercise_id": "categorisation",
+            "difficulty_level": 2,
+            "started_at": (timezone.now() - timedelta(minutes=1)).isoformat(),
+            "completed_at": timezone.now().isoformat(),
+            "total_questions": 4,
+            "incorrect_answers": 0,
+            "attempts_per_question": [1, 1, 1, 1],
+        }
+
+    def _post(self, payload, **extra):
+        return self.client.post(
+            self.url, data=json.dumps(payload), content_type="application/json", **extra
+        )
+
+    def test_submission_stores_idempotency_key_with_response(self):
+        response = self._post(self._payload("nonce-stored"))
+
+        self.assertEqual(response.status_code, 200)
+        stored = IdempotencyKey.objects.get(user=self.user, key="nonce-stored")
+        self.assertEqual(stored.response_body, response.json())
+
+    def test_replay_returns_stored_response_without_touching_learner(self):
+        self._post(self._payload("nonce-replay"))
+
+        with CaptureQueriesContext(connection) as queries:
+            replay = self._post(self._payload("nonce-replay"))
+
+        self.assertEqual(replay.status_code, 200)
+        self.assertEqual(replay.json()["exp"], 10)
+        self.assertEqual(
+            [q["sql"] for q in queries if q["sql"].startswith(("UPDATE", "INSERT", "DELETE"))],
+            [],
+        )
+        self.learner.refresh_from_db()
+        self.assertEqual(self.learner.exp, 10)
+        self.assertEqual(ExerciseSession.objects.filter(learner=self.learner).count(), 1)
+
+    def test_idempotency_key_header_takes_precedence_over_nonce(self):
+        first = self._post(self._payload("nonce-a"), HTTP_IDEMPOTENCY_KEY="header-key")
+        second = self._post(self._payload("nonce-b"), HTTP_IDEMPOTENCY_KEY="header-key")
+
+        self.assertEqual(second.json(), first.json())
+        self.assertTrue(IdempotencyKey.objects.filter(key="header-key").exists())
+        self.assertEqual(ExerciseSession.objects.filter(learner=self.learner).count(), 1)
+
+    def test_expired_key_allows_submission_to_be_recorded_again(self):
+        self._post(self._payload("nonce-expired"))
+        IdempotencyKey.objects.filter(key="nonce-expired").update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        response = self._post(self._payload("nonce-expired"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["exp"], 20)
+        self.assertEqual(IdempotencyKey.objects.filter(key="nonce-expired").count(), 1)
+
+    def test_prune_idempotency_keys_deletes_only_expired_rows(self):
+        now = timezone.now()
+        for index in range(5):
+            IdempotencyKey.objects.create(
+                user=self.user,
+                key=f"expired-{index}",
+                response_body={},
+                expires_at=now - timedelta(minutes=1),
+            )
+        IdempotencyKey.objects.create(
+            user=self.user,
+            key="live",
+            response_body={},
+            expires_at=now + timedelta(hours=1),
+        )
+
+        output = StringIO()
+        call_command("prune_idempotency_keys", "--batch-size", "2", stdout=output)
+
+        self.assertEqual(
+            list(IdempotencyKey.objects.values_list("key", flat=True)), ["live"]
+        )
+        self.assertIn("Pruned 5", output.getvalue())
+
+
+@override_settings(EXERCISE_SUBMISSION_WRITE_BEHIND=True)
+class SubmitExerciseWriteBehindTests(BaseFlowTestMixin, TestCase):
+    def setUp(self):
+        self.user, _, self.school = self.create_staff_user_with_school(
+            username="write_behind_staff", role=Role.STAFF
+        )
+        self.learner = Learner.objects.create(
+            user=self.user,
+            school=self.school,
+            name="Write Behind Learner",
+            date_of_birth=timezone.now().date() - timedelta(days=365 * 7),
+            recommended_exercise_ids=["categorisation", "story-train"],
+            recommendation_index=0,
+        )
+        self.client.force_login(self.user)
+        self.set_selected_school(self.school.id)
+        self.url = reverse(
+            "submit_exercise", kwargs={"learner_uuid": self.learner.learner_uuid}
+        )
+
+    def _post(self, nonce, exercise_id="categorisation", exp=10):
+        payload = {
+            "nonce": nonce,
+            "exp": exp,
+            "total_exercises": 1,
+            "exercise_id": exercise_id,
+            "difficulty_level": 2,
+            "started_at": (timezone.now() - timedelta(minutes=1)).isoformat(),
+            "completed_at": timezone.now().isoformat(),
+            "total_questions": 4,
+            "incorrect_answers": 0,
+            "attempts_per_question": [1, 1, 1, 1],
+        }
+        return self.client.post(
+            self.url, data=json.dumps(payload), content_type="application/json"
+        )
+
+    def _drain(self):
+        output = StringIO()
+        call_command("drain_exercise_submissions", "--once", stdout=output)
+        return output.getvalue()
+
+    def test_submission_is_queued_without_touching_learner(self):
+        response = self._post("nonce-queued")
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(PendingExerciseSubmission.objects.filter(learner=self.learner).count(), 1)
+        self.assertFalse(ExerciseSession.objects.filter(learner=self.learner).exists())
+        self.learner.refresh_from_db()
+        self.assertEqual(self.learner.exp, 0)
+
+    def test_replayed_submission_is_not_queued_twice(self):
+        first = self._post("nonce-queued-replay")
+        replay = self._post("nonce-queued-replay")
+
+        self.assertEqual(replay.status_code, 202)
+        self.assertEqual(replay.json(), first.json())
+        self.assertEqual(PendingExerciseSubmission.objects.count(), 1)
+
+    def test_drain_applies_queued_results_in_order(self):
+        self._post("nonce-1", exercise_id="categorisation", exp=10)
+        self._post("nonce-2", exercise_id="story-train", exp=15)
+        self._post("nonce-3", exercise_id="categorisation", exp=5)
+
+        output = self._drain()
+
+        self.assertIn("Drained 3", output)
+        self.assertFalse(PendingExerciseSubmission.objects.exists())
+        self.learner.refresh_from_db()
+        self.assertEqual(self.learner.exp, 30)
+        self.assertEqual(self.learner.total_exercises, 3)
+        self.assertEqual(self.learner.recommendation_index, 1)
+        self.assertEqual(
+            list(
+                ExerciseSession.objects.filter(learner=self.learner)
+                .order_by("id")
+                .values_list("learner_total_exp_after_session", flat=True)
+            ),
+            [10, 25, 30],
+        )
+
+    def test_drain_drops_invalid_queued_payloads(self):
+        self._post("nonce-valid")
+        PendingExerciseSubmission.objects.create(
+            learner=self.learner, payload={"exercise_id": "categorisation"}
+        )
+
+        with self.assertLogs("littleTalkApp.exercise_submissions", level="WARNING"):
+            self._drain()
+
+        self.assertFalse(PendingExerciseSubmission.objects.exists())
+        self.assertEqual(ExerciseSession.objects.filter(learner=self.learner).count(), 1)
@@ -6,6 +6,7 @@ from .views_modules import assessment as assessment_views
 from .views_modules import dashboard as dashboard_views
 from .views_modules import practise as practise_views
 from .views_modules import logbook as logbook_views
+from .views_modules import metrics as metrics_views
 from .views_modules import parent_access as parent_access_views
 from .views_modules import profile as profile_views
 from .views_modules import public as public_views
@@ -33,6 +34,8 @@ urlpatterns = [
 
     # Assessment
     path('screener/', assessment_views.screener, name='screener'),
+    path('screener/import/', assessment_views.import_screener_answers, name='import_screener_answers'),
+    path('screener/import/template/', assessment_views.screener_import_template, name='screener_import_template'),
     path('screener/start/', assessment_views.start_assessment, name='start_assessment'),
     path('screener/save-all/', assessment_views.save_all_assessment_answers, name='save_all_assessment_answers'),
     path('screener/summary/', assessment_views.assessment_summary, name='assessment_summary'),
@@ -112,7 +115,9 @@ urlpatterns = [
 
     # API endpoints
     path('api/learners/<uuid:learner_uuid>/submit-exercise/', api_views.SubmitExerciseView.as_view(), name='submit_exercise'),
+    path('api/learners/<uuid:learner_uuid>/submit-exercise/batch/', api_views.SubmitExerciseBatchView.as_view(), name='submit_exercise_batch'),
     path('api/learners/<uuid:learner_uuid>/avatar/', api_views.UpdateLearnerAvatarView.as_view(), name='update_learner_avatar'),
+    path('api/learners/search/', api_views.search_learners, name='search_learners'),
     path('api/selected-learner/', api_views.get_current_session_learner_context, name='get_current_session_learner_context'),
     path('api/targets/', api_views.create_target, name='create_target'),
     path('api/targets/<int:target_id>/', api_views.target_detail, name='target_detail'),
@@ -121,6 +126,9 @@ urlpatterns = [
     path('dashboard/learner/', dashboard_views.learner_dashboard, name='learner_dashboard'),
     path('api/dashboard/progress-data/', dashboard_views.learner_progress_data, name='learner_progress_data'),
 
+    # Operations
+    path('metrics', metrics_views.metrics, name='metrics'),
+
     # React exercise routes (canonical)
     path('exercises/categorisation/', react_exercises_views.categorisation_example, name='categorisation_example'),
     path('exercises/think-and-find/', react_exercises_views.think_and_find, name='think_and_find'),
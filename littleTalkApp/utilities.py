@@ -1,6 +1,8 @@
 from django.conf import settings
 from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
 from email.utils import formataddr
 
 from .models import Role
@@ -15,6 +17,30 @@ def hash_email(email):
     return hashlib.sha256(email.lower().encode()).hexdigest()
 
 
+# conditional GET
+
+
+def build_etag(*parts):
+    """Return a quoted ETag hashed from the parts that version a JSON response."""
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()
+    return quote_etag(digest[:32])
+
+
+def not_modified_response(request, etag):
+    """Return a 304 response if the request's If-None-Match matches etag, else None."""
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        set_etag_headers(response, etag)
+    return response
+
+
+def set_etag_headers(response, etag):
+    """Attach etag and make browsers revalidate instead of reusing the response blindly."""
+    response.headers["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
 # permissions
 
 
@@ -1,8 +1,8 @@
 import json
 import logging
 
-from django.core.cache import cache
 from django.contrib.auth.decorators import login_required
+from django.db import IntegrityError, transaction
 from django.http import JsonResponse
 from django.middleware.csrf import get_token
 from django.shortcuts import get_object_or_404
@@ -13,13 +13,23 @@ from rest_framework.permissions import BasePermission, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from littleTalkApp.models import ExerciseSession, Learner
+from littleTalkApp.access import get_access_context
+from littleTalkApp.metrics import DUPLICATE_NONCE_REJECTIONS, EXERCISE_SUBMISSIONS
+from littleTalkApp.models import IdempotencyKey, Learner
 from littleTalkApp.serializers import (
     SubmitExerciseSerializer,
+    SubmitExerciseBatchSerializer,
     LearnerAvatarSerializer,
     LearnerExpUpdateSerializer,
 )
-from littleTalkApp.views_modules.practise import resolve_recommendation_index
+from littleTalkApp.exercise_submissions import (
+    advance_recommendation_index,
+    apply_exercise_results,
+    enqueue_exercise_submission,
+    is_write_behind_enabled,
+    save_exercise_sessions,
+)
+from littleTalkApp.utilities import build_etag, not_modified_response, set_etag_headers
 
 logger = logging.getLogger(__name__)
 
@@ -42,17 +52,49 @@ class CanUpdateLearnerPermission(BasePermission):
         if profile.is_parent():
             return learner.user == user
         if profile.is_staff() or profile.is_manager() or profile.is_admin():
-            current_school = profile.get_current_school(request)
+            current_school = get_access_context(request).current_school(request)
             if current_school:
-                return learner.school == current_school
+                return learner.school_id == current_school.id
             return False
         return False
 
 
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+IDEMPOTENT_REPLAY_HEADER = "Idempotent-Replayed"
+
+
+def _get_stored_idempotency_keys(user, keys):
+    """Return unexpired IdempotencyKey rows for `keys`, keyed by key.
+
+    Expired rows that have not been pruned yet are deleted here so the key can be
+    recorded again by the current request.
+    """
+
+    stored = {}
+    expired_ids = []
+    for idempotency_key in IdempotencyKey.objects.filter(user=user, key__in=set(keys)):
+        if idempotency_key.is_expired():
+            expired_ids.append(idempotency_key.id)
+        else:
+            stored[idempotency_key.key] = idempotency_key
+
+    if expired_ids:
+        IdempotencyKey.objects.filter(id__in=expired_ids).delete()
+
+    return stored
+
+
+def _replay_response(idempotency_key):
+    response = Response(idempotency_key.response_body, status=idempotency_key.response_status)
+    response[IDEMPOTENT_REPLAY_HEADER] = "true"
+    return response
+
+
 class SubmitExerciseView(APIView):
     """API endpoint (POST /api/learners/<learner_uuid>/submit-exercise/) that increments a
     learner's XP and exercise count after completing a game session. Accepts a nonce
     to prevent duplicate submissions. Optionally records a full ExerciseSession record.
+    With EXERCISE_SUBMISSION_WRITE_BEHIND enabled, the result is queued and 202 returned.
     """
 
     authentication_classes = [SessionAuthentication]
@@ -66,60 +108,163 @@ class SubmitExerciseView(APIView):
         if not input_serializer.is_valid():
             return Response(input_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        nonce = input_serializer.validated_data["nonce"]
-        cache_key = f"nonce_{request.user.id}_{nonce}"
-        if cache.get(cache_key):
-            return Response({"detail": "Nonce already used."}, status=status.HTTP_400_BAD_REQUEST)
+        # Prefer the standard Idempotency-Key header; the body nonce remains the fallback.
+        idempotency_key = (
+            request.headers.get(IDEMPOTENCY_KEY_HEADER) or input_serializer.validated_data["nonce"]
+        )
+        if len(idempotency_key) > IdempotencyKey._meta.get_field("key").max_length:
+            return Response(
+                {"detail": f"{IDEMPOTENCY_KEY_HEADER} is too long."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        stored_key = _get_stored_idempotency_keys(request.user, [idempotency_key]).get(
+            idempotency_key
+        )
+        if stored_key:
+            DUPLICATE_NONCE_REJECTIONS.inc(endpoint="submit_exercise")
+            return _replay_response(stored_key)
 
         new_exp = input_serializer.validated_data["exp"]
         new_total_exercises = input_serializer.validated_data["total_exercises"]
 
-        learner.exp += new_exp
-        learner.total_exercises += new_total_exercises
-        learner.save()
-
-        if "exercise_id" in input_serializer.validated_data:
-            submitted_exercise_id = input_serializer.validated_data["exercise_id"]
-            ExerciseSession.objects.create(
-                learner=learner,
-                exercise_id=submitted_exercise_id,
-                difficulty_selected=str(input_serializer.validated_data.get("difficulty_level", 0)),
-                difficulty_label=input_serializer.validated_data.get("difficulty_label", ""),
-                started_at=input_serializer.validated_data["started_at"],
-                completed_at=input_serializer.validated_data["completed_at"],
-                total_questions=input_serializer.validated_data["total_questions"],
-                incorrect_answers=input_serializer.validated_data["incorrect_answers"],
-                attempts_per_question=input_serializer.validated_data["attempts_per_question"],
-                learner_total_exp_after_session=learner.exp,
-            )
-
-            recommendation_ids = learner.recommended_exercise_ids or []
-            if recommendation_ids:
-                current_index = resolve_recommendation_index(learner)
-                if current_index is not None:
-                    current_exercise_id = recommendation_ids[current_index]
-                    if submitted_exercise_id == current_exercise_id:
-                        learner.recommendation_index = (current_index + 1) % len(recommendation_ids)
-                        learner.recommendation_index_updated_at = timezone.now()
-                        learner.save(
-                            update_fields=[
-                                "recommendation_index",
-                                "recommendation_index_updated_at",
-                            ]
-                        )
-
-        cache.set(cache_key, True, 600)
-
+        write_behind = is_write_behind_enabled()
+        try:
+            with transaction.atomic():
+                if write_behind:
+                    enqueue_exercise_submission(learner, input_serializer)
+                    response_status = status.HTTP_202_ACCEPTED
+                    response_body = {"detail": "Exercise result queued."}
+                else:
+                    save_exercise_sessions(
+                        apply_exercise_results(learner, [input_serializer.validated_data])
+                    )
+                    advance_recommendation_index(
+                        learner, [input_serializer.validated_data["exercise_id"]]
+                    )
+                    response_status = status.HTTP_200_OK
+                    response_body = dict(LearnerExpUpdateSerializer(learner).data)
+
+                IdempotencyKey.objects.create(
+                    user=request.user,
+                    key=idempotency_key,
+                    response_status=response_status,
+                    response_body=response_body,
+                )
+        except IntegrityError:
+            # A concurrent retry with the same key committed first; everything
+            # above was rolled back, so answer with the winner's response.
+            stored_key = IdempotencyKey.objects.get(user=request.user, key=idempotency_key)
+            DUPLICATE_NONCE_REJECTIONS.inc(endpoint="submit_exercise")
+            return _replay_response(stored_key)
+
+        EXERCISE_SUBMISSIONS.inc(mode="write_behind" if write_behind else "inline")
         logger.info(
-            "User %s updated learner %s: exp +%s, exercises +%s",
+            "User %s %s learner %s: exp +%s, exercises +%s",
             request.user.username,
+            "queued result for" if write_behind else "updated",
             learner.id,
             new_exp,
             new_total_exercises,
         )
 
-        serializer = LearnerExpUpdateSerializer(learner)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(response_body, status=response_status)
+
+
+class SubmitExerciseBatchView(APIView):
+    """API endpoint (POST /api/learners/<learner_uuid>/submit-exercise/batch/) that records
+    a queue of exercise results in one request, e.g. when a tablet replays results after
+    reconnecting. Each item is validated like a single submission and carries its own nonce;
+    accepted items are written with one bulk insert and one learner update. The response
+    reports an accepted, duplicate or invalid status per item, in request order.
+    """
+
+    authentication_classes = [SessionAuthentication]
+    permission_classes = [IsAuthenticated, CanUpdateLearnerPermission]
+
+    def post(self, request, learner_uuid):
+        learner = get_object_or_404(Learner, learner_uuid=learner_uuid)
+        self.check_object_permissions(request, learner)
+
+        batch_serializer = SubmitExerciseBatchSerializer(data=request.data)
+        if not batch_serializer.is_valid():
+            return Response(batch_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        item_results = []
+        valid_items = []
+        for item in batch_serializer.validated_data["results"]:
+            item_serializer = SubmitExerciseSerializer(data=item)
+            if item_serializer.is_valid():
+                valid_items.append((len(item_results), item_serializer.validated_data))
+                item_results.append(
+                    {"nonce": item_serializer.validated_data["nonce"], "status": "accepted"}
+                )
+            else:
+                item_results.append(
+                    {
+                        "nonce": item.get("nonce"),
+                        "status": "invalid",
+                        "errors": item_serializer.errors,
+                    }
+                )
+
+        stored_keys = _get_stored_idempotency_keys(
+            request.user, [data["nonce"] for _, data in valid_items]
+        )
+
+        accepted_items = []
+        batch_nonces = set()
+        for position, data in valid_items:
+            if data["nonce"] in stored_keys or data["nonce"] in batch_nonces:
+                item_results[position]["status"] = "duplicate"
+                continue
+            batch_nonces.add(data["nonce"])
+            accepted_items.append(data)
+
+        if accepted_items:
+            try:
+                with transaction.atomic():
+                    save_exercise_sessions(apply_exercise_results(learner, accepted_items))
+                    advance_recommendation_index(
+                        learner, [data["exercise_id"] for data in accepted_items]
+                    )
+
+                    response_body = dict(LearnerExpUpdateSerializer(learner).data)
+                    IdempotencyKey.objects.bulk_create(
+                        [
+                            IdempotencyKey(
+                                user=request.user,
+                                key=data["nonce"],
+                                response_status=status.HTTP_200_OK,
+                                response_body=response_body,
+                            )
+                            for data in accepted_items
+                        ]
+                    )
+            except IntegrityError:
+                return Response(
+                    {"detail": "Some results are already being recorded. Please retry."},
+                    status=status.HTTP_409_CONFLICT,
+                )
+
+        duplicate_count = sum(1 for result in item_results if result["status"] == "duplicate")
+        EXERCISE_SUBMISSIONS.inc(len(accepted_items), mode="batch")
+        DUPLICATE_NONCE_REJECTIONS.inc(duplicate_count, endpoint="submit_exercise_batch")
+        logger.info(
+            "User %s submitted batch for learner %s: %s accepted, %s duplicate, %s invalid",
+            request.user.username,
+            learner.id,
+            len(accepted_items),
+            duplicate_count,
+            sum(1 for result in item_results if result["status"] == "invalid"),
+        )
+
+        return Response(
+            {
+                "learner": LearnerExpUpdateSerializer(learner).data,
+                "results": item_results,
+            },
+            status=status.HTTP_200_OK,
+        )
 
 
 class UpdateLearnerAvatarView(APIView):
@@ -146,6 +291,7 @@ class UpdateLearnerAvatarView(APIView):
 def get_current_session_learner_context(request):
     """JSON API: returns the UUID, CSRF token, and CS level of the learner currently
     stored in the session. Returns 401 if unauthenticated or 400 if no learner is selected.
+    Answers a matching If-None-Match with 304.
     """
 
     if not request.user.is_authenticated:
@@ -155,17 +301,72 @@ def get_current_session_learner_context(request):
     selected_learner_id = request.session.get("selected_learner_id")
 
     if selected_learner_id:
-        selected_learner = Learner.objects.get(id=selected_learner_id)
-        return JsonResponse(
-            {
-                "learner_uuid": str(selected_learner.learner_uuid),
-                "csrf_token": csrf_token,
-                "cs_level": selected_learner.assessment2,
-            }
+        learner_uuid, cs_level = Learner.objects.values_list(
+            "learner_uuid", "assessment2"
+        ).get(id=selected_learner_id)
+
+        # A cached response stays valid while the CSRF secret is unchanged, because
+        # every masked token issued for the same secret is accepted.
+        etag = build_etag(
+            "selected-learner",
+            learner_uuid,
+            cs_level,
+            request.META.get("CSRF_COOKIE"),
+        )
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        return set_etag_headers(
+            JsonResponse(
+                {
+                    "learner_uuid": str(learner_uuid),
+                    "csrf_token": csrf_token,
+                    "cs_level": cs_level,
+                }
+            ),
+            etag,
         )
     return JsonResponse({"error": "No learner selected"}, status=400)
 
 
+LEARNER_SEARCH_LIMIT = 20
+
+
+@login_required
+def search_learners(request):
+    """JSON API (GET): learners at the current school whose name matches `q`.
+
+    Every word of `q` must be a prefix of a word of the learner's name. The
+    lookup uses the learner name blind index, so names are never compared in
+    SQL. Parents get 403; staff without a selected school get 400.
+    """
+
+    profile = getattr(request.user, "profile", None)
+    if profile is None or profile.is_parent():
+        return JsonResponse({"error": "Permission denied"}, status=403)
+
+    school = get_access_context(request).current_school(request)
+    if school is None:
+        return JsonResponse({"error": "No school selected"}, status=400)
+
+    learners = Learner.search_by_name(
+        school, request.GET.get("q", ""), limit=LEARNER_SEARCH_LIMIT
+    )
+    return JsonResponse(
+        {
+            "results": [
+                {
+                    "learner_uuid": str(learner.learner_uuid),
+                    "name": learner.name,
+                    "cohort_id": learner.cohort_id,
+                }
+                for learner in learners
+            ]
+        }
+    )
+
+
 @login_required
 def create_target(request):
     """JSON API (POST): creates a new Target for a learner identified by learner_uuid
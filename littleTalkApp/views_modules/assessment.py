@@ -4,22 +4,32 @@ from collections import defaultdict
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.db import transaction
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import redirect, render
 from django.urls import reverse
 from django.utils import timezone
 
-from littleTalkApp.content import QUESTIONS
+from littleTalkApp.blind_index import sort_by_name
+from littleTalkApp.content.assessments import QUESTIONS_BY_ORDER
 from littleTalkApp.content.assessments_v2 import (
     QUESTIONS_V2,
     STAGE_PADDING_ORDER,
-    get_question_by_order,
     validate_v2_exercise_ids,
 )
-from littleTalkApp.models import Cohort, Learner, LearnerAssessmentAnswer
-
+from littleTalkApp.forms import ScreenerImportForm
+from littleTalkApp.models import Cohort, Learner, LearnerAssessmentAnswer, ScreenerSessionSnapshot
+from littleTalkApp.screener_answers import ScreenerAnswer, build_answer_rows, get_screener_questions
+from littleTalkApp.screener_import import build_import_template
+from littleTalkApp.screener_snapshots import (
+    build_screener_snapshots,
+    compute_scored_stage_mastery,
+    compute_stage_mastery,
+    get_latest_screener_snapshots,
+    iter_v2_scored_answers,
+    record_screener_snapshot,
+)
 
-MOSTLY_YES_THRESHOLD = 0.6
 
 STAGE_TO_COLOURFUL_SEMANTICS = {
     1: "colourful-semantics-early",
@@ -63,7 +73,7 @@ def screener(request):
         except ValueError:
             pass
 
-    learners = learners.annotate(session_count=Count("exercise_sessions")).order_by("name")
+    learners = learners.annotate(session_count=Count("exercise_sessions"))
 
     learner_uuid = request.GET.get("learner")
     selected_learner = None
@@ -99,7 +109,8 @@ def screener(request):
         request,
         "assessment/screener.html",
         {
-            "learners": learners,
+            # Names are encrypted, so they can only be ordered once decrypted.
+            "learners": sort_by_name(learners),
             "selected_learner": selected_learner,
             "cohorts": cohorts,
             "selected_cohort": int(selected_cohort_id)
@@ -109,10 +120,78 @@ def screener(request):
             "has_old_screener": has_old_screener,
             "has_v2_screener": has_v2_screener,
             "last_screener_date": last_screener_date,
+            "import_form": None if profile.is_parent() else ScreenerImportForm(),
         },
     )
 
 
+def _school_learners_for_import(request):
+    """Return the learners of the staff user's current school, or None for parents
+    and users without a school."""
+
+    profile = request.user.profile
+    if profile.is_parent():
+        return None
+    user_school = profile.get_current_school(request)
+    if not user_school:
+        return None
+    return Learner.objects.filter(school=user_school, deleted=False)
+
+
+@login_required
+def import_screener_answers(request):
+    """Form POST: saves a whole class's Screener V2 answers from a CSV/XLSX sheet.
+
+    The sheet is validated against QUESTIONS_V2 and the school's learners;
+    valid sheets are saved with save_assessment_v2_for_learners, so a class
+    costs one request and a fixed number of queries. Redirects to the screener
+    page with a success message or the sheet's errors.
+    """
+
+    if request.method != "POST":
+        return redirect("screener")
+
+    learners = _school_learners_for_import(request)
+    if learners is None:
+        messages.error(request, "Only school staff can import screener answers.")
+        return redirect("screener")
+
+    form = ScreenerImportForm(request.POST, request.FILES, learners=learners)
+    if not form.is_valid():
+        for error in form.errors.get("file", []):
+            messages.error(request, error)
+        return redirect("screener")
+
+    imported = save_assessment_v2_for_learners(form.cleaned_data["file"])
+    count = len(imported)
+    messages.success(
+        request, f"Saved screener answers for {count} learner{'' if count == 1 else 's'}."
+    )
+    return redirect("screener")
+
+
+@login_required
+def screener_import_template(request):
+    """Download (CSV): the class screener import template for the current school,
+    with a row per learner (optionally one cohort) and a column per question."""
+
+    learners = _school_learners_for_import(request)
+    if learners is None:
+        messages.error(request, "Only school staff can import screener answers.")
+        return redirect("screener")
+
+    cohort_id = request.GET.get("cohort")
+    if cohort_id and cohort_id.isdigit():
+        learners = learners.filter(cohort__id=int(cohort_id))
+
+    response = HttpResponse(
+        build_import_template(sort_by_name(learners)),
+        content_type="text/csv; charset=utf-8",
+    )
+    response["Content-Disposition"] = 'attachment; filename="screener-import.csv"'
+    return response
+
+
 @login_required
 def start_assessment(request):
     """Legacy screener start route; redirect to V2 start."""
@@ -202,59 +281,6 @@ def save_all_assessment_answers_v2(request):
     return JsonResponse({"redirect_url": reverse("assessment_summary")})
 
 
-def _iter_v2_scored_answers(answers):
-    """Yield non-readiness V2 answers normalized as lowercase yes/no strings."""
-
-    question_index = {question["order"]: question for question in QUESTIONS_V2}
-
-    for question_id_str, user_answer in answers.items():
-        try:
-            question_id = int(question_id_str)
-        except (TypeError, ValueError):
-            continue
-
-        question = question_index.get(question_id)
-        if not question or question.get("is_readiness"):
-            continue
-
-        normalized_answer = str(user_answer).strip().lower()
-        if normalized_answer not in {"yes", "no"}:
-            continue
-
-        yield question, normalized_answer
-
-
-def compute_stage_mastery(answers, tau=MOSTLY_YES_THRESHOLD):
-    """Compute per-stage mastery and stage ceiling based on clustered yes answers."""
-
-    stage_stats = {
-        1: {"yes": 0, "total": 0},
-        2: {"yes": 0, "total": 0},
-        3: {"yes": 0, "total": 0},
-    }
-
-    for question, normalized_answer in _iter_v2_scored_answers(answers):
-        stage = question.get("stage")
-        if stage not in stage_stats:
-            continue
-        stage_stats[stage]["total"] += 1
-        if normalized_answer == "yes":
-            stage_stats[stage]["yes"] += 1
-
-    stage_mastery = {}
-    for stage, counts in stage_stats.items():
-        yes_ratio = (counts["yes"] / counts["total"]) if counts["total"] else 0.0
-        stage_mastery[stage] = yes_ratio >= tau
-
-    allowed_max_stage = 1
-    if stage_mastery[1]:
-        allowed_max_stage = 2
-    if stage_mastery[1] and stage_mastery[2]:
-        allowed_max_stage = 3
-
-    return stage_mastery, allowed_max_stage
-
-
 def _pad_recommendations(recommendations, allowed_max_stage):
     """Pad recommendations from the current frontier stage downward."""
 
@@ -270,14 +296,13 @@ def _pad_recommendations(recommendations, allowed_max_stage):
     return recommendations[:3]
 
 
-def compute_v2_recommendations(answers):
-    """Compute top-3 strong-match recommendations within the allowed stage ceiling."""
+def _rank_v2_exercises(scored_answers, allowed_max_stage):
+    """Rank in-range exercises by their "No" answers, then by earliest stage and blank level."""
 
-    _, allowed_max_stage = compute_stage_mastery(answers)
     exercise_scores = defaultdict(int)
     exercise_tiebreak = {}
 
-    for question, normalized_answer in _iter_v2_scored_answers(answers):
+    for question, normalized_answer in scored_answers:
         if normalized_answer != "no":
             continue
 
@@ -311,8 +336,13 @@ def compute_v2_recommendations(answers):
             item[0],
         ),
     )
+    return [exercise_id for exercise_id, _ in ranked]
+
+
+def _tier_one_recommendations(ranked, allowed_max_stage):
+    """Lead with a Colourful Semantics exercise, then pad the ranking to three."""
 
-    recommendations = [exercise_id for exercise_id, _ in ranked]
+    recommendations = list(ranked)
     colourful_semantics_id = STAGE_TO_COLOURFUL_SEMANTICS.get(allowed_max_stage)
     genuine_colourful_semantics_id = next(
         (exercise_id for exercise_id in recommendations if exercise_id in COLOURFUL_SEMANTICS_IDS),
@@ -332,117 +362,131 @@ def compute_v2_recommendations(answers):
     )
 
 
+def _score_v2_answers(answers):
+    """Return the scored answers, ranked exercises and stage ceiling of one answer set."""
+
+    scored_answers = list(iter_v2_scored_answers(answers))
+    _, allowed_max_stage = compute_scored_stage_mastery(scored_answers)
+    return _rank_v2_exercises(scored_answers, allowed_max_stage), allowed_max_stage
+
+
+def compute_v2_recommendations(answers):
+    """Compute top-3 strong-match recommendations within the allowed stage ceiling."""
+
+    ranked, allowed_max_stage = _score_v2_answers(answers)
+    return _tier_one_recommendations(ranked, allowed_max_stage)
+
+
 def compute_v2_secondary_recommendations(answers, tier_one_recommendations):
     """Compute good-match in-range support recommendations excluded from tier one."""
 
-    _, allowed_max_stage = compute_stage_mastery(answers)
+    ranked, _ = _score_v2_answers(answers)
     tier_one_ids = set(tier_one_recommendations)
-    exercise_scores = defaultdict(int)
-    exercise_tiebreak = {}
+    return [exercise_id for exercise_id in ranked if exercise_id not in tier_one_ids]
 
-    for question, normalized_answer in _iter_v2_scored_answers(answers):
-        if normalized_answer != "no":
-            continue
 
-        stage = question.get("stage")
-        if not stage or stage > allowed_max_stage:
-            continue
-
-        exercise_id = question.get("exercise_id")
-        if not exercise_id or exercise_id in tier_one_ids:
-            continue
+def compute_v2_recommendation_sets(answers):
+    """Return (tier_one, secondary) recommendations, scoring the answers once.
 
-        exercise_scores[exercise_id] += 1
+    Equivalent to compute_v2_recommendations followed by
+    compute_v2_secondary_recommendations, which each score the answers and
+    derive the stage mastery again.
+    """
 
-        blank_level = question.get("blank_level") or 999
-        current_tiebreak = exercise_tiebreak.get(exercise_id)
-        if not current_tiebreak or (stage, blank_level) < (
-            current_tiebreak["stage"],
-            current_tiebreak["blank_level"],
-        ):
-            exercise_tiebreak[exercise_id] = {
-                "stage": stage,
-                "blank_level": blank_level,
-            }
+    ranked, allowed_max_stage = _score_v2_answers(answers)
+    tier_one_recommendations = _tier_one_recommendations(ranked, allowed_max_stage)
+    tier_one_ids = set(tier_one_recommendations)
+    return tier_one_recommendations, [
+        exercise_id for exercise_id in ranked if exercise_id not in tier_one_ids
+    ]
 
-    ranked = sorted(
-        exercise_scores.items(),
-        key=lambda item: (
-            -item[1],
-            exercise_tiebreak[item[0]]["stage"],
-            exercise_tiebreak[item[0]]["blank_level"],
-            item[0],
-        ),
-    )
-    return [exercise_id for exercise_id, _ in ranked]
 
+V2_RECOMMENDATION_FIELDS = [
+    "assessment1",
+    "recommended_exercise_ids",
+    "secondary_exercise_ids",
+    "recommendation_index",
+    "recommendation_index_updated_at",
+]
 
-def save_assessment_v2_for_learner(learner, answers, session_id=None):
-    """Helper: persists a completed Screener V2 answer set for a learner."""
 
+def _check_v2_exercise_ids():
     invalid_exercise_ids = validate_v2_exercise_ids()
     if invalid_exercise_ids:
         raise ValueError(f"Invalid V2 exercise IDs configured: {invalid_exercise_ids}")
 
+
+def _apply_v2_recommendations(learner, answers, now):
+    """Set the learner's recommendation fields (except assessment1) from its answers."""
+
+    tier_one_recommendations, secondary_recommendations = compute_v2_recommendation_sets(answers)
+    learner.recommended_exercise_ids = tier_one_recommendations
+    learner.secondary_exercise_ids = secondary_recommendations
+    learner.recommendation_index = 0
+    learner.recommendation_index_updated_at = now
+
+
+def save_assessment_v2_for_learner(learner, answers, session_id=None):
+    """Helper: persists a completed Screener V2 answer set for a learner.
+
+    The answers, their snapshot and the learner's recommendations are written
+    in one transaction with a fixed number of queries.
+    """
+
+    _check_v2_exercise_ids()
+
     if not session_id:
         session_id = uuid.uuid4()
 
-    for question_id_str, user_answer in answers.items():
-        try:
-            question_id = int(question_id_str)
-        except (TypeError, ValueError):
-            continue
-
-        question = get_question_by_order(question_id)
-        if not question:
-            continue
+    rows = build_answer_rows(learner, answers, get_screener_questions(2), session_id, 2)
+    _apply_v2_recommendations(learner, answers, timezone.now())
 
-        LearnerAssessmentAnswer.objects.create(
-            learner=learner,
-            question_id=question_id,
-            topic=question["topic"],
-            skill=question["skill"],
-            text=question["text"],
-            answer=user_answer,
-            session_id=session_id,
-            screener_version=2,
+    with transaction.atomic():
+        saved_answers = LearnerAssessmentAnswer.objects.bulk_create(rows)
+        snapshot = record_screener_snapshot(
+            learner, session_id, 2, answers=[ScreenerAnswer.from_row(row) for row in saved_answers]
         )
 
-    skill_answers = defaultdict(list)
-    for question_id_str, user_answer in answers.items():
-        try:
-            question_id = int(question_id_str)
-        except (TypeError, ValueError):
-            continue
-        question = get_question_by_order(question_id)
-        if not question:
-            continue
-        skill_answers[question["skill"]].append(user_answer)
+        learner.assessment1 = len(snapshot.strong_skills) if snapshot else 0
+        learner.save(update_fields=V2_RECOMMENDATION_FIELDS)
 
-    strong_skills = [
-        skill for skill, responses in skill_answers.items() if "No" not in responses
-    ]
-    learner.assessment1 = len(strong_skills)
-    tier_one_recommendations = compute_v2_recommendations(answers)
-    learner.recommended_exercise_ids = tier_one_recommendations
-    learner.secondary_exercise_ids = compute_v2_secondary_recommendations(
-        answers,
-        tier_one_recommendations,
-    )
-    learner.recommendation_index = 0
-    learner.recommendation_index_updated_at = timezone.now()
-    learner.save(
-        update_fields=[
-            "assessment1",
-            "recommended_exercise_ids",
-            "secondary_exercise_ids",
-            "recommendation_index",
-            "recommendation_index_updated_at",
-        ]
-    )
+
+def save_assessment_v2_for_learners(learner_answers):
+    """Helper: persists Screener V2 answer sets for many learners at once.
+
+    `learner_answers` is a list of (learner, answers) pairs, one new session
+    per learner. Recommendations are computed up front; the answers, the
+    snapshots and the learners are then written with one bulk query each, in
+    one transaction, however many learners there are. Returns the learners.
+    """
+
+    _check_v2_exercise_ids()
+
+    now = timezone.now()
+    questions = get_screener_questions(2)
+    learners = []
+    rows = []
+    for learner, answers in learner_answers:
+        rows.extend(build_answer_rows(learner, answers, questions, uuid.uuid4(), 2))
+        _apply_v2_recommendations(learner, answers, now)
+        learner.assessment1 = 0
+        learners.append(learner)
+
+    with transaction.atomic():
+        saved_answers = LearnerAssessmentAnswer.objects.bulk_create(rows, batch_size=1000)
+        snapshots = build_screener_snapshots(ScreenerAnswer.from_row(row) for row in saved_answers)
+        ScreenerSessionSnapshot.objects.bulk_create(snapshots, batch_size=1000)
+
+        strong_skill_counts = {
+            snapshot.learner_id: len(snapshot.strong_skills) for snapshot in snapshots
+        }
+        for learner in learners:
+            learner.assessment1 = strong_skill_counts.get(learner.id, 0)
+        Learner.objects.bulk_update(learners, V2_RECOMMENDATION_FIELDS, batch_size=500)
+
+    return learners
 
 
-@login_required
 def save_assessment_for_learner(learner, answers, session_id=None):
     """Helper: persists a completed set of assessment answers for a learner.
 
@@ -451,55 +495,28 @@ def save_assessment_for_learner(learner, answers, session_id=None):
     on the highest complexity question answered "Yes". Not a request-handling view.
     """
 
-    if learner.recommendation_level is not None:
-        learner.assessment2 = learner.recommendation_level
-
     if not session_id:
         session_id = uuid.uuid4()
 
-    for question_id_str, user_answer in answers.items():
-        try:
-            question_id = int(question_id_str)
-        except ValueError:
-            continue
-
-        question = next((q for q in QUESTIONS if q["order"] == question_id), None)
-        if not question:
-            continue
-
-        LearnerAssessmentAnswer.objects.create(
-            learner=learner,
-            question_id=question_id,
-            topic=question["topic"],
-            skill=question["skill"],
-            text=question["text"],
-            answer=user_answer,
-            session_id=session_id,
-        )
-
-    skill_answers = defaultdict(list)
-    for question_id_str, user_answer in answers.items():
-        question_id = int(question_id_str)
-        question = next((q for q in QUESTIONS if q["order"] == question_id), None)
-        if not question:
-            continue
-        skill_answers[question["skill"]].append(user_answer)
-
-    strong_skills = [
-        skill for skill, responses in skill_answers.items() if "No" not in responses
-    ]
-    learner.assessment1 = len(strong_skills)
+    rows = build_answer_rows(learner, answers, get_screener_questions(1), session_id, 1)
 
     max_complexity = 0
-    for question_id_str, user_answer in answers.items():
-        if user_answer.lower() == "yes":
-            question_id = int(question_id_str)
-            question = next((q for q in QUESTIONS if q["order"] == question_id), None)
-            if question and question.get("complexity") is not None:
-                max_complexity = max(max_complexity, question["complexity"])
+    for row in rows:
+        complexity = QUESTIONS_BY_ORDER[row.question.order].get("complexity")
+        if row.answered_yes and complexity is not None:
+            max_complexity = max(max_complexity, complexity)
+
+    with transaction.atomic():
+        saved_answers = LearnerAssessmentAnswer.objects.bulk_create(rows)
+        snapshot = record_screener_snapshot(
+            learner, session_id, 1, answers=[ScreenerAnswer.from_row(row) for row in saved_answers]
+        )
 
-    learner.recommendation_level = max_complexity
-    learner.save()
+        if learner.recommendation_level is not None:
+            learner.assessment2 = learner.recommendation_level
+        learner.assessment1 = len(snapshot.strong_skills) if snapshot else 0
+        learner.recommendation_level = max_complexity
+        learner.save(update_fields=["assessment1", "assessment2", "recommendation_level"])
 
 
 def get_screener_comparison_data(learner, screener_version=None):
@@ -511,52 +528,20 @@ def get_screener_comparison_data(learner, screener_version=None):
     if not learner:
         return None
 
-    all_answers = learner.answers.all()
-    if screener_version is not None:
-        all_answers = all_answers.filter(screener_version=screener_version)
-
-    if not all_answers.exists():
-        return None
-
-    session_ids = all_answers.values_list("session_id", flat=True).distinct()
+    snapshots = get_latest_screener_snapshots(learner, screener_version, limit=2)
+    return compare_screener_snapshots(learner, snapshots)
 
-    sessions = []
-    for session_id in session_ids:
-        session_answers = list(all_answers.filter(session_id=session_id).order_by("timestamp"))
-        if session_answers:
-            sessions.append(
-                {
-                    "session_id": session_id,
-                    "date": session_answers[0].assessment_date,
-                    "timestamp": session_answers[0].timestamp,
-                    "answers": session_answers,
-                }
-            )
 
-    sessions.sort(key=lambda x: x["timestamp"])
+def compare_screener_snapshots(learner, snapshots):
+    """Build the comparison dict from the learner's newest-first snapshots, or None."""
 
-    if len(sessions) < 2:
+    if len(snapshots) < 2:
         return None
 
-    current_session = sessions[-1]
-    previous_session = sessions[-2]
-
-    current_skill_map = defaultdict(list)
-    for answer in current_session["answers"]:
-        current_skill_map[answer.skill].append(answer.answer)
-
-    previous_skill_map = defaultdict(list)
-    for answer in previous_session["answers"]:
-        previous_skill_map[answer.skill].append(answer.answer)
-
-    def get_skill_status(skill_map):
-        status = {}
-        for skill, responses in skill_map.items():
-            status[skill] = "strong" if "No" not in responses else "needs_support"
-        return status
-
-    current_skill_status = get_skill_status(current_skill_map)
-    previous_skill_status = get_skill_status(previous_skill_map)
+    current_snapshot, previous_snapshot = snapshots[:2]
+    previous_session_date = previous_snapshot.assessment_date
+    current_skill_status = current_snapshot.get_skill_status()
+    previous_skill_status = previous_snapshot.get_skill_status()
 
     skills_gained = []
     skills_lost = []
@@ -593,7 +578,7 @@ def get_screener_comparison_data(learner, screener_version=None):
 
     return {
         "has_previous": True,
-        "previous_session_date": previous_session["date"],
+        "previous_session_date": previous_session_date,
         "skills_gained": skills_gained,
         "skills_lost": skills_lost,
         "skills_maintained_strong": skills_maintained_strong,
@@ -610,59 +595,22 @@ def assessment_summary(request):
 
 
 def _render_assessment_summary(request, screener_version, is_old_results=False):
-    answers = []
     learner = None
+    snapshot = None
     comparison_data = None
 
     selected_id = request.session.get("selected_learner_id")
     if selected_id:
         learner = Learner.objects.filter(id=selected_id).first()
         if learner:
-            latest_session = (
-                learner.answers.filter(screener_version=screener_version)
-                .order_by("-timestamp")
-                .values("session_id")
-                .first()
-            )
-            if latest_session:
-                answers = learner.answers.filter(
-                    session_id=latest_session["session_id"],
-                    screener_version=screener_version,
-                )
-
-            comparison_data = get_screener_comparison_data(
-                learner, screener_version=screener_version
-            )
-
-    skill_answers = defaultdict(list)
-    for answer in answers:
-        skill_answers[answer.skill].append(answer.answer)
-
-    strong_skills = []
-    needs_support_skills = []
-
-    for skill, responses in skill_answers.items():
-        if "No" in responses:
-            needs_support_skills.append(skill)
-        else:
-            strong_skills.append(skill)
-
-    readiness_answers = [a for a in answers if a.skill == "Attention and listening"]
-    readiness_yes = [a for a in readiness_answers if str(a.answer).strip().lower() == "yes"]
-    readiness_no = [a for a in readiness_answers if str(a.answer).strip().lower() == "no"]
-
-    if len(readiness_no) > 0:
-        readiness_status = "not_ready"
-    elif len(readiness_yes) == len(readiness_answers) and readiness_answers:
-        readiness_status = "ready"
-    else:
-        readiness_status = "mixed"
+            snapshots = get_latest_screener_snapshots(learner, screener_version, limit=2)
+            snapshot = snapshots[0] if snapshots else None
+            comparison_data = compare_screener_snapshots(learner, snapshots)
 
     context = {
-        "answers": answers,
-        "strong_skills": strong_skills,
-        "needs_support_skills": needs_support_skills,
-        "readiness_status": readiness_status,
+        "strong_skills": snapshot.strong_skills if snapshot else [],
+        "needs_support_skills": snapshot.support_skills if snapshot else [],
+        "readiness_status": snapshot.readiness_status if snapshot else "mixed",
         "learner": learner,
         "is_old_results": is_old_results,
         "rescreener_url": reverse("start_assessment_v2"),
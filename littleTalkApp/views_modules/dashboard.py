@@ -1,65 +1,60 @@
-from collections import defaultdict
 from datetime import timedelta
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db import models
-from django.db.models import Count, DurationField, ExpressionWrapper
+from django.db.models import Count, Min, Sum, Value
+from django.db.models.functions import Coalesce
 from django.http import JsonResponse
 from django.shortcuts import redirect, render
 from django.utils import timezone
 
-from littleTalkApp.content import GAME_DESCRIPTIONS
-from littleTalkApp.models import Cohort, ExerciseSession, Learner
-from littleTalkApp.views_modules.practise import (
-    CANONICAL_TO_PRACTISE_KEY,
-    PRACTISE_STAGES,
+from littleTalkApp.blind_index import sort_by_name
+from littleTalkApp.exercise_registry import get_exercise_registry
+from littleTalkApp.utilities import build_etag, not_modified_response, set_etag_headers
+from littleTalkApp.models import (
+    LEGACY_SESSION_EXP,
+    Cohort,
+    ExerciseSession,
+    Learner,
+    LearnerDailyStats,
+    Target,
 )
-from littleTalkApp.views_modules.assessment import get_screener_comparison_data
+from littleTalkApp.screener_snapshots import get_latest_screener_snapshots
+from littleTalkApp.views_modules.assessment import compare_screener_snapshots
 
+# Progress chart ranges this long or longer are served from LearnerDailyStats.
+ROLLUP_MIN_DAYS = 30
 
-def _build_dashboard_exercise_groups(exercise_counts):
-    groups = []
-
-    for stage_number in sorted(PRACTISE_STAGES.keys()):
-        stage_data = PRACTISE_STAGES[stage_number]
-        stage_exercises = []
-
-        for practise_key in stage_data.get("exercises", []):
-            matching_slug = next(
-                (
-                    slug
-                    for slug, mapped_key in CANONICAL_TO_PRACTISE_KEY.items()
-                    if mapped_key == practise_key
-                ),
-                None,
-            )
-            if not matching_slug:
-                continue
+# Cumulative progress metrics keep their value at each bucket's last point when
+# downsampled; the rest are averaged and rounded to these places.
+CUMULATIVE_PROGRESS_METRICS = {"exp", "exercises"}
+AVERAGED_METRIC_PRECISION = {"accuracy": 1, "difficulty": 2, "time_elapsed": 1}
+MIN_PROGRESS_POINTS = 2
+# Applied when a client sends no max_points; the dashboard sends one from the
+# chart width.
+DEFAULT_MAX_PROGRESS_POINTS = 500
 
-            title = GAME_DESCRIPTIONS.get(practise_key, {}).get("title", matching_slug)
-            stage_exercises.append(
+
+def _build_dashboard_exercise_groups(exercise_counts):
+    return [
+        {
+            "id": f"stage-{stage.number}",
+            "label": stage.label,
+            "exercises": [
                 {
-                    "id": matching_slug,
-                    "name": title,
-                    "count": exercise_counts.get(matching_slug, 0),
+                    "id": exercise.exercise_id,
+                    "name": exercise.title,
+                    "count": exercise_counts.get(exercise.exercise_id, 0),
                 }
-            )
-
-        groups.append(
-            {
-                "id": f"stage-{stage_number}",
-                "label": stage_data.get("label", f"Stage {stage_number}"),
-                "exercises": stage_exercises,
-            }
-        )
-
-    return groups
+                for exercise in stage.exercises
+            ],
+        }
+        for stage in get_exercise_registry().stages
+    ]
 
 
-def _format_elapsed_time(duration):
-    total_seconds = int(max(duration.total_seconds(), 0))
-    minutes, seconds = divmod(total_seconds, 60)
+def _format_elapsed_time(total_seconds):
+    minutes, seconds = divmod(int(max(total_seconds, 0)), 60)
     return f"{minutes}m {seconds:02d}s"
 
 
@@ -74,21 +69,20 @@ def _build_recent_sessions(selected_learner):
 
     rows = []
     for session in recent_sessions:
-        practise_key = CANONICAL_TO_PRACTISE_KEY.get(session.exercise_id)
-        exercise_name = GAME_DESCRIPTIONS.get(practise_key, {}).get(
-            "title",
-            session.exercise_id,
-        )
+        exercise = get_exercise_registry().get(session.exercise_id)
+        exercise_name = exercise.title if exercise else session.exercise_id
 
-        if session.total_questions > 0:
-            correct = session.total_questions - session.incorrect_answers
-            accuracy_display = f"{round((correct / session.total_questions) * 100, 1)}%"
-        else:
-            accuracy_display = "-"
+        # Rows recorded before the metric columns existed are derived until backfilled.
+        if session.elapsed_seconds is None:
+            session.populate_derived_metrics()
+
+        accuracy_display = "-"
+        if session.accuracy_percentage is not None:
+            accuracy_display = f"{session.accuracy_percentage}%"
 
         elapsed_display = "-"
-        if session.started_at and session.completed_at:
-            elapsed_display = _format_elapsed_time(session.completed_at - session.started_at)
+        if session.elapsed_seconds is not None:
+            elapsed_display = _format_elapsed_time(session.elapsed_seconds)
 
         rows.append(
             {
@@ -105,6 +99,197 @@ def _build_recent_sessions(selected_learner):
     return rows
 
 
+def _build_session_progress_series(learner, date_start, date_end, exercise_id, metrics, max_accuracy):
+    sessions = ExerciseSession.objects.filter(
+        learner=learner,
+        created_at__date__gte=date_start,
+        created_at__date__lte=date_end,
+    )
+    prior_sessions = ExerciseSession.objects.filter(learner=learner, created_at__date__lt=date_start)
+
+    if exercise_id and exercise_id != "all":
+        sessions = sessions.filter(exercise_id=exercise_id)
+        prior_sessions = prior_sessions.filter(exercise_id=exercise_id)
+
+    if max_accuracy is not None:
+        sessions = sessions.filter(accuracy_percentage__lt=max_accuracy)
+        prior_sessions = prior_sessions.filter(accuracy_percentage__lt=max_accuracy)
+
+    # Sessions recorded before exp_earned was stored count as the legacy 10 XP.
+    exp_earned = Coalesce("exp_earned", Value(LEGACY_SESSION_EXP))
+    prior_totals = prior_sessions.aggregate(count=Count("id"), exp=Sum(exp_earned))
+
+    sessions = sessions.annotate(session_exp=exp_earned).order_by("completed_at")
+
+    dates = []
+    metrics_data = {metric: [] for metric in metrics}
+    difficulty_labels = []
+
+    cumulative_exp = prior_totals["exp"] or 0
+    cumulative_exercises = prior_totals["count"]
+
+    for session in sessions:
+        dates.append(session.completed_at.strftime("%Y-%m-%d %H:%M"))
+
+        if session.elapsed_seconds is None:
+            session.populate_derived_metrics()
+
+        for metric in metrics:
+            if metric == "exp":
+                cumulative_exp += session.session_exp
+                metrics_data[metric].append(cumulative_exp)
+            elif metric == "exercises":
+                cumulative_exercises += 1
+                metrics_data[metric].append(cumulative_exercises)
+            elif metric == "accuracy":
+                metrics_data[metric].append(session.accuracy_percentage)
+            elif metric == "difficulty":
+                try:
+                    difficulty = float(session.difficulty_selected)
+                    metrics_data[metric].append(round(difficulty, 2))
+                except (ValueError, TypeError):
+                    metrics_data[metric].append(None)
+            elif metric == "time_elapsed":
+                if session.elapsed_seconds is None:
+                    metrics_data[metric].append(None)
+                else:
+                    metrics_data[metric].append(round(session.elapsed_seconds / 60, 1))
+
+        difficulty_labels.append(session.difficulty_label or "")
+
+    return dates, metrics_data, difficulty_labels
+
+
+def _build_daily_progress_series(learner, date_start, date_end, exercise_id, metrics):
+    rollups = LearnerDailyStats.objects.filter(learner=learner)
+    if exercise_id and exercise_id != "all":
+        rollups = rollups.filter(exercise_id=exercise_id)
+
+    prior_totals = rollups.filter(date__lt=date_start).aggregate(
+        count=Sum("session_count"),
+        exp=Sum("exp_total"),
+    )
+    days = (
+        rollups.filter(date__gte=date_start, date__lte=date_end)
+        .values("date")
+        .annotate(
+            session_count=Sum("session_count"),
+            accuracy_sum=Sum("accuracy_sum"),
+            accuracy_count=Sum("accuracy_count"),
+            difficulty_sum=Sum("difficulty_sum"),
+            difficulty_count=Sum("difficulty_count"),
+            elapsed_seconds_total=Sum("elapsed_seconds_total"),
+            exp_total=Sum("exp_total"),
+        )
+        .order_by("date")
+    )
+
+    dates = []
+    metrics_data = {metric: [] for metric in metrics}
+    difficulty_labels = []
+
+    cumulative_exp = prior_totals["exp"] or 0
+    cumulative_exercises = prior_totals["count"] or 0
+
+    for day in days:
+        dates.append(day["date"].strftime("%Y-%m-%d"))
+
+        for metric in metrics:
+            if metric == "exp":
+                cumulative_exp += day["exp_total"]
+                metrics_data[metric].append(cumulative_exp)
+            elif metric == "exercises":
+                cumulative_exercises += day["session_count"]
+                metrics_data[metric].append(cumulative_exercises)
+            elif metric == "accuracy":
+                metrics_data[metric].append(
+                    round(day["accuracy_sum"] / day["accuracy_count"], 1)
+                    if day["accuracy_count"]
+                    else None
+                )
+            elif metric == "difficulty":
+                metrics_data[metric].append(
+                    round(day["difficulty_sum"] / day["difficulty_count"], 2)
+                    if day["difficulty_count"]
+                    else None
+                )
+            elif metric == "time_elapsed":
+                metrics_data[metric].append(
+                    round(day["elapsed_seconds_total"] / day["session_count"] / 60, 1)
+                )
+
+        difficulty_labels.append("")
+
+    return dates, metrics_data, difficulty_labels
+
+
+def _downsample_progress_series(dates, metrics_data, difficulty_labels, max_points):
+    """Merge consecutive points into at most max_points evenly sized buckets.
+
+    Each bucket is labelled with its last point's date and difficulty label, so
+    cumulative metrics stay exact at bucket edges. Other metrics are averaged
+    over the bucket's non-null values.
+    """
+
+    point_count = len(dates)
+    if point_count <= max_points:
+        return dates, metrics_data, difficulty_labels
+
+    bounds = [index * point_count // max_points for index in range(max_points + 1)]
+    buckets = list(zip(bounds, bounds[1:]))
+
+    sampled_metrics = {}
+    for metric, values in metrics_data.items():
+        sampled = []
+        for start, end in buckets:
+            if metric in CUMULATIVE_PROGRESS_METRICS:
+                sampled.append(values[end - 1])
+                continue
+            present = [value for value in values[start:end] if value is not None]
+            if not present:
+                sampled.append(None)
+            else:
+                sampled.append(
+                    round(sum(present) / len(present), AVERAGED_METRIC_PRECISION.get(metric, 1))
+                )
+        sampled_metrics[metric] = sampled
+
+    return (
+        [dates[end - 1] for _, end in buckets],
+        sampled_metrics,
+        [difficulty_labels[end - 1] for _, end in buckets],
+    )
+
+
+def _build_targets_data(learner):
+    """Partition a learner's targets by status from a single query.
+
+    Target.text is encrypted, so each row is fetched and decrypted once and the
+    counts are taken from the partitioned lists rather than extra COUNT queries.
+    """
+
+    targets = list(Target.objects.filter(learner=learner).order_by("-created_at"))
+
+    by_status = {status: [] for status in Target.Status.values}
+    for target in targets:
+        by_status.setdefault(target.status, []).append(target)
+
+    total_targets = len(targets)
+    achieved_targets = len(by_status[Target.Status.ACHIEVED])
+    targets_percentage = round((achieved_targets / total_targets * 100)) if total_targets > 0 else 0
+
+    return {
+        "all": targets,
+        "achieved": by_status[Target.Status.ACHIEVED],
+        "not_achieved": by_status[Target.Status.NOT_ACHIEVED],
+        "ongoing": by_status[Target.Status.ONGOING],
+        "not_set": by_status[Target.Status.NOT_SET],
+        "total_count": total_targets,
+        "achieved_count": achieved_targets,
+        "percentage": targets_percentage,
+    }
+
+
 @login_required
 def learner_dashboard(request):
     """Renders dashboard/learner_dashboard.html — the main staff-facing learner overview.
@@ -134,7 +319,7 @@ def learner_dashboard(request):
         except ValueError:
             pass
 
-    accessible_learners = accessible_learners.annotate(session_count=Count("exercise_sessions")).order_by("name")
+    accessible_learners = accessible_learners.annotate(session_count=Count("exercise_sessions"))
 
     learner_uuid = request.GET.get("learner")
     selected_learner = None
@@ -165,51 +350,13 @@ def learner_dashboard(request):
 
     exercise_groups = _build_dashboard_exercise_groups(exercise_counts)
 
-    targets_data = None
-    if selected_learner:
-        from littleTalkApp.models import Target
-
-        targets = Target.objects.filter(learner=selected_learner).order_by("-created_at")
-
-        total_targets = targets.count()
-        achieved_targets = targets.filter(status=Target.Status.ACHIEVED).count()
-        targets_percentage = round((achieved_targets / total_targets * 100)) if total_targets > 0 else 0
-
-        targets_data = {
-            "all": list(targets),
-            "achieved": list(targets.filter(status=Target.Status.ACHIEVED)),
-            "not_achieved": list(targets.filter(status=Target.Status.NOT_ACHIEVED)),
-            "ongoing": list(targets.filter(status=Target.Status.ONGOING)),
-            "not_set": list(targets.filter(status=Target.Status.NOT_SET)),
-            "total_count": total_targets,
-            "achieved_count": achieved_targets,
-            "percentage": targets_percentage,
-        }
+    targets_data = _build_targets_data(selected_learner) if selected_learner else None
 
     screener_data = None
     if selected_learner:
-        comparison_data = get_screener_comparison_data(selected_learner, screener_version=2)
-
-        latest_session = (
-            selected_learner.answers.filter(screener_version=2)
-            .order_by("-timestamp")
-            .values("session_id")
-            .first()
-        )
-        current_strong_skills = []
-        current_support_skills = []
-
-        if latest_session:
-            answers = selected_learner.answers.filter(session_id=latest_session["session_id"])
-            skill_answers = defaultdict(list)
-            for answer in answers:
-                skill_answers[answer.skill].append(answer.answer)
-
-            for skill, responses in skill_answers.items():
-                if "No" in responses:
-                    current_support_skills.append(skill)
-                else:
-                    current_strong_skills.append(skill)
+        snapshots = get_latest_screener_snapshots(selected_learner, screener_version=2, limit=2)
+        latest_snapshot = snapshots[0] if snapshots else None
+        comparison_data = compare_screener_snapshots(selected_learner, snapshots)
 
         skills_gained_count = 0
         first_screener_date = None
@@ -218,8 +365,8 @@ def learner_dashboard(request):
             skills_gained_count = len(comparison_data["skills_gained"])
 
             first_session = (
-                selected_learner.answers.filter(screener_version=2)
-                .order_by("timestamp")
+                selected_learner.screener_snapshots.filter(screener_version=2)
+                .order_by("started_at")
                 .values("assessment_date")
                 .first()
             )
@@ -228,17 +375,18 @@ def learner_dashboard(request):
 
         screener_data = {
             "comparison": comparison_data,
-            "current_strong_skills": current_strong_skills,
-            "current_support_skills": current_support_skills,
+            "current_strong_skills": latest_snapshot.strong_skills if latest_snapshot else [],
+            "current_support_skills": latest_snapshot.support_skills if latest_snapshot else [],
             "skills_gained_count": skills_gained_count,
             "first_screener_date": first_screener_date,
-            "has_screener_data": latest_session is not None,
+            "has_screener_data": latest_snapshot is not None,
         }
 
     recent_sessions = _build_recent_sessions(selected_learner)
 
     context = {
-        "learners": accessible_learners,
+        # Names are encrypted, so they can only be ordered once decrypted.
+        "learners": sort_by_name(accessible_learners),
         "selected_learner": selected_learner,
         "cohorts": cohorts,
         "selected_cohort": int(selected_cohort_id) if selected_cohort_id and selected_cohort_id.isdigit() else None,
@@ -257,8 +405,13 @@ def learner_progress_data(request):
     """JSON API: returns time-series progress data for a given learner.
 
     Accepts query params: learner_uuid, date_range (days or 'all'), exercise_id,
-    and a comma-separated metrics list (exp, exercises, accuracy, difficulty, time_elapsed).
-    Used to populate the progress chart on the learner dashboard.
+    a comma-separated metrics list (exp, exercises, accuracy, difficulty, time_elapsed),
+    an optional max_accuracy that keeps only sessions below that accuracy percentage,
+    and an optional max_points that downsamples the series to at most that many points
+    (DEFAULT_MAX_PROGRESS_POINTS when omitted).
+    Ranges of ROLLUP_MIN_DAYS or more return one point per day from LearnerDailyStats;
+    shorter ranges return one point per session. Used to populate the progress chart
+    on the learner dashboard.
     """
 
     profile = request.user.profile
@@ -278,20 +431,69 @@ def learner_progress_data(request):
     except Learner.DoesNotExist:
         return JsonResponse({"error": "Learner not found or access denied"}, status=404)
 
+    # Progress only changes when a submission is recorded, sessions or rollups
+    # are rewritten (progress_version) or the day rolls over, so a matching
+    # ETag is answered before any session or rollup query runs.
+    etag = build_etag(
+        "learner-progress",
+        learner.id,
+        learner.name,
+        learner.last_exercise_at,
+        learner.progress_version,
+        timezone.now().date(),
+        sorted(request.GET.lists()),
+    )
+    not_modified = not_modified_response(request, etag)
+    if not_modified is not None:
+        return not_modified
+
+    max_accuracy = request.GET.get("max_accuracy")
+    if max_accuracy:
+        try:
+            max_accuracy = float(max_accuracy)
+        except ValueError:
+            return JsonResponse({"error": "max_accuracy must be a number"}, status=400)
+    else:
+        max_accuracy = None
+
+    max_points = request.GET.get("max_points")
+    if max_points:
+        try:
+            max_points = int(max_points)
+        except ValueError:
+            max_points = 0
+        if max_points < MIN_PROGRESS_POINTS:
+            return JsonResponse(
+                {"error": f"max_points must be an integer of at least {MIN_PROGRESS_POINTS}"},
+                status=400,
+            )
+    else:
+        max_points = DEFAULT_MAX_PROGRESS_POINTS
+
     date_range = request.GET.get("date_range", "30")
     date_end = timezone.now().date()
 
     if date_range == "all":
-        earliest_session = ExerciseSession.objects.filter(learner=learner).order_by("created_at").first()
-        if earliest_session:
-            date_start = earliest_session.created_at.date()
-        else:
-            date_start = date_end
+        days = None
     else:
         try:
             days = int(date_range)
         except ValueError:
             days = 30
+
+    # Long ranges read the daily rollups; the accuracy filter needs raw sessions.
+    use_rollups = max_accuracy is None and (days is None or days >= ROLLUP_MIN_DAYS)
+
+    if days is None:
+        if use_rollups:
+            earliest = learner.daily_stats.aggregate(earliest=Min("date"))["earliest"]
+        else:
+            earliest_session = (
+                ExerciseSession.objects.filter(learner=learner).order_by("created_at").first()
+            )
+            earliest = earliest_session.created_at.date() if earliest_session else None
+        date_start = earliest or date_end
+    else:
         date_start = date_end - timedelta(days=days)
 
     exercise_id = request.GET.get("exercise_id")
@@ -300,64 +502,20 @@ def learner_progress_data(request):
     if not metrics:
         metrics = ["exp"]
 
-    sessions = ExerciseSession.objects.filter(
-        learner=learner,
-        created_at__date__gte=date_start,
-        created_at__date__lte=date_end,
-    ).annotate(
-        time_elapsed=ExpressionWrapper(
-            models.F("completed_at") - models.F("started_at"),
-            output_field=DurationField(),
+    if use_rollups:
+        dates, metrics_data, difficulty_labels = _build_daily_progress_series(
+            learner, date_start, date_end, exercise_id, metrics
+        )
+    else:
+        dates, metrics_data, difficulty_labels = _build_session_progress_series(
+            learner, date_start, date_end, exercise_id, metrics, max_accuracy
         )
-    ).order_by("completed_at")
-
-    if exercise_id and exercise_id != "all":
-        sessions = sessions.filter(exercise_id=exercise_id)
-
-    prior_sessions = ExerciseSession.objects.filter(learner=learner, created_at__date__lt=date_start)
-    if exercise_id and exercise_id != "all":
-        prior_sessions = prior_sessions.filter(exercise_id=exercise_id)
-
-    prior_count = prior_sessions.count()
-
-    dates = []
-    metrics_data = {metric: [] for metric in metrics}
-    difficulty_labels = []
-
-    cumulative_exp = prior_count * 10
-    cumulative_exercises = prior_count
-
-    for session in sessions:
-        dates.append(session.completed_at.strftime("%Y-%m-%d %H:%M"))
-
-        for metric in metrics:
-            if metric == "exp":
-                cumulative_exp += 10
-                metrics_data[metric].append(cumulative_exp)
-            elif metric == "exercises":
-                cumulative_exercises += 1
-                metrics_data[metric].append(cumulative_exercises)
-            elif metric == "accuracy":
-                if session.total_questions > 0:
-                    correct = session.total_questions - session.incorrect_answers
-                    accuracy = (correct / session.total_questions) * 100
-                    metrics_data[metric].append(round(accuracy, 1))
-                else:
-                    metrics_data[metric].append(None)
-            elif metric == "difficulty":
-                try:
-                    difficulty = float(session.difficulty_selected)
-                    metrics_data[metric].append(round(difficulty, 2))
-                except (ValueError, TypeError):
-                    metrics_data[metric].append(None)
-            elif metric == "time_elapsed":
-                if session.time_elapsed is None:
-                    metrics_data[metric].append(None)
-                else:
-                    elapsed_minutes = session.time_elapsed.total_seconds() / 60
-                    metrics_data[metric].append(round(max(elapsed_minutes, 0), 1))
 
-        difficulty_labels.append(session.difficulty_label or "")
+    point_count = len(dates)
+    if max_points:
+        dates, metrics_data, difficulty_labels = _downsample_progress_series(
+            dates, metrics_data, difficulty_labels, max_points
+        )
 
     metrics_data_response = [
         (
@@ -382,6 +540,8 @@ def learner_progress_data(request):
         "exercise_id": exercise_id or "all",
         "date_start": date_start.strftime("%Y-%m-%d"),
         "date_end": date_end.strftime("%Y-%m-%d"),
+        "granularity": "day" if use_rollups else "session",
+        "downsampled_from": point_count if len(dates) < point_count else None,
     }
 
-    return JsonResponse(response_data)
+    return set_etag_headers(JsonResponse(response_data), etag)
@@ -46,7 +46,7 @@ def logbook(request):
     elif selected_cohort_id:
         log_entries = log_entries.filter(learner__cohort__id=selected_cohort_id)
 
-    log_entries = log_entries.order_by("-timestamp")
+    log_entries = log_entries.select_related("learner").order_by("-timestamp")
 
     return render(
         request,
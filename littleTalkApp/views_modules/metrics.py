@@ -0,0 +1,32 @@
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.views.decorators.http import require_GET
+
+from littleTalkApp.metrics import is_metrics_enabled, render_metrics
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@require_GET
+def metrics(request):
+    """Prometheus scrape endpoint (GET /metrics).
+
+    Returns 404 unless METRICS_ENABLED and METRICS_TOKEN are both set, and 401
+    unless the request sends `Authorization: Bearer <METRICS_TOKEN>`.
+    """
+
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if not is_metrics_enabled() or not token:
+        raise Http404
+
+    scheme, _, supplied = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(supplied.encode(), token.encode()):
+        response = HttpResponse("Unauthorized", status=401, content_type="text/plain")
+        response["WWW-Authenticate"] = 'Bearer realm="metrics"'
+        return response
+
+    response = HttpResponse(render_metrics(), content_type=PROMETHEUS_CONTENT_TYPE)
+    response["Cache-Control"] = "no-store"
+    return response
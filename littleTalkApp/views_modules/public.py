@@ -2,14 +2,13 @@ from django.conf import settings
 from django.contrib import messages
 from django.core.mail import send_mail
 from django.shortcuts import redirect, render
-from django.urls import reverse
 
 from honeypot.decorators import check_honeypot
 
 from littleTalkApp.decorators import valid_game_required
 from littleTalkApp.content.game_descriptions import GAME_DESCRIPTIONS
 from littleTalkApp.content.testimonials import get_landing_testimonials
-from littleTalkApp.views_modules.practise import PRACTISE_STAGES
+from littleTalkApp.exercise_registry import get_exercise_registry
 
 
 def home(request):
@@ -41,37 +40,11 @@ def game_description(request, game_name):
     """
 
     game = GAME_DESCRIPTIONS.get(game_name, None)
-    launch_route_names = {
-        "colourful_semantics": "colourful_semantics",
-        "colourful_semantics_early_sentence_building": "colourful_semantics",
-        "colourful_semantics_advanced_sentence_building": "colourful_semantics",
-        "think_and_find": "think_and_find",
-        "concept_quest": "concept_quest",
-        "categorisation": "categorisation_example",
-        "story_train": "story_train",
-        "story_train_advanced_sequencing": "story_train",
-        "task_master_instructions": "task_master",
-        "spot_on": "spot_on",
-        "whos_who_pronouns": "whos_who",
-        "whats_in_the_bag_vocabulary_builder": "whats_in_the_bag",
-        "in_the_know_inferencing": "in_the_know",
-        "what_happens_next_predicting": "what_happens_next",
-    }
-
-    launch_route_queries = {
-        "colourful_semantics_early_sentence_building": "variant=early-years",
-        "colourful_semantics_advanced_sentence_building": "variant=advanced",
-        "story_train_advanced_sequencing": "variant=advanced",
-    }
-
-    route_name = launch_route_names.get(game_name)
-    if not route_name:
+    exercise = get_exercise_registry().get_by_practise_key(game_name)
+    if not exercise:
         return redirect("practise")
 
-    launch_url = reverse(route_name)
-    query = launch_route_queries.get(game_name)
-    if query:
-        launch_url = f"{launch_url}?{query}"
+    launch_url = exercise.start_url
 
     return render(
         request,
@@ -134,24 +107,14 @@ def method(request):
     including descriptions of all available games.
     """
 
-    method_stages = []
-    for stage_number in sorted(PRACTISE_STAGES.keys()):
-        stage_data = PRACTISE_STAGES[stage_number]
-        stage_exercises = []
-
-        for exercise_key in stage_data.get("exercises", []):
-            game_data = GAME_DESCRIPTIONS.get(exercise_key)
-            if not game_data:
-                continue
-            stage_exercises.append(game_data)
-
-        method_stages.append(
-            {
-                "number": stage_number,
-                "label": stage_data.get("label", f"Stage {stage_number}"),
-                "exercises": stage_exercises,
-            }
-        )
+    method_stages = [
+        {
+            "number": stage.number,
+            "label": stage.label,
+            "exercises": [exercise.game for exercise in stage.exercises],
+        }
+        for stage in get_exercise_registry().stages
+    ]
 
     context = {
         "game_descriptions": GAME_DESCRIPTIONS,
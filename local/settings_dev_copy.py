@@ -62,15 +62,15 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'littleTalkApp.middleware.QueryBudgetMiddleware',
+    'littleTalkApp.middleware.MetricsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'littleTalkApp.middleware.AccessControlMiddleware',
-    'littleTalkApp.middleware.SchoolSelectionMiddleware',
-    'littleTalkApp.middleware.RoleSchoolBlockMiddleware',
+    'littleTalkApp.middleware.AccessPolicyMiddleware',
 ]
 
 ROOT_URLCONF = 'littleTalk.urls'
@@ -187,6 +187,13 @@ FIELD_ENCRYPTION_KEY = os.getenv('FIELD_ENCRYPTION_KEY')
 if not FIELD_ENCRYPTION_KEY:
     raise ValueError("Missing FIELD_ENCRYPTION_KEY environment variable")
 
+# HMAC key for the learner name blind index. Kept separate from
+# FIELD_ENCRYPTION_KEY so rotating that key leaves name search working; changing
+# this one requires `manage.py backfill_learner_name_index --rebuild`.
+LEARNER_NAME_INDEX_KEY = os.getenv('LEARNER_NAME_INDEX_KEY')
+if not LEARNER_NAME_INDEX_KEY:
+    raise ValueError("Missing LEARNER_NAME_INDEX_KEY environment variable")
+
 # stripe payments
 STRIPE_SECRET_KEY = os.getenv('STRIPE_SECRET_KEY')
 if not STRIPE_SECRET_KEY:
@@ -267,3 +274,10 @@ DJANGO_VITE = {
     "dev_mode": True
   }
 }
+
+# Prometheus metrics (opt-in). METRICS_DIR must be shared by all gunicorn
+# workers and cleared when the service starts; it defaults to a temp directory.
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '').lower() == 'true'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+if os.getenv('METRICS_DIR'):
+    METRICS_DIR = os.getenv('METRICS_DIR')
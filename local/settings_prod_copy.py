@@ -59,6 +59,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'littleTalkApp.middleware.QueryBudgetMiddleware',
+    'littleTalkApp.middleware.MetricsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'littleTalkApp.middleware.NoCacheHtmlMiddleware',
@@ -67,9 +69,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'littleTalkApp.middleware.AccessControlMiddleware',
-    'littleTalkApp.middleware.RoleSchoolBlockMiddleware',
-    'littleTalkApp.middleware.SchoolSelectionMiddleware',
+    'littleTalkApp.middleware.AccessPolicyMiddleware',
 ]
 
 ROOT_URLCONF = 'littleTalk.urls'
@@ -192,6 +192,13 @@ FIELD_ENCRYPTION_KEY = os.getenv('FIELD_ENCRYPTION_KEY')
 if not FIELD_ENCRYPTION_KEY:
     raise ValueError("Missing FIELD_ENCRYPTION_KEY environment variable")
 
+# HMAC key for the learner name blind index. Kept separate from
+# FIELD_ENCRYPTION_KEY so rotating that key leaves name search working; changing
+# this one requires `manage.py backfill_learner_name_index --rebuild`.
+LEARNER_NAME_INDEX_KEY = os.getenv('LEARNER_NAME_INDEX_KEY')
+if not LEARNER_NAME_INDEX_KEY:
+    raise ValueError("Missing LEARNER_NAME_INDEX_KEY environment variable")
+
 # stripe payments
 STRIPE_SECRET_KEY = os.getenv('STRIPE_SECRET_KEY')
 if not STRIPE_SECRET_KEY:
@@ -300,3 +307,10 @@ DJANGO_VITE = {
         "static_url_prefix": "js/exercises",
     }
 }
+
+# Prometheus metrics (opt-in). METRICS_DIR must be shared by all gunicorn
+# workers and cleared when the service starts; it defaults to a temp directory.
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '').lower() == 'true'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+if os.getenv('METRICS_DIR'):
+    METRICS_DIR = os.getenv('METRICS_DIR')
@@ -16,9 +16,15 @@ document.addEventListener("DOMContentLoaded", () => {
         return;
     }
 
-    const chartCtx = document.getElementById("progress-chart").getContext("2d");
+    const chartCanvas = document.getElementById("progress-chart");
+    const chartCtx = chartCanvas.getContext("2d");
     let progressChart = null;
 
+    // Ask for at most one point per few pixels; longer series are averaged
+    // into buckets by the server.
+    const PIXELS_PER_POINT = 3;
+    const MIN_CHART_POINTS = 2;
+
     const metricLabels = {
         accuracy: "Accuracy (%)",
         difficulty: "Difficulty Level",
@@ -391,6 +397,11 @@ document.addEventListener("DOMContentLoaded", () => {
         }
     }
 
+    function getMaxChartPoints() {
+        const width = chartCanvas.clientWidth || chartCanvas.width;
+        return Math.max(MIN_CHART_POINTS, Math.floor(width / PIXELS_PER_POINT));
+    }
+
     function normalizeMetricSelectionForMode() {
         if (isLayerMetricsEnabled()) {
             return;
@@ -430,6 +441,7 @@ document.addEventListener("DOMContentLoaded", () => {
             exercise_id: exerciseId,
             metrics: selectedMetrics.join(","),
             date_range: dateRange,
+            max_points: getMaxChartPoints(),
         });
 
         setMessage("Loading data...");